@@ -28,6 +28,7 @@ __all__ = [
     "EXT_ERR_PYTH_VERS",
     "EXT_ERR_IMP_MOD",
     "EXT_ERR_NOT_VLD",
+    "EXT_ERR_BUILD",
 ]
 
 
@@ -84,3 +85,6 @@ EXT_ERR_IMP_MOD = 6
 
 EXT_ERR_NOT_VLD = 7
 """Error, file is not a valid configuration"""
+
+EXT_ERR_BUILD = 8
+"""Error, a build job has failed"""
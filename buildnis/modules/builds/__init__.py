@@ -8,4 +8,10 @@
 
 from typing import List
 
-__all__: List[str] = []
+__all__: List[str] = [
+    "artifact_cache",
+    "build_graph",
+    "build_log",
+    "ninja_generator",
+    "scheduler",
+]
@@ -0,0 +1,483 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     artifact_cache.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import logging
+import os
+import pathlib
+import shutil
+import threading
+import time
+from typing import Dict, List, NamedTuple
+
+from buildnis.modules import VERSION, BuildnisException
+from buildnis.modules.config import CFG_VERSION, FilePath
+from buildnis.modules.helpers import LOGGER_NAME
+from buildnis.modules.helpers.file_compare import getFileCompares
+from buildnis.modules.helpers.files import cloneFile
+
+_logger = logging.getLogger(LOGGER_NAME)
+
+DEFAULT_MAX_SIZE: int = 2 * 1024 * 1024 * 1024
+"""The default maximum size of all cached stage results, in bytes.
+"""
+
+CACHEABLE_RESULT_TYPES = ("single_file", "dir")
+"""The types of stage results that can be saved in the artifact cache.
+"""
+
+
+class ArtifactCacheException(BuildnisException):
+    """Exception raised if something goes wrong storing or restoring stage results."""
+
+
+class StageResult(NamedTuple):
+    """A single result of a build stage.
+
+    Attributes:
+        type (str): The result's type, like `single_file` or `dir`.
+        path (FilePath): The absolute path of the result file or directory.
+    """
+
+    type: str = ""
+    path: FilePath = ""
+
+
+class ArtifactCache:
+    """Content addressed cache of the results of build stages.
+
+    A stage's results are saved under the stage's fingerprint, see
+    `getStageFingerprint`. If the results of a stage with the same fingerprint
+    are already in the cache, the stage doesn't need to run, the results are
+    restored from the cache by reflinking or copying them - or hard linking if
+    `use_hardlinks` is `True`.
+
+    The least recently used entries are deleted if the size of all entries is
+    bigger than `max_size`.
+
+    Attributes:
+        cache_dir (FilePath): The directory the cached results are saved in.
+        max_size (int): The maximum size of all cached results in bytes.
+        use_hardlinks (bool): Restore results using hard links if reflinks aren't
+                            supported. Only safe if no build tool changes its
+                            output files in place.
+        hits (int): The number of restored stage results, of all runs.
+        misses (int): The number of stage results not found in the cache, of all
+                        runs.
+
+    Methods:
+        restore: Restores the results of the stage with the given fingerprint.
+        store: Saves the results of the stage with the given fingerprint.
+        save: Writes the cache's index to disk.
+        clear: Deletes the whole cache.
+        getStats: Returns the hit and miss counts and the size of the cache.
+    """
+
+    ############################################################################
+    def __init__(
+        self,
+        cache_dir: FilePath,
+        max_size: int = DEFAULT_MAX_SIZE,
+        use_hardlinks: bool = False,
+    ) -> None:
+        """Loads the index of the artifact cache in `cache_dir`, if it exists.
+
+        Args:
+            cache_dir (FilePath): The directory to save the stage results to.
+            max_size (int, optional): The maximum size of all saved results in bytes.
+                                    Defaults to `DEFAULT_MAX_SIZE`.
+            use_hardlinks (bool, optional): Restore results using hard links if
+                                    reflinks aren't supported. Defaults to False.
+        """
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_size = max_size
+        self.use_hardlinks = use_hardlinks
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+        self._index_path = os.path.join(self.cache_dir, "index.json")
+
+        self.load()
+
+    ############################################################################
+    def load(self) -> None:
+        """Loads the cache's index. A missing or invalid index is not an error, the
+        cache starts empty.
+        """
+        try:
+            with io.open(self._index_path, mode="r", encoding="utf-8") as file:
+                index = json.load(file)
+            if index.get("file_version") == ".".join(CFG_VERSION):
+                self._entries = index.get("entries", {})
+                self.hits = index.get("hits", 0)
+                self.misses = index.get("misses", 0)
+        except FileNotFoundError:
+            pass
+        except Exception as excp:
+            _logger.warning(
+                'error "{error}" reading artifact cache index "{path}"'.format(
+                    error=excp, path=self._index_path
+                )
+            )
+
+    ############################################################################
+    def save(self) -> None:
+        """Writes the index of the cache to disk.
+
+        Raises:
+            ArtifactCacheException: if the index can't be written.
+        """
+        try:
+            pathlib.Path(self.cache_dir).mkdir(parents=True, exist_ok=True)
+            tmp_path = ".".join([self._index_path, "tmp"])
+            with self._lock:
+                with io.open(tmp_path, mode="w", encoding="utf-8") as file:
+                    json.dump(
+                        {
+                            "file_version": ".".join(CFG_VERSION),
+                            "hits": self.hits,
+                            "misses": self.misses,
+                            "entries": self._entries,
+                        },
+                        file,
+                    )
+            os.replace(tmp_path, self._index_path)
+        except Exception as excp:
+            raise ArtifactCacheException(excp)
+
+    ############################################################################
+    def restore(self, fingerprint: str, results: List[StageResult]) -> bool:
+        """Restores the results of the stage with the given fingerprint from the
+        cache.
+
+        Existing results are replaced.
+
+        Args:
+            fingerprint (str): The fingerprint of the stage, see
+                                `getStageFingerprint`.
+            results (List[StageResult]): The results of the stage to restore.
+
+        Returns:
+            bool: `True` if the results have been restored, `False` if they aren't
+                    in the cache or something went wrong.
+        """
+        entry_dir = self._getEntryDir(fingerprint)
+        try:
+            with self._lock:
+                if fingerprint not in self._entries:
+                    self.misses += 1
+                    return False
+
+            with io.open(
+                os.path.join(entry_dir, "manifest.json"), mode="r", encoding="utf-8"
+            ) as file:
+                manifest = json.load(file)
+
+            if manifest["results"] != [list(result) for result in results]:
+                with self._lock:
+                    self.misses += 1
+                return False
+
+            for idx, result in enumerate(results):
+                self._restoreResult(os.path.join(entry_dir, "data", str(idx)), result)
+
+        except Exception as excp:
+            _logger.error(
+                'error "{error}" restoring stage results from artifact cache "{path}"'.format(
+                    error=excp, path=entry_dir
+                )
+            )
+            with self._lock:
+                self.misses += 1
+                self._removeEntry(fingerprint)
+            return False
+
+        with self._lock:
+            self.hits += 1
+            self._entries[fingerprint]["last_used"] = time.time_ns()
+
+        return True
+
+    ############################################################################
+    def _restoreResult(self, src: FilePath, result: StageResult) -> None:
+        """Restores a single result from the cache entry's data at `src`.
+
+        Args:
+            src (FilePath): The path to the saved result in the cache.
+            result (StageResult): The result to restore.
+        """
+        if result.type == "dir":
+            shutil.rmtree(result.path, ignore_errors=True)
+            for root, _, file_names in os.walk(src):
+                dst_root = os.path.join(result.path, os.path.relpath(root, src))
+                pathlib.Path(dst_root).mkdir(parents=True, exist_ok=True)
+                for file_name in file_names:
+                    cloneFile(
+                        os.path.join(root, file_name),
+                        os.path.join(dst_root, file_name),
+                        allow_hardlink=self.use_hardlinks,
+                    )
+        else:
+            pathlib.Path(result.path).parent.mkdir(parents=True, exist_ok=True)
+            cloneFile(src, result.path, allow_hardlink=self.use_hardlinks)
+
+    ############################################################################
+    def store(self, fingerprint: str, results: List[StageResult]) -> bool:
+        """Saves the results of the stage with the given fingerprint to the cache.
+
+        Evicts the least recently used entries if the cache gets too big.
+
+        Args:
+            fingerprint (str): The fingerprint of the stage, see
+                                `getStageFingerprint`.
+            results (List[StageResult]): The results of the stage to save.
+
+        Returns:
+            bool: `True` if the results have been saved, `False` if they can't be
+                cached or something went wrong.
+        """
+        if results == [] or any(
+            result.type not in CACHEABLE_RESULT_TYPES for result in results
+        ):
+            return False
+
+        entry_dir = self._getEntryDir(fingerprint)
+        tmp_dir = ".".join(
+            [entry_dir, "tmp", str(os.getpid()), str(threading.get_ident())]
+        )
+        try:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            size = 0
+            for idx, result in enumerate(results):
+                size += self._storeResult(
+                    os.path.join(tmp_dir, "data", str(idx)), result
+                )
+
+            with io.open(
+                os.path.join(tmp_dir, "manifest.json"), mode="w", encoding="utf-8"
+            ) as file:
+                json.dump(
+                    {
+                        "fingerprint": fingerprint,
+                        "results": [list(result) for result in results],
+                        "size": size,
+                    },
+                    file,
+                )
+
+            with self._lock:
+                self._removeEntry(fingerprint)
+                os.replace(tmp_dir, entry_dir)
+                self._entries[fingerprint] = {
+                    "size": size,
+                    "last_used": time.time_ns(),
+                }
+                self._evict()
+
+        except Exception as excp:
+            _logger.error(
+                'error "{error}" saving stage results to artifact cache "{path}"'.format(
+                    error=excp, path=entry_dir
+                )
+            )
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return False
+
+        return True
+
+    ############################################################################
+    @staticmethod
+    def _storeResult(dst: FilePath, result: StageResult) -> int:
+        """Saves a single result to the cache entry's data at `dst`.
+
+        Args:
+            dst (FilePath): The path to save the result to.
+            result (StageResult): The result to save.
+
+        Raises:
+            ArtifactCacheException: if the result doesn't exist.
+
+        Returns:
+            int: The size of the saved result in bytes.
+        """
+        size = 0
+        if result.type == "dir":
+            if not os.path.isdir(result.path):
+                raise ArtifactCacheException(
+                    'result directory "{path}" does not exist'.format(path=result.path)
+                )
+            for root, _, file_names in os.walk(result.path):
+                dst_root = os.path.join(dst, os.path.relpath(root, result.path))
+                pathlib.Path(dst_root).mkdir(parents=True, exist_ok=True)
+                for file_name in file_names:
+                    src_file = os.path.join(root, file_name)
+                    cloneFile(
+                        src_file,
+                        os.path.join(dst_root, file_name),
+                        allow_hardlink=False,
+                    )
+                    size += os.stat(src_file).st_size
+        else:
+            pathlib.Path(dst).parent.mkdir(parents=True, exist_ok=True)
+            cloneFile(result.path, dst, allow_hardlink=False)
+            size += os.stat(result.path).st_size
+
+        return size
+
+    ############################################################################
+    def _evict(self) -> None:
+        """Deletes the least recently used entries until the size of the cache is
+        at most `max_size`. The caller must hold the lock.
+        """
+        total_size = sum(entry["size"] for entry in self._entries.values())
+        if total_size <= self.max_size:
+            return
+
+        for fingerprint in sorted(
+            self._entries, key=lambda key: self._entries[key]["last_used"]
+        ):
+            total_size -= self._entries[fingerprint]["size"]
+            _logger.info(
+                'Evicting "{fingerprint}" from the artifact cache'.format(
+                    fingerprint=fingerprint
+                )
+            )
+            self._removeEntry(fingerprint)
+            if total_size <= self.max_size:
+                break
+
+    ############################################################################
+    def _removeEntry(self, fingerprint: str) -> None:
+        """Deletes the entry with the given fingerprint. The caller must hold the
+        lock.
+
+        Args:
+            fingerprint (str): The fingerprint of the entry to delete.
+        """
+        self._entries.pop(fingerprint, None)
+        shutil.rmtree(self._getEntryDir(fingerprint), ignore_errors=True)
+
+    ############################################################################
+    def _getEntryDir(self, fingerprint: str) -> FilePath:
+        """Returns the directory the results with the given fingerprint are saved
+        in.
+
+        Args:
+            fingerprint (str): The fingerprint of the stage.
+
+        Returns:
+            FilePath: The path to the cache entry's directory.
+        """
+        return os.path.join(self.cache_dir, "objects", fingerprint[:2], fingerprint)
+
+    ############################################################################
+    def clear(self) -> None:
+        """Deletes the whole cache, including the index and statistics."""
+        with self._lock:
+            self._entries = {}
+            self.hits = 0
+            self.misses = 0
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    ############################################################################
+    def getStats(self) -> str:
+        """Returns the statistics of the cache as a string.
+
+        Returns:
+            str: The hit and miss counts, number of entries and size of the cache.
+        """
+        with self._lock:
+            total_size = sum(entry["size"] for entry in self._entries.values())
+            num_lookups = self.hits + self.misses
+            hit_rate = 100.0 * self.hits / num_lookups if num_lookups > 0 else 0.0
+            return 'Artifact cache "{path}": {hits} hits, {misses} misses ({rate:.1f}% hit rate), {num} entries, {size:.1f} of {max_size:.1f} MiB used'.format(
+                path=self.cache_dir,
+                hits=self.hits,
+                misses=self.misses,
+                rate=hit_rate,
+                num=len(self._entries),
+                size=total_size / (1024 * 1024),
+                max_size=self.max_size / (1024 * 1024),
+            )
+
+
+################################################################################
+def getStageFingerprint(
+    stage: object,
+    input_files: List[FilePath],
+    host_os: str,
+    host_arch: str,
+) -> str:
+    """Returns the fingerprint of a build stage, the BLAKE2 hash of everything
+    that determines the results of the stage.
+
+    These are the hashes of the stage's input files, the expanded build tool
+    arguments, the build tool and its version found by `Check.checkVersions`, the
+    host's OS and CPU architecture and the version of Buildnis.
+
+    Args:
+        stage (object): The stage of the build configuration.
+        input_files (List[FilePath]): The list of all input files of the stage, like
+                                the stage's `dependencies` and sources.
+        host_os (str): The OS of the host.
+        host_arch (str): The CPU architecture of the host.
+
+    Raises:
+        FileCompareException: if an input file can't be hashed
+
+    Returns:
+        str: The fingerprint as hex string.
+    """
+    build_tool = getattr(stage, "build_tool", None)
+    file_hashes = {
+        file: compare.hash for file, compare in getFileCompares(input_files).items()
+    }
+
+    fingerprint_data = {
+        "buildnis_version": str(VERSION),
+        "host_os": host_os,
+        "host_arch": host_arch,
+        "stage": getattr(stage, "name", ""),
+        "build_tool_name": getattr(build_tool, "name", ""),
+        "build_tool_exe": getattr(build_tool, "build_tool_exe", ""),
+        "build_tool_version": getattr(build_tool, "version", ""),
+        "build_tool_arguments": getattr(stage, "build_tool_arguments", []),
+        "inputs": sorted(file_hashes.items()),
+    }
+
+    return hashlib.blake2b(
+        json.dumps(fingerprint_data, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+################################################################################
+def getStageResults(stage: object) -> List[StageResult]:
+    """Returns the list of results of the given stage.
+
+    Args:
+        stage (object): The stage of the build configuration.
+
+    Returns:
+        List[StageResult]: The stage's results, with absolute paths.
+    """
+    ret_val = []
+    for result in getattr(stage, "results", []):
+        ret_val.append(
+            StageResult(
+                type=getattr(result, "type", ""),
+                path=os.path.abspath(getattr(result, "path_or_regexp", "")),
+            )
+        )
+
+    return ret_val
@@ -0,0 +1,921 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     build_graph.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import functools
+import logging
+import os
+import re
+import shlex
+import threading
+import time
+from typing import Dict, List, NamedTuple, Set, Tuple
+
+from buildnis.modules.builds.artifact_cache import (
+    ArtifactCache,
+    StageResult,
+    getStageFingerprint,
+    getStageResults,
+)
+from buildnis.modules.builds.build_log import BuildLog, BuildLogEntry
+from buildnis.modules.builds.scheduler import (
+    DEFAULT_DURATION,
+    BuildJob,
+    BuildScheduler,
+    BuildSchedulerException,
+)
+from buildnis.modules.config import (
+    LINUX_OS_STRING,
+    OSX_OS_STRING,
+    FilePath,
+    config_values,
+)
+from buildnis.modules.helpers import LOGGER_NAME
+from buildnis.modules.helpers.execute import EnvArgs, ExeArgs, runCommand
+from buildnis.modules.helpers.file_compare import getFileCompares
+from buildnis.modules.helpers.files import expandFileList
+
+_logger = logging.getLogger(LOGGER_NAME)
+
+ALL_TARGETS_PLACEHOLDER = "${@}"
+"""A target dependency on all other targets of the same module, that don't depend
+on all targets themselves.
+"""
+
+INSTALL_BUILD_TYPE = "install"
+"""The build type of install targets.
+"""
+
+MEMORY_WEIGHT_UNIT: int = 1024 * 1024
+"""The unit of the `memory_weight` of a stage, MiB.
+"""
+
+CALL_BUILD_TOOL_ONCE = "once"
+"""The value of a stage's `call_build_tool` if the build tool is called once for
+the stage. Any other value calls the build tool once for each source file of the
+target.
+"""
+
+TargetKey = Tuple[int, int]
+"""The index of the module in `Config.module_cfgs` and the index of the target in
+the module's `targets`.
+"""
+
+GCC_COMPILER_REGEX = re.compile(
+    r"(^|-)(gcc|g\+\+|cc|c\+\+|clang|clang\+\+|gfortran|icc|icpc|icx|icpx|ifort|ifx)(-[0-9.]+)?$"
+)
+"""Matches the executable names of compilers with GCC compatible arguments,
+including cross compilers like `aarch64-linux-gnu-g++-12`.
+"""
+
+MSVC_COMPILER_REGEX = re.compile(r"^(cl|clang-cl)$")
+"""Matches the executable names of compilers with MSVC compatible arguments.
+"""
+
+GCC_COMPILER = "gcc"
+"""The type of compilers with GCC compatible arguments.
+"""
+
+MSVC_COMPILER = "msvc"
+"""The type of compilers with MSVC compatible arguments.
+"""
+
+
+class StageCommand(NamedTuple):
+    """The command line of a build job.
+
+    Attributes:
+        exe_path (FilePath): The path to the build tool's executable.
+        arguments (List[str]): The arguments to call the build tool with.
+        env_script (FilePath): The environment script of the build tool, the empty
+                                string if it doesn't have one.
+        env_script_arg (str): The argument to call the environment script with.
+        working_dir (FilePath): The working directory to run the build tool in.
+        compiler_type (str): `GCC_COMPILER` or `MSVC_COMPILER` if the build tool is
+                            a compiler, the empty string else.
+    """
+
+    exe_path: FilePath = ""
+    arguments: List[str] = None
+    env_script: FilePath = ""
+    env_script_arg: str = ""
+    working_dir: FilePath = ""
+    compiler_type: str = ""
+
+    ############################################################################
+    def getExeArgs(self) -> ExeArgs:
+        """Returns the executable and arguments to pass to `runCommand`.
+
+        Returns:
+            ExeArgs: The executable and its arguments.
+        """
+        return ExeArgs(self.exe_path, self.arguments)
+
+    ############################################################################
+    def getEnvArgs(self) -> EnvArgs:
+        """Returns the environment script arguments to pass to `runCommand`.
+
+        Returns:
+            EnvArgs: The environment script, its argument and if it is sourced.
+        """
+        return EnvArgs(
+            self.env_script,
+            [self.env_script_arg],
+            config_values.HOST_OS in (LINUX_OS_STRING, OSX_OS_STRING),
+        )
+
+
+class BuildGraph:
+    """Generates the jobs of the build graph of the selected targets of a project
+    configuration and adds them to a `BuildScheduler`.
+
+    Each stage of the build configuration connected to a target is a job, which
+    depends on the previous stage of the target. Stages whose `call_build_tool` is
+    not `once` are a job for each source file of the target, that can run at the
+    same time. The first stage of a target depends on the last stage of all targets
+    in the target's `dependencies`, a target name or alias of the same module, or
+    of another module, or `${@}` for all other targets of the same module. Other
+    dependencies are files and not part of the build graph. A target without
+    stages, like an install target, is a single job that only depends on its
+    target dependencies.
+
+    The wall time of each job that has run is saved in the build log, the
+    scheduler starts the jobs with the longest path of durations of the last
+    build first. The memory usage of a job is the stage's `memory_weight` in MiB,
+    or the peak memory usage of the job's last run saved in the build log.
+
+    A job that isn't set to `always_run_build` is skipped, if its entry in the
+    build log matches and the results of none of the jobs it depends on have
+    changed in this build. A job that has run, but whose results are the same as
+    the results saved in the build log, doesn't cause the jobs depending on it to
+    run (early cutoff).
+
+    Attributes:
+        cfg (object): The project configuration, a `Config` instance.
+        scheduler (BuildScheduler): The scheduler the jobs are added to.
+        artifact_cache (ArtifactCache): The cache of stage results, `None` if no
+                                        cache is used.
+        build_log (BuildLog): The log of the jobs of the last builds, `None` if
+                            all jobs are run.
+
+    Methods:
+        selectTargets: Returns the targets to build or install.
+        addTargets: Adds the jobs of the given targets and their dependencies.
+    """
+
+    ############################################################################
+    def __init__(
+        self,
+        cfg: object,
+        scheduler: BuildScheduler,
+        artifact_cache: ArtifactCache = None,
+        build_log: BuildLog = None,
+    ) -> None:
+        """Constructor of the build graph.
+
+        Args:
+            cfg (object): The project configuration, a `Config` instance.
+            scheduler (BuildScheduler): The scheduler to add the jobs to.
+            artifact_cache (ArtifactCache, optional): The cache of stage results.
+                                        Defaults to None, don't use a cache.
+            build_log (BuildLog, optional): The log of the jobs of the last builds.
+                                        Defaults to None, run all jobs.
+        """
+        self.cfg = cfg
+        self.scheduler = scheduler
+        self.artifact_cache = artifact_cache
+        self.build_log = build_log
+        self._last_jobs: Dict[TargetKey, List[str]] = {}
+        self._changed: Set[str] = set()
+        self._lock = threading.Lock()
+
+    ############################################################################
+    def selectTargets(self, names: List[str], do_install: bool) -> List[TargetKey]:
+        """Returns the targets with the given names or aliases, the default targets
+        if `names` is empty.
+
+        If `do_install` is `True`, the install targets of the modules of the
+        selected targets are returned instead.
+
+        Args:
+            names (List[str]): The names or aliases of the targets to select.
+            do_install (bool): Whether to select the install targets.
+
+        Raises:
+            BuildSchedulerException: if there is no target with one of the names.
+
+        Returns:
+            List[TargetKey]: The selected targets.
+        """
+        ret_val = []
+        if names == []:
+            ret_val = [
+                key
+                for key, target in self.getTargets()
+                if getattr(target, "default", False) is True
+            ]
+        for name in names:
+            found = [
+                key for key, target in self.getTargets() if isTargetName(target, name)
+            ]
+            if found == []:
+                raise BuildSchedulerException(
+                    'no target with the name "{name}" found'.format(name=name)
+                )
+            ret_val.extend(key for key in found if key not in ret_val)
+
+        if do_install:
+            modules = {module_idx for module_idx, _ in ret_val}
+            ret_val = [
+                key
+                for key, target in self.getTargets()
+                if key[0] in modules
+                and getattr(target, "build_type", "") == INSTALL_BUILD_TYPE
+            ]
+
+        return ret_val
+
+    ############################################################################
+    def getTargets(self) -> List[Tuple[TargetKey, object]]:
+        """Returns all targets of all modules of the project configuration.
+
+        Returns:
+            List[Tuple[TargetKey, object]]: The keys of the targets and the targets.
+        """
+        return [
+            ((module_idx, target_idx), target)
+            for module_idx, module in enumerate(self.cfg.module_cfgs)
+            for target_idx, target in enumerate(module.targets)
+        ]
+
+    ############################################################################
+    def addTargets(self, targets: List[TargetKey]) -> None:
+        """Adds the jobs of the given targets and of all targets they depend on to
+        the scheduler.
+
+        Args:
+            targets (List[TargetKey]): The targets to build.
+
+        Raises:
+            BuildSchedulerException: if targets depend on each other.
+        """
+        for key in targets:
+            self.addTarget(key, [])
+
+    ############################################################################
+    def addTarget(self, key: TargetKey, path: List[TargetKey]) -> List[str]:
+        """Adds the jobs of the given target and of all targets it depends on.
+
+        Args:
+            key (TargetKey): The target to add.
+            path (List[TargetKey]): The targets depending on this target, to
+                                    detect cycles.
+
+        Raises:
+            BuildSchedulerException: if targets depend on each other.
+
+        Returns:
+            List[str]: The names of the jobs of the target's last stage.
+        """
+        if key in self._last_jobs:
+            return self._last_jobs[key]
+        if key in path:
+            raise BuildSchedulerException(
+                'cyclic dependencies between the targets "{targets}"'.format(
+                    targets='", "'.join(
+                        getJobPrefix(self.cfg, dep) for dep in path + [key]
+                    )
+                )
+            )
+
+        dependencies = []
+        for dep_key in self.getTargetDependencies(key):
+            for job_name in self.addTarget(dep_key, path + [key]):
+                if job_name not in dependencies:
+                    dependencies.append(job_name)
+
+        module = self.cfg.module_cfgs[key[0]]
+        target = module.targets[key[1]]
+        prefix = getJobPrefix(self.cfg, key)
+        stages = getattr(getattr(target, "build_tool", None), "stages", [])
+
+        if stages == []:
+            self.scheduler.addJob(
+                BuildJob(
+                    name=prefix,
+                    action=functools.partial(self.runJoin, prefix),
+                    dependencies=dependencies,
+                    duration=0.0,
+                )
+            )
+            self._last_jobs[key] = [prefix]
+            return self._last_jobs[key]
+
+        for stage in stages:
+            stage_prefix = "/".join([prefix, getattr(stage, "name", "")])
+            if getattr(stage, "call_build_tool", CALL_BUILD_TOOL_ONCE) == (
+                CALL_BUILD_TOOL_ONCE
+            ):
+                jobs = [
+                    BuildJob(
+                        name=stage_prefix,
+                        action=functools.partial(
+                            self.runStage, stage_prefix, module, target, stage, None
+                        ),
+                        dependencies=dependencies,
+                        duration=self.getDuration(stage_prefix),
+                        memory=self.getMemory(stage_prefix, stage),
+                    )
+                ]
+            else:
+                jobs = [
+                    BuildJob(
+                        name="/".join([stage_prefix, source]),
+                        action=functools.partial(
+                            self.runStage,
+                            "/".join([stage_prefix, source]),
+                            module,
+                            target,
+                            stage,
+                            source,
+                        ),
+                        dependencies=dependencies,
+                        duration=self.getDuration("/".join([stage_prefix, source])),
+                        memory=self.getMemory("/".join([stage_prefix, source]), stage),
+                    )
+                    for source in expandFileList(
+                        getattr(target, "sources", []), getModulePath(module)
+                    )
+                ]
+            for job in jobs:
+                self.scheduler.addJob(job)
+            dependencies = [job.name for job in jobs]
+
+        self._last_jobs[key] = dependencies
+        return self._last_jobs[key]
+
+    ############################################################################
+    def getTargetDependencies(self, key: TargetKey) -> List[TargetKey]:
+        """Returns the targets the given target depends on.
+
+        Target names and aliases are searched in the target's module first, then
+        in all other modules. `${@}` is the list of all targets of the module that
+        don't depend on `${@}` themselves.
+
+        Args:
+            key (TargetKey): The target to return the dependencies of.
+
+        Returns:
+            List[TargetKey]: The targets the target depends on.
+        """
+        module = self.cfg.module_cfgs[key[0]]
+        target = module.targets[key[1]]
+
+        ret_val = []
+        for dependency in flattenStrings(getattr(target, "dependencies", [])):
+            if dependency == ALL_TARGETS_PLACEHOLDER:
+                found = [
+                    (key[0], idx)
+                    for idx, other in enumerate(module.targets)
+                    if ALL_TARGETS_PLACEHOLDER
+                    not in flattenStrings(getattr(other, "dependencies", []))
+                ]
+            else:
+                found = [
+                    (key[0], idx)
+                    for idx, other in enumerate(module.targets)
+                    if isTargetName(other, dependency)
+                ]
+                if found == []:
+                    found = [
+                        other_key
+                        for other_key, other in self.getTargets()
+                        if isTargetName(other, dependency)
+                    ][:1]
+            ret_val.extend(
+                dep_key
+                for dep_key in found
+                if dep_key != key and dep_key not in ret_val
+            )
+
+        return ret_val
+
+    ############################################################################
+    def runStage(
+        self,
+        name: str,
+        module: object,
+        target: object,
+        stage: object,
+        source: FilePath,
+    ) -> None:
+        """Runs the build tool of the given stage, called from a worker thread of
+        the scheduler.
+
+        The stage isn't run if it is up to date, see `isUpToDate`. A stage with
+        `call_build_tool` set to `once` is restored from the artifact cache, if it
+        isn't set to `always_run_build` and its results are in the cache. After
+        running the build tool, its results are saved in the cache and compared to
+        the results of the previous run, see `setChanged`.
+
+        Args:
+            name (str): The name of the build job.
+            module (object): The module of the target.
+            target (object): The target the stage belongs to.
+            stage (object): The stage to run.
+            source (FilePath): The source file to call the build tool with, `None`
+                                if the build tool is called once for the stage.
+
+        Raises:
+            BuildSchedulerException: if the build tool isn't found or fails.
+        """
+        build_tool = getattr(stage, "build_tool", None)
+        if build_tool is None:
+            raise BuildSchedulerException(
+                'build tool "{name}" not found'.format(
+                    name=getattr(stage, "build_tool_name", "")
+                )
+            )
+
+        always_run = getattr(stage, "always_run_build", False) is True
+        results = getStageResults(stage)
+        input_files = expandFileList(
+            [
+                getattr(target, "sources", []) if source is None else source,
+                getattr(stage, "dependencies", []),
+            ],
+            getModulePath(module),
+        )
+
+        command = getStageCommand(module, target, stage, source)
+
+        log_entry = None
+        previous_outputs = None
+        if self.build_log is not None:
+            log_entry = getLogEntry(
+                input_files,
+                [
+                    command.working_dir,
+                    command.env_script,
+                    command.env_script_arg,
+                    command.exe_path,
+                    *command.arguments,
+                ],
+                getattr(build_tool, "version", ""),
+            )
+            if not always_run and self.isUpToDate(name, log_entry, results):
+                _logger.info('Build job "{name}" is up to date'.format(name=name))
+                return
+            previous_outputs = self.build_log.getOutputs(name)
+            self.build_log.remove(name)
+
+        start_time = time.perf_counter()
+        fingerprint = None
+        if self.artifact_cache is not None and source is None and not always_run:
+            fingerprint = getStageFingerprint(
+                stage,
+                input_files,
+                config_values.HOST_OS,
+                config_values.HOST_CPU_ARCH,
+            )
+            if self.artifact_cache.restore(fingerprint, results):
+                self.setChanged(
+                    name, previous_outputs, self.recordJob(name, log_entry, results)
+                )
+                self.setDuration(name, time.perf_counter() - start_time)
+                return
+
+        out_dir = getattr(stage, "build_tool_out_dir", "")
+        if out_dir != "":
+            os.makedirs(out_dir, exist_ok=True)
+
+        cmd_output = runCommand(
+            exe_args=command.getExeArgs(),
+            env_args=command.getEnvArgs(),
+            working_dir=command.working_dir,
+            timeout=None,
+        )
+        if cmd_output.return_code != 0:
+            raise BuildSchedulerException(
+                '"{exe}" returned {code}: {error}'.format(
+                    exe=command.exe_path,
+                    code=cmd_output.return_code,
+                    error=cmd_output.err_out.strip(),
+                )
+            )
+
+        self.setMemory(name, cmd_output.max_rss)
+        if fingerprint is not None:
+            self.artifact_cache.store(fingerprint, results)
+        self.setChanged(
+            name, previous_outputs, self.recordJob(name, log_entry, results)
+        )
+        self.setDuration(name, time.perf_counter() - start_time)
+
+    ############################################################################
+    def getDuration(self, name: str) -> float:
+        """Returns the estimated duration of the build job with the given name, the
+        duration of its last run saved in the build log.
+
+        Args:
+            name (str): The name of the build job.
+
+        Returns:
+            float: The estimated duration in seconds.
+        """
+        duration = None
+        if self.build_log is not None:
+            duration = self.build_log.getDuration(name)
+
+        return DEFAULT_DURATION if duration is None else duration
+
+    ############################################################################
+    def setDuration(self, name: str, duration: float) -> None:
+        """Saves the duration of the build job with the given name, that has run
+        successfully, in the build log.
+
+        Args:
+            name (str): The name of the build job.
+            duration (float): The duration of the job in seconds.
+        """
+        if self.build_log is not None:
+            self.build_log.setDuration(name, duration)
+
+    ############################################################################
+    def getMemory(self, name: str, stage: object) -> int:
+        """Returns the estimated peak memory usage of the build job with the given
+        name.
+
+        This is the `memory_weight` of the stage in MiB, if set, else the peak
+        memory usage of the job's last run saved in the build log.
+
+        Args:
+            name (str): The name of the build job.
+            stage (object): The stage of the build job.
+
+        Returns:
+            int: The estimated memory usage in bytes, 0 if not known.
+        """
+        memory_weight = getattr(stage, "memory_weight", None)
+        if memory_weight is not None:
+            return int(float(memory_weight) * MEMORY_WEIGHT_UNIT)
+
+        memory = None
+        if self.build_log is not None:
+            memory = self.build_log.getMemory(name)
+
+        return 0 if memory is None else memory
+
+    ############################################################################
+    def setMemory(self, name: str, memory: int) -> None:
+        """Saves the peak memory usage of the build job with the given name in the
+        build log.
+
+        The peak memory usage is the one of the job's build tool and its child
+        processes, returned by `modules.helpers.execute.runCommand`. It isn't saved
+        if it isn't known on this OS.
+
+        Args:
+            name (str): The name of the build job.
+            memory (int): The peak memory usage of the job in bytes, 0 if not
+                        known.
+        """
+        if self.build_log is not None and memory > 0:
+            self.build_log.setMemory(name, memory)
+
+    ############################################################################
+    def runJoin(self, name: str) -> None:
+        """The job of a target without stages, there is nothing to run.
+
+        Args:
+            name (str): The name of the target's job.
+        """
+        if self.dependencyHasChanged(name):
+            with self._lock:
+                self._changed.add(name)
+        _logger.info('Target "{name}" has no build stages to run'.format(name=name))
+
+    ############################################################################
+    def isUpToDate(
+        self, name: str, log_entry: BuildLogEntry, results: List[StageResult]
+    ) -> bool:
+        """Returns `True` if the build job with the given name doesn't need to run.
+
+        A job is up to date if its entry in the build log matches `log_entry` and
+        the results of none of the jobs it depends on have changed in this build.
+
+        Args:
+            name (str): The name of the build job.
+            log_entry (BuildLogEntry): The current inputs, command and build tool
+                                        version of the job, `None` if these aren't
+                                        known.
+            results (List[StageResult]): The results of the job.
+
+        Returns:
+            bool: `True` if the job is up to date, `False` if it has to run.
+        """
+        if log_entry is None or self.dependencyHasChanged(name):
+            return False
+
+        return self.build_log.isUpToDate(name, log_entry, results)
+
+    ############################################################################
+    def dependencyHasChanged(self, name: str) -> bool:
+        """Returns `True` if the results of one of the jobs the given job depends on
+        have changed in this build.
+
+        Args:
+            name (str): The name of the build job.
+
+        Returns:
+            bool: `True` if the results of a dependency have changed, `False` else.
+        """
+        with self._lock:
+            return any(
+                dependency in self._changed
+                for dependency in self.scheduler.jobs[name].dependencies
+            )
+
+    ############################################################################
+    def recordJob(
+        self, name: str, log_entry: BuildLogEntry, results: List[StageResult]
+    ) -> Dict[FilePath, str]:
+        """Saves the build job with the given name, that has run successfully, to
+        the build log.
+
+        Args:
+            name (str): The name of the build job.
+            log_entry (BuildLogEntry): The inputs, command and build tool version of
+                                        the job, `None` if the job isn't saved.
+            results (List[StageResult]): The results of the job.
+
+        Returns:
+            Dict[FilePath, str]: The hashes of the job's result files, `None` if
+                                the job hasn't been saved.
+        """
+        if self.build_log is None or log_entry is None:
+            return None
+
+        return self.build_log.record(name, log_entry, results)
+
+    ############################################################################
+    def setChanged(
+        self,
+        name: str,
+        previous_outputs: Dict[FilePath, str],
+        outputs: Dict[FilePath, str],
+    ) -> None:
+        """Marks the results of the build job with the given name, that has run
+        successfully, as changed, unless they are the same as the results of the
+        job's previous run.
+
+        The results of a job without any result files, or whose results can't be
+        hashed, are always changed.
+
+        Args:
+            name (str): The name of the build job.
+            previous_outputs (Dict[FilePath, str]): The hashes of the job's result
+                                files of the previous run, `None` if not known.
+            outputs (Dict[FilePath, str]): The hashes of the job's result files,
+                                `None` if not known.
+        """
+        if outputs and outputs == previous_outputs:
+            _logger.info(
+                'Results of build job "{name}" are unchanged, not running the jobs depending on it'.format(
+                    name=name
+                )
+            )
+            return
+
+        with self._lock:
+            self._changed.add(name)
+
+
+################################################################################
+def isTargetName(target: object, name: str) -> bool:
+    """Returns `True` if `name` is the name or the alias of the given target.
+
+    Args:
+        target (object): The target to check.
+        name (str): The name to compare.
+
+    Returns:
+        bool: `True` if the target has the given name or alias, `False` else.
+    """
+    return name in (getattr(target, "name", None), getattr(target, "alias", None))
+
+
+################################################################################
+def flattenStrings(items: object) -> List[str]:
+    """Returns all strings of the given string or nested list of strings.
+
+    Args:
+        items (object): A string or a nested list of strings.
+
+    Returns:
+        List[str]: The list of strings.
+    """
+    if isinstance(items, str):
+        return [items]
+    if isinstance(items, (list, tuple)):
+        return [string for item in items for string in flattenStrings(item)]
+
+    return []
+
+
+################################################################################
+def getModulePath(module: object) -> FilePath:
+    """Returns the directory of the given module, relative paths of its targets are
+    relative to this directory.
+
+    Args:
+        module (object): The module configuration.
+
+    Returns:
+        FilePath: The module's directory.
+    """
+    module_path = getattr(module, "module_path", "")
+    if module_path == "":
+        module_path = os.path.dirname(getattr(module, "config_path", ""))
+
+    return os.path.abspath(module_path)
+
+
+################################################################################
+def getStageCommand(
+    module: object,
+    target: object,
+    stage: object,
+    source: FilePath,
+    add_compiler_flags: bool = False,
+) -> StageCommand:
+    """Returns the command line to run the build tool of the given stage with.
+
+    The arguments are the stage's `build_tool_arguments` followed by the source
+    file, if the build tool is called for each source file. If
+    `add_compiler_flags` is `True` and the build tool is a GCC or MSVC compatible
+    compiler, the target's `include_paths` are added to the arguments of a stage
+    called for each source file and the target's `library_paths` and `libraries`
+    to the end of the arguments of a stage called once, see `getCompilerFlags`.
+
+    Args:
+        module (object): The module of the target.
+        target (object): The target the stage belongs to.
+        stage (object): The stage to run.
+        source (FilePath): The source file to call the build tool with, `None` if
+                            the build tool is called once for the stage.
+        add_compiler_flags (bool, optional): Add the include and library paths of
+                            the target to the arguments of a compiler. Defaults to
+                            False, the arguments are the stage's ones.
+
+    Returns:
+        StageCommand: The command line of the stage.
+    """
+    build_tool = getattr(stage, "build_tool", None)
+    exe_path = getattr(build_tool, "build_tool_exe", "")
+    env_script = getattr(build_tool, "env_script", "")
+    env_script_arg = getattr(build_tool, "env_script_arg", "")
+    install_path = getattr(build_tool, "install_path", "")
+    if env_script == "" and install_path != "":
+        exe_path = os.path.normpath("/".join([install_path, exe_path]))
+    working_dir = getattr(stage, "build_tool_working_dir", "") or getModulePath(module)
+    compiler_type = getCompilerType(exe_path)
+
+    arguments = []
+    for argument in flattenStrings(getattr(stage, "build_tool_arguments", [])):
+        arguments.extend(shlex.split(argument, posix=os.name != "nt"))
+    if add_compiler_flags and compiler_type != "":
+        arguments.extend(getCompilerFlags(compiler_type, module, target, source))
+    if source is not None:
+        arguments.append(source)
+
+    return StageCommand(
+        exe_path=exe_path,
+        arguments=arguments,
+        env_script=env_script,
+        env_script_arg=env_script_arg,
+        working_dir=working_dir,
+        compiler_type=compiler_type,
+    )
+
+
+################################################################################
+def getCompilerType(exe_path: FilePath) -> str:
+    """Returns the type of the compiler with the given executable.
+
+    Args:
+        exe_path (FilePath): The path to the executable of the build tool.
+
+    Returns:
+        str: `GCC_COMPILER` or `MSVC_COMPILER`, the empty string if the executable
+            isn't a known compiler.
+    """
+    exe_name = os.path.basename(exe_path).lower()
+    if exe_name.endswith(".exe"):
+        exe_name = exe_name[: -len(".exe")]
+
+    if GCC_COMPILER_REGEX.search(exe_name) is not None:
+        return GCC_COMPILER
+    if MSVC_COMPILER_REGEX.search(exe_name) is not None:
+        return MSVC_COMPILER
+
+    return ""
+
+
+################################################################################
+def getCompilerFlags(
+    compiler_type: str, module: object, target: object, source: FilePath
+) -> List[str]:
+    """Returns the compiler arguments of the target's include paths, if `source` is
+    given, or library paths and libraries if not.
+
+    Relative paths are relative to the module's directory. A library containing a
+    path separator or a dot is a path to the library file and passed unaltered.
+
+    Args:
+        compiler_type (str): `GCC_COMPILER` or `MSVC_COMPILER`.
+        module (object): The module of the target.
+        target (object): The target to get the include and library paths of.
+        source (FilePath): The source file to compile, `None` to get the link
+                            arguments.
+
+    Returns:
+        List[str]: The compiler arguments.
+    """
+    module_path = getModulePath(module)
+
+    def getPaths(name: str) -> List[FilePath]:
+        return [
+            os.path.normpath(os.path.join(module_path, path))
+            for path in flattenStrings(getattr(target, name, []))
+        ]
+
+    if source is not None:
+        prefix = "-I" if compiler_type == GCC_COMPILER else "/I"
+        return [prefix + path for path in getPaths("include_paths")]
+
+    libraries = flattenStrings(getattr(target, "libraries", []))
+    if compiler_type == GCC_COMPILER:
+        return ["-L" + path for path in getPaths("library_paths")] + [
+            (
+                library
+                if os.path.basename(library) != library or "." in library
+                else "-l" + library
+            )
+            for library in libraries
+        ]
+
+    ret_val = [library if "." in library else library + ".lib" for library in libraries]
+    library_paths = getPaths("library_paths")
+    if library_paths != []:
+        ret_val.append("/link")
+        ret_val.extend("/LIBPATH:" + path for path in library_paths)
+
+    return ret_val
+
+
+################################################################################
+def getJobPrefix(cfg: object, key: TargetKey) -> str:
+    """Returns the name of the given target used as prefix of the names of its
+    jobs, `MODULE NAME/TARGET NAME`.
+
+    Args:
+        cfg (object): The project configuration.
+        key (TargetKey): The target.
+
+    Returns:
+        str: The target's job name prefix.
+    """
+    module = cfg.module_cfgs[key[0]]
+    return "/".join([getattr(module, "name", ""), module.targets[key[1]].name])
+
+
+################################################################################
+def getLogEntry(
+    input_files: List[FilePath], command: List[str], tool_version: str
+) -> BuildLogEntry:
+    """Returns the build log entry of a build job, the hashes of its input files,
+    its command line and the version of its build tool.
+
+    Args:
+        input_files (List[FilePath]): The input files of the job.
+        command (List[str]): The command line of the job.
+        tool_version (str): The version of the job's build tool.
+
+    Returns:
+        BuildLogEntry: The job's entry, `None` if an input file can't be hashed.
+    """
+    try:
+        inputs = {
+            file: compare.hash for file, compare in getFileCompares(input_files).items()
+        }
+    except Exception:
+        return None
+
+    return BuildLogEntry(inputs=inputs, command=command, tool_version=tool_version)
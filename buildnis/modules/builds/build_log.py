@@ -0,0 +1,351 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     build_log.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import io
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, NamedTuple
+
+from buildnis.modules import BuildnisException
+from buildnis.modules.builds.artifact_cache import StageResult
+from buildnis.modules.config import CFG_VERSION, FilePath
+from buildnis.modules.helpers import LOGGER_NAME
+from buildnis.modules.helpers.hash_cache import cachedHashFile
+
+_logger = logging.getLogger(LOGGER_NAME)
+
+
+class BuildLogException(BuildnisException):
+    """Exception raised if the build log can't be written."""
+
+
+class BuildLogEntry(NamedTuple):
+    """Everything that determines the results of a single build job.
+
+    Attributes:
+        inputs (Dict[FilePath, str]): The hashes of the job's input files, the
+                                    target's sources and the stage's dependencies.
+        command (List[str]): The expanded command line of the build tool, with the
+                            working directory and environment script.
+        tool_version (str): The version of the build tool.
+    """
+
+    inputs: Dict[FilePath, str] = None
+    command: List[str] = None
+    tool_version: str = ""
+
+
+class BuildLog:
+    """Persistent log of the build jobs that have run successfully.
+
+    For each build job the hashes of its input files, its command line, the
+    version of its build tool and the hashes of its results are saved. A job
+    doesn't need to run again, if all of these are the same as in the saved
+    entry - the results are checked using the hash cache, so this doesn't read
+    unchanged files. The wall time and peak memory usage of the last run of each
+    job are saved too, to estimate the job's duration and memory usage in the next
+    build. The log is saved as JSON file.
+
+    Attributes:
+        log_path (FilePath): The path to the JSON file the log is saved to, the
+                            empty string if the log isn't saved.
+        hits (int): The number of jobs that haven't been run because they are up
+                    to date.
+        misses (int): The number of jobs that are not up to date.
+
+    Methods:
+        isUpToDate: Checks if the job doesn't need to run.
+        getOutputs: Returns the hashes of the results of a job's last run.
+        record: Saves the entry of a job that has run successfully.
+        remove: Removes the entry of a job.
+        getDuration: Returns the duration of the last run of a job.
+        setDuration: Saves the duration of a job.
+        getMemory: Returns the peak memory usage of the last run of a job.
+        setMemory: Saves the peak memory usage of a job.
+        save: Writes the log to disk.
+    """
+
+    ############################################################################
+    def __init__(self, log_path: FilePath = "") -> None:
+        """Loads the build log from the given file, if it exists.
+
+        Args:
+            log_path (FilePath, optional): The path to the JSON file of the log.
+                                Defaults to "", the log is not saved to disk.
+        """
+        self.log_path = log_path
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Dict[str, object]] = {}
+        self._durations: Dict[str, float] = {}
+        self._mean_duration: float = None
+        self._memory: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        if self.log_path != "":
+            self.load()
+
+    ############################################################################
+    def load(self) -> None:
+        """Loads the entries from the log's JSON file.
+
+        A missing or invalid log file is not an error, the log starts empty.
+        """
+        try:
+            with io.open(self.log_path, mode="r", encoding="utf-8") as file:
+                log_json = json.load(file)
+            if log_json.get("file_version") == ".".join(CFG_VERSION):
+                self._entries = log_json.get("entries", {})
+                self._durations = log_json.get("durations", {})
+                self._memory = log_json.get("memory", {})
+            if self._durations:
+                self._mean_duration = sum(self._durations.values()) / len(
+                    self._durations
+                )
+        except FileNotFoundError:
+            pass
+        except Exception as excp:
+            _logger.warning(
+                'error "{error}" reading build log "{path}", not using it'.format(
+                    error=excp, path=self.log_path
+                )
+            )
+
+    ############################################################################
+    def isUpToDate(
+        self, name: str, entry: BuildLogEntry, results: List[StageResult]
+    ) -> bool:
+        """Returns `True` if the build job with the given name doesn't need to run.
+
+        That is, if the saved entry of the job has the same inputs, command line and
+        build tool version as `entry` and all of the job's results exist and haven't
+        changed since the job has run.
+
+        Args:
+            name (str): The unique name of the build job.
+            entry (BuildLogEntry): The current inputs, command and tool version of
+                                    the job.
+            results (List[StageResult]): The results of the job.
+
+        Returns:
+            bool: `True` if the job is up to date, `False` if it needs to run.
+        """
+        with self._lock:
+            saved = self._entries.get(name)
+
+        is_up_to_date = False
+        if (
+            saved is not None
+            and saved["inputs"] == entry.inputs
+            and saved["command"] == entry.command
+            and saved["tool_version"] == entry.tool_version
+        ):
+            try:
+                is_up_to_date = saved["outputs"] == hashResults(results)
+            except Exception:
+                is_up_to_date = False
+
+        with self._lock:
+            if is_up_to_date:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        return is_up_to_date
+
+    ############################################################################
+    def getOutputs(self, name: str) -> Dict[FilePath, str]:
+        """Returns the hashes of the result files of the last successful run of the
+        build job with the given name.
+
+        Args:
+            name (str): The unique name of the build job.
+
+        Returns:
+            Dict[FilePath, str]: The hex hashes of the job's result files, `None` if
+                                the job isn't in the log.
+        """
+        with self._lock:
+            saved = self._entries.get(name)
+
+        return None if saved is None else saved["outputs"]
+
+    ############################################################################
+    def record(
+        self, name: str, entry: BuildLogEntry, results: List[StageResult]
+    ) -> Dict[FilePath, str]:
+        """Saves the entry of the build job with the given name, that has run
+        successfully.
+
+        Args:
+            name (str): The unique name of the build job.
+            entry (BuildLogEntry): The inputs, command and tool version of the job.
+            results (List[StageResult]): The results of the job.
+
+        Returns:
+            Dict[FilePath, str]: The hex hashes of the job's result files, `None` if
+                                they can't be hashed.
+        """
+        try:
+            outputs = hashResults(results)
+        except Exception as excp:
+            _logger.warning(
+                'error "{error}" hashing the results of build job "{name}", not saving it to the build log'.format(
+                    error=excp, name=name
+                )
+            )
+            self.remove(name)
+            return None
+
+        with self._lock:
+            self._entries[name] = {
+                "inputs": entry.inputs,
+                "command": entry.command,
+                "tool_version": entry.tool_version,
+                "outputs": outputs,
+            }
+
+        return outputs
+
+    ############################################################################
+    def remove(self, name: str) -> None:
+        """Removes the entry of the build job with the given name, if it exists.
+
+        Args:
+            name (str): The unique name of the build job.
+        """
+        with self._lock:
+            self._entries.pop(name, None)
+
+    ############################################################################
+    def getDuration(self, name: str) -> float:
+        """Returns the wall time of the last run of the build job with the given
+        name.
+
+        If the job hasn't run yet, the mean duration of all jobs of the loaded
+        log is returned.
+
+        Args:
+            name (str): The unique name of the build job.
+
+        Returns:
+            float: The duration of the job in seconds, `None` if the log doesn't
+                    contain any durations.
+        """
+        with self._lock:
+            return self._durations.get(name, self._mean_duration)
+
+    ############################################################################
+    def setDuration(self, name: str, duration: float) -> None:
+        """Saves the wall time of the build job with the given name.
+
+        Args:
+            name (str): The unique name of the build job.
+            duration (float): The duration of the job in seconds.
+        """
+        with self._lock:
+            self._durations[name] = duration
+
+    ############################################################################
+    def getMemory(self, name: str) -> int:
+        """Returns the peak memory usage of the last run of the build job with the
+        given name.
+
+        Args:
+            name (str): The unique name of the build job.
+
+        Returns:
+            int: The peak memory usage of the job in bytes, `None` if not known.
+        """
+        with self._lock:
+            return self._memory.get(name)
+
+    ############################################################################
+    def setMemory(self, name: str, memory: int) -> None:
+        """Saves the peak memory usage of the build job with the given name.
+
+        Args:
+            name (str): The unique name of the build job.
+            memory (int): The peak memory usage of the job in bytes.
+        """
+        with self._lock:
+            self._memory[name] = memory
+
+    ############################################################################
+    def save(self) -> None:
+        """Writes the log to its JSON file.
+
+        Raises:
+            BuildLogException: if the log file can't be written.
+        """
+        if self.log_path == "":
+            return
+
+        tmp_path = ".".join([self.log_path, "tmp"])
+        try:
+            with self._lock:
+                with io.open(tmp_path, mode="w", encoding="utf-8") as file:
+                    json.dump(
+                        {
+                            "file_version": ".".join(CFG_VERSION),
+                            "entries": self._entries,
+                            "durations": self._durations,
+                            "memory": self._memory,
+                        },
+                        file,
+                    )
+            os.replace(tmp_path, self.log_path)
+        except Exception as excp:
+            raise BuildLogException(excp)
+
+        _logger.info(
+            'Saved build log "{path}": {hits} jobs up to date, {misses} not, {num} entries'.format(
+                path=self.log_path,
+                hits=self.hits,
+                misses=self.misses,
+                num=len(self._entries),
+            )
+        )
+
+
+################################################################################
+def hashResults(results: List[StageResult]) -> Dict[FilePath, str]:
+    """Returns the hashes of all files of the given stage results.
+
+    Results of type `dir` are all files in the directory, results that are not a
+    file or directory, like regexes, are ignored.
+
+    Args:
+        results (List[StageResult]): The results to hash.
+
+    Raises:
+        BuildLogException: if a result directory doesn't exist.
+        FileCompareException: if a result file doesn't exist or can't be hashed.
+
+    Returns:
+        Dict[FilePath, str]: The hex hashes of all result files.
+    """
+    ret_val = {}
+    for result in results:
+        if result.type == "dir":
+            if not os.path.isdir(result.path):
+                raise BuildLogException(
+                    'result directory "{path}" does not exist'.format(path=result.path)
+                )
+            for root, _, file_names in os.walk(result.path):
+                for file_name in sorted(file_names):
+                    file_path = os.path.join(root, file_name)
+                    ret_val[file_path] = cachedHashFile(file_path)
+        elif result.type == "single_file":
+            ret_val[result.path] = cachedHashFile(result.path)
+
+    return ret_val
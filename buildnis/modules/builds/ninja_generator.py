@@ -0,0 +1,664 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     ninja_generator.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import os
+import re
+import shlex
+import subprocess  # nosec
+from typing import Dict, List, Set
+
+from buildnis.modules import BuildnisException
+from buildnis.modules.builds.artifact_cache import getStageResults
+from buildnis.modules.builds.build_graph import (
+    CALL_BUILD_TOOL_ONCE,
+    GCC_COMPILER,
+    BuildGraph,
+    StageCommand,
+    TargetKey,
+    getJobPrefix,
+    getModulePath,
+    getStageCommand,
+)
+from buildnis.modules.builds.scheduler import BuildScheduler, BuildSchedulerException
+from buildnis.modules.config import FilePath
+from buildnis.modules.helpers import LOGGER_NAME
+from buildnis.modules.helpers.execute import ExeArgs, getCommandLine
+from buildnis.modules.helpers.files import expandFileList
+
+_logger = logging.getLogger(LOGGER_NAME)
+
+NINJA_GENERATOR = "ninja"
+"""The name of the Ninja generator, the argument of `--generator`.
+"""
+
+NINJA_FILE_NAME = "build.ninja"
+"""The name of the generated Ninja build file.
+"""
+
+NINJA_OBJECT_DIR_NAME = "ninja_objects"
+"""The name of the directory of the object files of compile stages.
+"""
+
+NINJA_STAMP_DIR_NAME = "ninja_stamps"
+"""The name of the directory of the stamp files of build jobs without result
+files.
+"""
+
+ALWAYS_RUN_TARGET = "buildnis_always_run"
+"""The phony target the build statements of stages set to `always_run_build`
+depend on. It has no inputs, so it is always out of date.
+"""
+
+NINJA_RULES = """rule run
+  command = $cmd
+  description = $desc
+
+rule compile_gcc
+  command = $cmd
+  description = $desc
+  depfile = $out.d
+  deps = gcc
+
+rule compile_msvc
+  command = $cmd
+  description = $desc
+  deps = msvc
+"""
+"""The rules of the Ninja build file. `compile_gcc` and `compile_msvc` read the
+header dependencies written by the compiler.
+"""
+
+
+class NinjaGeneratorException(BuildnisException):
+    """Exception raised if the Ninja build file can't be generated or written."""
+
+
+class NinjaGenerator:
+    """Generates a Ninja build file out of the expanded project configuration.
+
+    Each build job of `BuildGraph` is a build statement in the Ninja file, with
+    the same command line that Buildnis would run, plus the include and library
+    paths of the target for GCC or MSVC compatible compilers. A stage of such a
+    compiler called for each source file writes the object file `SOURCE.o`
+    (`SOURCE.obj` for MSVC) to a directory in `NINJA_OBJECT_DIR_NAME` mirroring
+    the module's source tree, see `getObjectPath`. The compiler is called with
+    `-o OBJECT -MD -MF OBJECT.d` or `/FoOBJECT /showIncludes`, so Ninja knows the
+    headers each source file includes. Stages called once output their
+    `single_file` results. Build jobs without known result files write a stamp
+    file in `NINJA_STAMP_DIR_NAME`.
+
+    The first stage of a target runs after the last stage of all targets it
+    depends on. Compile stages only wait for them to finish (order-only
+    dependencies), other stages run again if they have changed. Each target is a
+    phony Ninja target `MODULE NAME/TARGET NAME`, and its name or alias if that is
+    unique in the project. The default targets of the project are Ninja's default
+    targets.
+
+    Attributes:
+        cfg (object): The project configuration, a `Config` instance.
+        build_dir (FilePath): The directory to write the Ninja file to, Ninja's
+                            `builddir` for its log and dependency database.
+        ninja_path (FilePath): The path to the Ninja file.
+        num_statements (int): The number of build statements of build jobs.
+
+    Methods:
+        generate: Generates the build statements of all targets.
+        write: Writes the Ninja file.
+    """
+
+    ############################################################################
+    def __init__(self, cfg: object, build_dir: FilePath) -> None:
+        """Constructor of the generator.
+
+        Args:
+            cfg (object): The project configuration.
+            build_dir (FilePath): The directory to write the Ninja file to.
+        """
+        self.cfg = cfg
+        self.build_dir = os.path.abspath(build_dir)
+        self.ninja_path = os.path.join(self.build_dir, NINJA_FILE_NAME)
+        self.num_statements = 0
+        self._build_graph = BuildGraph(cfg, BuildScheduler(num_jobs=1))
+        self._lines: List[str] = []
+        self._outputs: Dict[TargetKey, List[FilePath]] = {}
+        self._all_outputs: Set[FilePath] = set()
+
+    ############################################################################
+    def generate(self) -> None:
+        """Generates the build statements of all targets of the project.
+
+        Raises:
+            BuildSchedulerException: if targets depend on each other.
+            NinjaGeneratorException: if two build jobs have the same output.
+        """
+        self._lines = []
+        self._outputs = {}
+        self._all_outputs = set()
+        self.num_statements = 0
+
+        targets = self._build_graph.getTargets()
+        for key, _ in targets:
+            self.addTarget(key, [])
+
+        target_names = [
+            {getattr(target, "name", None), getattr(target, "alias", None)} - {None}
+            for _, target in targets
+        ]
+        names = [name for name_set in target_names for name in name_set]
+        for (key, _), name_set in zip(targets, target_names):
+            for name in sorted(name_set):
+                if (
+                    names.count(name) == 1
+                    and os.path.join(self.build_dir, name) not in self._all_outputs
+                ):
+                    self._lines.append(
+                        "build {name}: phony {prefix}".format(
+                            name=escapePath(name),
+                            prefix=escapePath(getJobPrefix(self.cfg, key)),
+                        )
+                    )
+
+        default_targets = self._build_graph.selectTargets([], False)
+        if default_targets != []:
+            self._lines.append(
+                "default {targets}".format(
+                    targets=" ".join(
+                        escapePath(getJobPrefix(self.cfg, key))
+                        for key in default_targets
+                    )
+                )
+            )
+
+    ############################################################################
+    def addTarget(self, key: TargetKey, path: List[TargetKey]) -> List[FilePath]:
+        """Generates the build statements of the given target and of all targets it
+        depends on.
+
+        Args:
+            key (TargetKey): The target to add.
+            path (List[TargetKey]): The targets depending on this target, to detect
+                                    cycles.
+
+        Raises:
+            BuildSchedulerException: if targets depend on each other.
+            NinjaGeneratorException: if two build jobs have the same output.
+
+        Returns:
+            List[FilePath]: The outputs of the target's last stage.
+        """
+        if key in self._outputs:
+            return self._outputs[key]
+        if key in path:
+            raise BuildSchedulerException(
+                'cyclic dependencies between the targets "{targets}"'.format(
+                    targets='", "'.join(
+                        getJobPrefix(self.cfg, dep) for dep in path + [key]
+                    )
+                )
+            )
+
+        dependencies: List[FilePath] = []
+        for dep_key in self._build_graph.getTargetDependencies(key):
+            for output in self.addTarget(dep_key, path + [key]):
+                if output not in dependencies:
+                    dependencies.append(output)
+
+        module = self.cfg.module_cfgs[key[0]]
+        target = module.targets[key[1]]
+        prefix = getJobPrefix(self.cfg, key)
+        stages = getattr(getattr(target, "build_tool", None), "stages", [])
+
+        outputs: List[FilePath] = []
+        previous_outputs: List[FilePath] = None
+        for stage in stages:
+            stage_prefix = "/".join([prefix, getattr(stage, "name", "")])
+            if getattr(stage, "call_build_tool", CALL_BUILD_TOOL_ONCE) == (
+                CALL_BUILD_TOOL_ONCE
+            ):
+                outputs = [
+                    self.addOnceStage(
+                        stage_prefix,
+                        module,
+                        target,
+                        stage,
+                        dependencies,
+                        previous_outputs,
+                    )
+                ]
+            else:
+                outputs = [
+                    self.addSourceStage(
+                        stage_prefix,
+                        module,
+                        target,
+                        stage,
+                        source,
+                        dependencies,
+                        previous_outputs,
+                    )
+                    for source in expandFileList(
+                        getattr(target, "sources", []), getModulePath(module)
+                    )
+                ]
+            outputs = [output for output_list in outputs for output in output_list]
+            previous_outputs = outputs
+
+        self._lines.append(
+            "build {prefix}: phony {outputs}".format(
+                prefix=escapePath(prefix),
+                outputs=" ".join(
+                    escapePath(output)
+                    for output in (dependencies if stages == [] else outputs)
+                ),
+            )
+        )
+
+        self._outputs[key] = dependencies if stages == [] else outputs
+        return self._outputs[key]
+
+    ############################################################################
+    def addSourceStage(
+        self,
+        stage_prefix: str,
+        module: object,
+        target: object,
+        stage: object,
+        source: FilePath,
+        dependencies: List[FilePath],
+        previous_outputs: List[FilePath],
+    ) -> List[FilePath]:
+        """Generates the build statement of a stage for a single source file.
+
+        The name of the build job is `stage_prefix/SOURCE`. An output argument of a
+        compiler in the stage's arguments is replaced by the object file, see
+        `getObjectPath`.
+
+        Args:
+            stage_prefix (str): The name of the stage, prefixed by the module and
+                                target name.
+            module (object): The module of the target.
+            target (object): The target the stage belongs to.
+            stage (object): The stage to run.
+            source (FilePath): The source file to call the build tool with.
+            dependencies (List[FilePath]): The outputs of the targets the target
+                                            depends on.
+            previous_outputs (List[FilePath]): The outputs of the previous stage of
+                                        the target, `None` for the first stage.
+
+        Raises:
+            NinjaGeneratorException: if the output already is the output of
+                                    another build job.
+
+        Returns:
+            List[FilePath]: The outputs of the build statement.
+        """
+        name = "/".join([stage_prefix, source])
+        command = getStageCommand(module, target, stage, source, True)
+        stage_dependencies = expandFileList(
+            getattr(stage, "dependencies", []), getModulePath(module)
+        )
+        order_only = dependencies if previous_outputs is None else []
+        implicit = stage_dependencies + (previous_outputs or [])
+
+        if command.compiler_type == "":
+            return self.addStatement(
+                name, [], "run", command, [source], implicit, order_only, stage
+            )
+
+        object_file = getObjectPath(
+            self.build_dir,
+            stage_prefix,
+            getModulePath(module),
+            source,
+            command.compiler_type,
+        )
+        arguments = removeOutputArguments(command.arguments, command.compiler_type)
+        if command.compiler_type == GCC_COMPILER:
+            arguments += ["-o", object_file, "-MD", "-MF", object_file + ".d"]
+            rule = "compile_gcc"
+        else:
+            arguments += ["/Fo" + object_file, "/showIncludes"]
+            rule = "compile_msvc"
+        command = command._replace(arguments=arguments)
+
+        return self.addStatement(
+            name, [object_file], rule, command, [source], implicit, order_only, stage
+        )
+
+    ############################################################################
+    def addOnceStage(
+        self,
+        name: str,
+        module: object,
+        target: object,
+        stage: object,
+        dependencies: List[FilePath],
+        previous_outputs: List[FilePath],
+    ) -> List[FilePath]:
+        """Generates the build statement of a stage that is called once.
+
+        Args:
+            name (str): The name of the build job.
+            module (object): The module of the target.
+            target (object): The target the stage belongs to.
+            stage (object): The stage to run.
+            dependencies (List[FilePath]): The outputs of the targets the target
+                                            depends on.
+            previous_outputs (List[FilePath]): The outputs of the previous stage of
+                                        the target, `None` for the first stage.
+
+        Raises:
+            NinjaGeneratorException: if an output already is the output of another
+                                    build job.
+
+        Returns:
+            List[FilePath]: The outputs of the build statement.
+        """
+        command = getStageCommand(module, target, stage, None, True)
+        if previous_outputs is None:
+            inputs = expandFileList(
+                getattr(target, "sources", []), getModulePath(module)
+            )
+            implicit = dependencies
+        else:
+            inputs = previous_outputs
+            implicit = []
+        implicit = expandFileList(
+            getattr(stage, "dependencies", []), getModulePath(module)
+        ) + [dependency for dependency in implicit if dependency not in inputs]
+        outputs = [
+            result.path
+            for result in getStageResults(stage)
+            if result.type == "single_file"
+        ]
+
+        return self.addStatement(
+            name, outputs, "run", command, inputs, implicit, [], stage
+        )
+
+    ############################################################################
+    def addStatement(
+        self,
+        name: str,
+        outputs: List[FilePath],
+        rule: str,
+        command: StageCommand,
+        inputs: List[FilePath],
+        implicit: List[FilePath],
+        order_only: List[FilePath],
+        stage: object,
+    ) -> List[FilePath]:
+        """Adds a build statement running the given command.
+
+        Args:
+            name (str): The name of the build job, Ninja's description.
+            outputs (List[FilePath]): The outputs, a stamp file is written if empty.
+            rule (str): The rule to use.
+            command (StageCommand): The command line to run.
+            inputs (List[FilePath]): The explicit inputs.
+            implicit (List[FilePath]): The implicit dependencies.
+            order_only (List[FilePath]): The order-only dependencies.
+            stage (object): The stage of the build job.
+
+        Raises:
+            NinjaGeneratorException: if an output already is the output of another
+                                    build job.
+
+        Returns:
+            List[FilePath]: The outputs of the build statement.
+        """
+        stamp = ""
+        if outputs == []:
+            stamp = getStampPath(self.build_dir, name)
+            outputs = [stamp]
+
+        for output in outputs:
+            if output in self._all_outputs:
+                raise NinjaGeneratorException(
+                    'output "{output}" of build job "{name}" is the output of another build job'.format(
+                        output=output, name=name
+                    )
+                )
+            self._all_outputs.add(output)
+
+        if getattr(stage, "always_run_build", False) is True:
+            implicit = implicit + [ALWAYS_RUN_TARGET]
+
+        line = ["build", " ".join(escapePath(output) for output in outputs) + ":"]
+        line.append(rule)
+        line.extend(escapePath(path) for path in inputs)
+        if implicit != []:
+            line.append("|")
+            line.extend(escapePath(path) for path in implicit)
+        if order_only != []:
+            line.append("||")
+            line.extend(escapePath(path) for path in order_only)
+
+        if command.exe_path == "":
+            cmd = getErrorCommand(
+                'build tool "{tool}" of build job "{name}" not found'.format(
+                    tool=getattr(stage, "build_tool_name", ""), name=name
+                )
+            )
+        else:
+            cmd = getNinjaCommand(
+                command, getattr(stage, "build_tool_out_dir", ""), stamp
+            )
+
+        self._lines.append(" ".join(line))
+        self._lines.append("  cmd = {cmd}".format(cmd=cmd.replace("$", "$$")))
+        self._lines.append("  desc = {name}".format(name=name.replace("$", "$$")))
+        self.num_statements += 1
+
+        return outputs
+
+    ############################################################################
+    def write(self) -> None:
+        """Writes the Ninja file.
+
+        Raises:
+            NinjaGeneratorException: if the Ninja file can't be written.
+        """
+        tmp_path = ".".join([self.ninja_path, "tmp"])
+        try:
+            with io.open(tmp_path, mode="w", encoding="utf-8") as file:
+                file.write(
+                    "# Generated by Buildnis, do not edit. Run Buildnis with\n"
+                    "# `--generator ninja` again after changing the configuration.\n\n"
+                )
+                file.write("ninja_required_version = 1.3\n")
+                file.write(
+                    "builddir = {dir}\n\n".format(dir=self.build_dir.replace("$", "$$"))
+                )
+                file.write(NINJA_RULES)
+                file.write("\nbuild {name}: phony\n\n".format(name=ALWAYS_RUN_TARGET))
+                file.write("\n".join(self._lines))
+                file.write("\n")
+            os.replace(tmp_path, self.ninja_path)
+        except Exception as excp:
+            raise NinjaGeneratorException(excp)
+
+        _logger.warning(
+            'Written Ninja build file "{path}" with {num} build statements'.format(
+                path=self.ninja_path, num=self.num_statements
+            )
+        )
+
+
+################################################################################
+def escapePath(path: FilePath) -> str:
+    """Returns the given path escaped for a Ninja build statement.
+
+    Args:
+        path (FilePath): The path to escape.
+
+    Returns:
+        str: The path with `$`, spaces and colons escaped by a `$`.
+    """
+    return path.replace("$", "$$").replace(" ", "$ ").replace(":", "$:")
+
+
+################################################################################
+def getObjectPath(
+    build_dir: FilePath,
+    stage_prefix: str,
+    module_path: FilePath,
+    source: FilePath,
+    compiler_type: str,
+) -> FilePath:
+    """Returns the path to the object file of the given source file.
+
+    The object file is `SOURCE.o` (`SOURCE.obj` for MSVC) in the directory
+    `NINJA_OBJECT_DIR_NAME/STAGE_PREFIX` of the build directory, in the same
+    subdirectory as the source file is in the module's directory. So source files
+    with the same name in different directories, or compiled by different stages,
+    have different object files. Sources outside of the module's directory use
+    their absolute path as subdirectory.
+
+    Args:
+        build_dir (FilePath): The directory of the Ninja file.
+        stage_prefix (str): The name of the stage, prefixed by the module and target
+                            name.
+        module_path (FilePath): The directory of the module.
+        source (FilePath): The path to the source file.
+        compiler_type (str): `GCC_COMPILER` or `MSVC_COMPILER`.
+
+    Returns:
+        FilePath: The path to the object file.
+    """
+    try:
+        relative = os.path.relpath(source, module_path)
+    except ValueError:
+        relative = os.pardir
+    if relative.split(os.sep)[0] == os.pardir:
+        relative = os.path.splitdrive(os.path.abspath(source))[1].lstrip("\\/")
+
+    return os.path.join(
+        build_dir,
+        NINJA_OBJECT_DIR_NAME,
+        *[re.sub(r"[^A-Za-z0-9._-]+", "_", part) for part in stage_prefix.split("/")],
+        relative + (".o" if compiler_type == GCC_COMPILER else ".obj"),
+    )
+
+
+################################################################################
+def removeOutputArguments(arguments: List[str], compiler_type: str) -> List[str]:
+    """Returns the given compiler arguments without the path to the output file,
+    `-o PATH` (`/FoPATH` or `-FoPATH` for MSVC).
+
+    Args:
+        arguments (List[str]): The arguments of the compiler.
+        compiler_type (str): `GCC_COMPILER` or `MSVC_COMPILER`.
+
+    Returns:
+        List[str]: The arguments without output path.
+    """
+    ret_val = []
+    skip_next = False
+    for argument in arguments:
+        if skip_next:
+            skip_next = False
+        elif compiler_type == GCC_COMPILER and argument == "-o":
+            skip_next = True
+        elif compiler_type != GCC_COMPILER and argument[:3] in ("/Fo", "-Fo"):
+            continue
+        else:
+            ret_val.append(argument)
+
+    return ret_val
+
+
+################################################################################
+def getStampPath(build_dir: FilePath, name: str) -> FilePath:
+    """Returns the path to the stamp file of the build job with the given name.
+
+    Args:
+        build_dir (FilePath): The directory of the Ninja file.
+        name (str): The name of the build job.
+
+    Returns:
+        FilePath: The path to the stamp file.
+    """
+    return os.path.join(
+        build_dir,
+        NINJA_STAMP_DIR_NAME,
+        "{name}_{hash}.stamp".format(
+            name=re.sub(r"[^A-Za-z0-9._-]+", "_", name)[-64:],
+            hash=hashlib.blake2b(name.encode("utf-8"), digest_size=4).hexdigest(),
+        ),
+    )
+
+
+################################################################################
+def getNinjaCommand(command: StageCommand, out_dir: FilePath, stamp: FilePath) -> str:
+    """Returns the shell command of a build statement, running the build tool in
+    its working directory and writing the stamp file afterwards.
+
+    Args:
+        command (StageCommand): The command line to run.
+        out_dir (FilePath): The output directory of the stage to create, the empty
+                            string if the stage doesn't have one.
+        stamp (FilePath): The stamp file to write, the empty string if there is
+                        no stamp file.
+
+    Returns:
+        str: The command, `/bin/sh` syntax or `cmd` syntax on Windows.
+    """
+    cmd_line = getCommandLine(
+        ExeArgs(command.exe_path, command.arguments), command.getEnvArgs()
+    )
+
+    if os.name == "nt":
+        ret_val = "cd /d {dir} && {cmd}".format(
+            dir=subprocess.list2cmdline([command.working_dir]),
+            cmd=subprocess.list2cmdline(cmd_line),
+        )
+        if out_dir != "":
+            ret_val = "(if not exist {dir} mkdir {dir}) && {cmd}".format(
+                dir=subprocess.list2cmdline([out_dir]), cmd=ret_val
+            )
+        if stamp != "":
+            ret_val += " && type nul > {stamp}".format(
+                stamp=subprocess.list2cmdline([stamp])
+            )
+        return 'cmd /c "{cmd}"'.format(cmd=ret_val)
+
+    ret_val = "cd {dir} && {cmd}".format(
+        dir=shlex.quote(command.working_dir), cmd=shlex.join(cmd_line)
+    )
+    if out_dir != "":
+        ret_val = "mkdir -p {dir} && {cmd}".format(
+            dir=shlex.quote(out_dir), cmd=ret_val
+        )
+    if stamp != "":
+        ret_val += " && touch {stamp}".format(stamp=shlex.quote(stamp))
+
+    return ret_val
+
+
+################################################################################
+def getErrorCommand(message: str) -> str:
+    """Returns a shell command that prints the given error message and fails.
+
+    Args:
+        message (str): The error message to print.
+
+    Returns:
+        str: The command, `/bin/sh` syntax or `cmd` syntax on Windows.
+    """
+    if os.name == "nt":
+        return 'cmd /c "echo {message} 1>&2 && exit /b 1"'.format(
+            message=message.replace('"', "'")
+        )
+
+    return "echo {message} >&2 && exit 1".format(message=shlex.quote(message))
@@ -0,0 +1,577 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     scheduler.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import concurrent.futures
+import heapq
+import io
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Set, Tuple
+
+from buildnis.modules import BuildnisException
+from buildnis.modules.config import config_values
+from buildnis.modules.helpers import LOGGER_NAME
+from buildnis.modules.helpers.jobserver import JobServer
+
+_logger = logging.getLogger(LOGGER_NAME)
+
+DEFAULT_DURATION: float = 1.0
+"""The estimated duration of a build job in seconds, if there is no better
+estimate.
+"""
+
+
+LOAD_POLL_INTERVAL: float = 0.5
+"""The time in seconds between checks of the load, while no new build job is
+started because the load is too high.
+"""
+
+CPU_PRESSURE_PATH = "/proc/pressure/cpu"
+"""The path to the Linux pressure stall information (PSI) of the CPU.
+"""
+
+
+class BuildSchedulerException(BuildnisException):
+    """Exception raised if the build graph isn't valid or a build job fails."""
+
+
+class BuildJob:
+    """A single job of the build graph, like a stage of a target or the call of a
+    build tool for a single source file of a stage.
+
+    Attributes:
+        name (str): The unique name of the job.
+        action (Callable[[], None]): The function to call to run the job, raises
+                                    an exception if the job fails.
+        dependencies (Set[str]): The names of the jobs that must have finished
+                                before this job can run.
+        duration (float): The estimated duration of the job in seconds.
+        memory (int): The estimated peak memory usage of the job in bytes, 0 if
+                        not known.
+    """
+
+    ############################################################################
+    def __init__(
+        self,
+        name: str,
+        action: Callable[[], None],
+        dependencies: List[str] = None,
+        duration: float = DEFAULT_DURATION,
+        memory: int = 0,
+    ) -> None:
+        """Constructor of a build job.
+
+        Args:
+            name (str): The unique name of the job.
+            action (Callable[[], None]): The function to call to run the job.
+            dependencies (List[str], optional): The names of the jobs this job
+                                    depends on. Defaults to None, no dependencies.
+            duration (float, optional): The estimated duration of the job in
+                                    seconds. Defaults to `DEFAULT_DURATION`.
+            memory (int, optional): The estimated peak memory usage of the job in
+                                    bytes. Defaults to 0, not known.
+        """
+        self.name = name
+        self.action = action
+        self.dependencies: Set[str] = (
+            set() if dependencies is None else set(dependencies)
+        )
+        self.duration = duration
+        self.memory = memory
+
+
+class BuildScheduler:
+    """Runs the jobs of a build graph, a directed acyclic graph of `BuildJob`s, on a
+    pool of worker threads.
+
+    A job is run as soon as all jobs it depends on have finished successfully.
+    Of all jobs that can run, the job with the longest path of estimated job
+    durations to the end of the build - the critical path - is started first. A
+    job is only started if the sum of the estimated memory usage of all running
+    jobs stays below `max_memory`, or if no other job is running. If a job fails,
+    no new jobs are started and the jobs already running are waited for, unless
+    `keep_going` is `True`. Then all jobs that don't depend on a failed job are run.
+
+    If a `job_server` is given, every job but one needs a token of the jobserver
+    to run, so the jobs of Buildnis and of the makes it calls, or the make calling
+    Buildnis, together don't run more jobs at the same time than the jobserver has
+    tokens plus one.
+
+    If `max_load` or `max_cpu_pressure` is set, a job is only started if no other
+    job is running or if the load average of the last minute, plus the number of
+    jobs started in the last second, is below `max_load` and the percentage of the
+    last 10 seconds that tasks have waited for a CPU is below `max_cpu_pressure`.
+
+    Attributes:
+        num_jobs (int): The maximum number of jobs to run at the same time.
+        keep_going (bool): Run all jobs not depending on a failed job after a job
+                            has failed.
+        max_memory (int): The maximum sum of the estimated memory usage of all
+                        running jobs in bytes, 0 for no limit.
+        num_memory_waits (int): The number of times a job hasn't been started
+                        because of `max_memory`.
+        job_server (JobServer): The jobserver to get a token from for each job
+                        but the first, `None` if no jobserver is used.
+        max_load (float): The load average to not start new jobs at, 0 for no
+                        limit.
+        max_cpu_pressure (float): The CPU pressure in percent to not start new
+                        jobs at, 0 for no limit.
+        num_load_waits (int): The number of times jobs haven't been started
+                        because of `max_load` or `max_cpu_pressure`.
+        load_wait_time (float): The time in seconds no job has been started
+                        because of `max_load` or `max_cpu_pressure`.
+        jobs (Dict[str, BuildJob]): The jobs of the build graph.
+        succeeded (List[str]): The names of the jobs that have succeeded, in the
+                            order they have finished.
+        failed (List[str]): The names of the jobs that have failed.
+        skipped (List[str]): The names of the jobs that haven't been run because a
+                            job has failed.
+
+    Methods:
+        addJob: Adds a job to the build graph.
+        checkGraph: Checks that all dependencies exist and that there is no cycle.
+        getPriorities: Returns the length of the critical path of each job.
+        run: Runs all jobs of the build graph.
+        isOverloaded: Checks if the load or CPU pressure is too high to start a
+                    job.
+    """
+
+    ############################################################################
+    def __init__(
+        self,
+        num_jobs: int = 0,
+        keep_going: bool = False,
+        max_memory: int = 0,
+        job_server: JobServer = None,
+        max_load: float = 0.0,
+        max_cpu_pressure: float = 0.0,
+    ) -> None:
+        """Constructor of the scheduler.
+
+        Args:
+            num_jobs (int, optional): The maximum number of jobs to run at the same
+                            time. Defaults to 0, the number of CPUs this process
+                            may use, `config_values.HOST_EFFECTIVE_CPUS`.
+            keep_going (bool, optional): Run all jobs not depending on a failed job
+                            after a job has failed. Defaults to False, stop at the
+                            first failure.
+            max_memory (int, optional): The maximum sum of the estimated memory
+                            usage of all running jobs in bytes. Defaults to 0, no
+                            limit.
+            job_server (JobServer, optional): The jobserver to get the tokens to
+                            run jobs from. Defaults to None, no jobserver.
+            max_load (float, optional): The load average to not start new jobs at.
+                            Defaults to 0.0, no limit.
+            max_cpu_pressure (float, optional): The CPU pressure in percent to not
+                            start new jobs at. Defaults to 0.0, no limit.
+        """
+        if num_jobs <= 0:
+            num_jobs = int(config_values.HOST_EFFECTIVE_CPUS)
+        self.num_jobs = max(1, num_jobs)
+        self.keep_going = keep_going
+        self.max_memory = max_memory
+        self.num_memory_waits = 0
+        self.job_server = job_server
+        self._has_implicit_token = True
+        self._token_lock = threading.Lock()
+        self.max_load = max_load
+        self.max_cpu_pressure = max_cpu_pressure
+        self.num_load_waits = 0
+        self.load_wait_time = 0.0
+        self._start_times: List[float] = []
+        self.jobs: Dict[str, BuildJob] = {}
+        self.succeeded: List[str] = []
+        self.failed: List[str] = []
+        self.skipped: List[str] = []
+
+    ############################################################################
+    def addJob(self, job: BuildJob) -> None:
+        """Adds the given job to the build graph.
+
+        Args:
+            job (BuildJob): The job to add.
+
+        Raises:
+            BuildSchedulerException: if a job with the same name already exists.
+        """
+        if job.name in self.jobs:
+            raise BuildSchedulerException(
+                'build job "{name}" already exists'.format(name=job.name)
+            )
+        self.jobs[job.name] = job
+
+    ############################################################################
+    def checkGraph(self) -> Dict[str, List[str]]:
+        """Checks that all dependencies of the jobs exist and that the build graph
+        doesn't contain a cycle.
+
+        Raises:
+            BuildSchedulerException: if a dependency doesn't exist or the jobs
+                                    depend on each other.
+
+        Returns:
+            Dict[str, List[str]]: The names of the jobs depending on each job.
+        """
+        dependents: Dict[str, List[str]] = {name: [] for name in self.jobs}
+        for job in self.jobs.values():
+            for dependency in job.dependencies:
+                if dependency not in self.jobs:
+                    raise BuildSchedulerException(
+                        'build job "{name}" depends on the unknown job "{dep}"'.format(
+                            name=job.name, dep=dependency
+                        )
+                    )
+                dependents[dependency].append(job.name)
+
+        num_deps = {name: len(job.dependencies) for name, job in self.jobs.items()}
+        ready = [name for name, num in num_deps.items() if num == 0]
+        num_sorted = 0
+        while ready:
+            name = ready.pop()
+            num_sorted += 1
+            for dependent in dependents[name]:
+                num_deps[dependent] -= 1
+                if num_deps[dependent] == 0:
+                    ready.append(dependent)
+
+        if num_sorted != len(self.jobs):
+            raise BuildSchedulerException(
+                'cyclic dependencies between the build jobs "{jobs}"'.format(
+                    jobs='", "'.join(
+                        sorted(name for name, num in num_deps.items() if num > 0)
+                    )
+                )
+            )
+
+        return dependents
+
+    ############################################################################
+    def getPriorities(self, dependents: Dict[str, List[str]]) -> Dict[str, float]:
+        """Returns the length of the critical path of each job, the longest sum of
+        the estimated durations of the job and the jobs depending on it, down to
+        a job no other job depends on.
+
+        Args:
+            dependents (Dict[str, List[str]]): The names of the jobs depending on
+                                            each job, returned by `checkGraph`.
+
+        Returns:
+            Dict[str, float]: The length of the critical path in seconds of each
+                            job.
+        """
+        ret_val: Dict[str, float] = {}
+        num_dependents = {name: len(names) for name, names in dependents.items()}
+        ready = [name for name, num in num_dependents.items() if num == 0]
+        while ready:
+            name = ready.pop()
+            ret_val[name] = self.jobs[name].duration + max(
+                (ret_val[dependent] for dependent in dependents[name]), default=0.0
+            )
+            for dependency in self.jobs[name].dependencies:
+                num_dependents[dependency] -= 1
+                if num_dependents[dependency] == 0:
+                    ready.append(dependency)
+
+        return ret_val
+
+    ############################################################################
+    def run(self) -> bool:
+        """Runs all jobs of the build graph, at most `num_jobs` at the same time.
+
+        Raises:
+            BuildSchedulerException: if the build graph isn't valid.
+
+        Returns:
+            bool: `True` if all jobs have succeeded, `False` if a job has failed.
+        """
+        dependents = self.checkGraph()
+        priorities = self.getPriorities(dependents)
+        num_deps = {name: len(job.dependencies) for name, job in self.jobs.items()}
+        ready = [
+            (-priorities[name], name) for name, num in num_deps.items() if num == 0
+        ]
+        heapq.heapify(ready)
+        running: Dict[concurrent.futures.Future, str] = {}
+        used_memory = 0
+        do_stop = False
+        throttled_since: float = None
+
+        start_time = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.num_jobs, thread_name_prefix="BuildScheduler"
+        ) as executor:
+            while running or (ready and not do_stop):
+                is_throttled = False
+                while ready and not do_stop and len(running) < self.num_jobs:
+                    if running and self.isOverloaded():
+                        is_throttled = True
+                        break
+                    name = self.popNextJob(ready, used_memory, len(running))
+                    if name is None:
+                        break
+                    used_memory += self.jobs[name].memory
+                    _logger.info('Starting build job "{name}"'.format(name=name))
+                    running[executor.submit(self.runJobWithToken, self.jobs[name])] = (
+                        name
+                    )
+                    self._start_times.append(time.monotonic())
+
+                if is_throttled and throttled_since is None:
+                    throttled_since = time.monotonic()
+                    self.num_load_waits += 1
+                elif not is_throttled and throttled_since is not None:
+                    self.load_wait_time += time.monotonic() - throttled_since
+                    throttled_since = None
+
+                done, _ = concurrent.futures.wait(
+                    running,
+                    timeout=LOAD_POLL_INTERVAL if is_throttled else None,
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                for future in done:
+                    name = running.pop(future)
+                    used_memory -= self.jobs[name].memory
+                    if future.result():
+                        self.succeeded.append(name)
+                        for dependent in dependents[name]:
+                            num_deps[dependent] -= 1
+                            if num_deps[dependent] == 0:
+                                heapq.heappush(
+                                    ready, (-priorities[dependent], dependent)
+                                )
+                    else:
+                        self.failed.append(name)
+                        do_stop = not self.keep_going
+
+        if throttled_since is not None:
+            self.load_wait_time += time.monotonic() - throttled_since
+
+        finished = set(self.succeeded) | set(self.failed)
+        self.skipped = sorted(name for name in self.jobs if name not in finished)
+
+        _logger.info(
+            "Build jobs: {num_ok} succeeded, {num_failed} failed, {num_skipped} not run, took {time:.3f} s".format(
+                num_ok=len(self.succeeded),
+                num_failed=len(self.failed),
+                num_skipped=len(self.skipped),
+                time=time.perf_counter() - start_time,
+            )
+        )
+        if self.num_memory_waits > 0:
+            _logger.info(
+                "Build jobs waited {num} times for memory, limit {limit} MiB".format(
+                    num=self.num_memory_waits, limit=self.max_memory // (1024 * 1024)
+                )
+            )
+
+        if self.num_load_waits > 0:
+            _logger.info(
+                "Build jobs waited {num} times for {time:.3f} s for the load to drop, max load {load}, max CPU pressure {pressure}%".format(
+                    num=self.num_load_waits,
+                    time=self.load_wait_time,
+                    load=self.max_load,
+                    pressure=self.max_cpu_pressure,
+                )
+            )
+
+        return self.failed == []
+
+    ############################################################################
+    def isOverloaded(self) -> bool:
+        """Returns `True` if the load or the CPU pressure is too high to start a
+        new job.
+
+        The load average of the last minute lags behind, so the number of jobs
+        started in the last second is added to it, like GNU make does. The CPU
+        pressure is the average of the last 10 seconds.
+
+        Returns:
+            bool: `True` if the load is at least `max_load` or the CPU pressure is
+                    at least `max_cpu_pressure`, `False` else or if the load isn't
+                    available on this OS.
+        """
+        if self.max_load > 0:
+            now = time.monotonic()
+            self._start_times = [
+                start_time for start_time in self._start_times if now - start_time < 1
+            ]
+            load = getLoad()
+            if load is not None and load + len(self._start_times) >= self.max_load:
+                return True
+
+        if self.max_cpu_pressure > 0:
+            pressure = getCpuPressure()
+            if pressure is not None and pressure >= self.max_cpu_pressure:
+                return True
+
+        return False
+
+    ############################################################################
+    def popNextJob(
+        self, ready: List[Tuple[float, str]], used_memory: int, num_running: int
+    ) -> str:
+        """Removes the job to start next from the heap of jobs that are ready to run
+        and returns its name.
+
+        This is the job with the longest critical path, whose estimated memory
+        usage fits in the memory not used by the running jobs. If no job is
+        running, the job with the longest critical path is always returned.
+
+        Args:
+            ready (List[Tuple[float, str]]): The heap of the negative critical path
+                                        lengths and names of the jobs to start.
+            used_memory (int): The sum of the estimated memory usage of the running
+                                jobs in bytes.
+            num_running (int): The number of running jobs.
+
+        Returns:
+            str: The name of the job to start, `None` if no job fits in the
+                available memory.
+        """
+        if self.max_memory <= 0 or num_running == 0:
+            return heapq.heappop(ready)[1]
+
+        ret_val = None
+        skipped = []
+        while ready:
+            item = heapq.heappop(ready)
+            if used_memory + self.jobs[item[1]].memory <= self.max_memory:
+                ret_val = item[1]
+                break
+            skipped.append(item)
+
+        for item in skipped:
+            heapq.heappush(ready, item)
+
+        if ret_val is None:
+            self.num_memory_waits += 1
+
+        return ret_val
+
+    ############################################################################
+    def runJobWithToken(self, job: BuildJob) -> bool:
+        """Runs the given job holding a token of the jobserver, called from the
+        worker threads.
+
+        The first job takes the implicit token of this process, every other job
+        waits until it has read a token from the jobserver. The token is given
+        back after the job has finished.
+
+        Args:
+            job (BuildJob): The job to run.
+
+        Returns:
+            bool: `True` if the job has succeeded, `False` if it has failed or no
+                    token could be read.
+        """
+        if self.job_server is None:
+            return self.runJob(job)
+
+        with self._token_lock:
+            uses_implicit_token = self._has_implicit_token
+            self._has_implicit_token = False
+
+        token = None
+        try:
+            if not uses_implicit_token:
+                token = self.job_server.acquire()
+        except Exception as excp:
+            _logger.error(
+                'error "{error}" getting a jobserver token for build job "{name}"'.format(
+                    error=excp, name=job.name
+                )
+            )
+            return False
+
+        try:
+            return self.runJob(job)
+        finally:
+            if uses_implicit_token:
+                with self._token_lock:
+                    self._has_implicit_token = True
+            else:
+                try:
+                    self.job_server.release(token)
+                except Exception as excp:
+                    _logger.error(
+                        'error "{error}" giving back the jobserver token of build job "{name}"'.format(
+                            error=excp, name=job.name
+                        )
+                    )
+
+    ############################################################################
+    @staticmethod
+    def runJob(job: BuildJob) -> bool:
+        """Runs the given job, called from the worker threads.
+
+        Args:
+            job (BuildJob): The job to run.
+
+        Returns:
+            bool: `True` if the job has succeeded, `False` if it has failed.
+        """
+        start_time = time.perf_counter()
+        try:
+            job.action()
+        except Exception as excp:
+            _logger.error(
+                'error "{error}" running build job "{name}"'.format(
+                    error=excp, name=job.name
+                )
+            )
+            return False
+
+        _logger.info(
+            'Build job "{name}" took {time:.3f} s'.format(
+                name=job.name, time=time.perf_counter() - start_time
+            )
+        )
+        return True
+
+
+################################################################################
+def getLoad() -> float:
+    """Returns the load average of the last minute.
+
+    Returns:
+        float: The number of processes in the run queue averaged over the last
+                minute, `None` if not available on this OS.
+    """
+    try:
+        return os.getloadavg()[0]
+    except (AttributeError, OSError):
+        return None
+
+
+################################################################################
+def getCpuPressure() -> float:
+    """Returns the percentage of the last 10 seconds that at least one task has
+    waited for a CPU, the `some avg10` value of the Linux pressure stall
+    information.
+
+    Returns:
+        float: The CPU pressure in percent, `None` if the pressure stall
+                information is not available.
+    """
+    try:
+        with io.open(CPU_PRESSURE_PATH, mode="r", encoding="utf-8") as file:
+            for line in file:
+                fields = line.split()
+                if fields and fields[0] == "some":
+                    for field in fields[1:]:
+                        name, _, value = field.partition("=")
+                        if name == "avg10":
+                            return float(value)
+    except (OSError, ValueError):
+        pass
+
+    return None
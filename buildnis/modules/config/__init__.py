@@ -11,6 +11,11 @@ __all__ = [
     "MODULE_FILE_NAME",
     "BUILD_FILE_NAME",
     "HOST_FILE_NAME",
+    "HASH_CACHE_FILE_NAME",
+    "ENV_CACHE_FILE_NAME",
+    "BUILD_LOG_FILE_NAME",
+    "CONFIG_SNAPSHOT_FILE_NAME",
+    "ARTIFACT_CACHE_DIR_NAME",
     "BUILD_TOOL_CONFIG_NAME",
     "CFG_DIR_NAME",
     "CFG_VERSION",
@@ -30,6 +35,8 @@ __all__ = [
     "config",
     "configure_build",
     "config_files",
+    "config_records",
+    "config_snapshot",
     "host",
     "host_linux",
     "host_windows",
@@ -71,10 +78,15 @@ class CmdOutput(NamedTuple):
     Attributes:
         std_out (str): the `stdout` output of the executed command
         err_out (str): the `stderr` output of the executed command
+        return_code (int): the exit code of the executed command
+        max_rss (int): the peak memory usage (resident set size) of the executed
+                        command and its child processes in bytes, 0 if not known
     """
 
     std_out: str = ""
     err_out: str = ""
+    return_code: int = 0
+    max_rss: int = 0
 
 
 OSX_NAME_DICT = {
@@ -114,6 +126,16 @@ CFG_DIR_NAME = "cfg_dir_config"
 
 HOST_FILE_NAME = "host_config"
 
+HASH_CACHE_FILE_NAME = "hash_cache"
+
+ENV_CACHE_FILE_NAME = "env_cache"
+
+BUILD_LOG_FILE_NAME = "build_log"
+
+CONFIG_SNAPSHOT_FILE_NAME = "config_snapshot"
+
+ARTIFACT_CACHE_DIR_NAME = "artifact_cache"
+
 WINDOWS_OS_STRING = "Windows"
 
 LINUX_OS_STRING = "Linux"
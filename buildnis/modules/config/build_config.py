@@ -11,6 +11,7 @@ from __future__ import annotations
 from typing import List
 
 from buildnis.modules.config import BUILD_FILE_NAME, FilePath
+from buildnis.modules.config.config_records import STAGE_ATTRIBUTES
 from buildnis.modules.config.json_base_class import JSONBaseClass, setAttrIfNotExist
 from buildnis.modules.helpers.file_compare import FileCompare
 from buildnis.modules.helpers.files import returnExistingFile
@@ -77,13 +78,8 @@ class BuildCfg(JSONBaseClass):
     ############################################################################
     def initStages(self) -> None:
         """Sets all needed attributes of a stage."""
-        must_have_attrs = {
-            "name": "",
-            "build_tool_name": "",
-            "results": [],
-        }
         for item in self.stages:
-            setAttrIfNotExist(instance=item, attributes=must_have_attrs)
+            setAttrIfNotExist(instance=item, attributes=STAGE_ATTRIBUTES)
 
     ############################################################################
     @classmethod
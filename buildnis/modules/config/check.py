@@ -8,31 +8,46 @@
 
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
+import hashlib
+import io
 import json
 import os
 import pathlib
+import shutil
 import sys
-from types import SimpleNamespace
-from typing import Any
+import time
+from typing import Any, Dict, List, Tuple
 
 from buildnis.modules import EXT_ERR_DIR, MODULE_DIR_PATH
 from buildnis.modules.config import (
     BUILD_TOOL_CONFIG_NAME,
+    CFG_VERSION,
     CONFIGURE_SCRIPTS_PATH,
     LINUX_OS_STRING,
     OSX_OS_STRING,
     Arch,
     FilePath,
     OSName,
+    config_values,
+)
+from buildnis.modules.config.config_records import (
+    BUILD_TOOL_ATTRIBUTES,
+    BUILD_TOOL_REQUIRED,
+    recordFromDict,
 )
 from buildnis.modules.config.json_base_class import JSONBaseClass, setAttrIfNotExist
+from buildnis.modules.helpers.env_cache import getEnvCache
 from buildnis.modules.helpers.execute import (
+    COMMAND_TIMEOUT,
     EnvArgs,
     ExeArgs,
     RunRegex,
-    doesExecutableWork,
+    doesExecutableWorkAsync,
     runCommand,
 )
+from buildnis.modules.helpers.hash_cache import cachedHashFile, getStatKey
 
 
 class Check(JSONBaseClass):
@@ -56,30 +71,46 @@ class Check(JSONBaseClass):
     * `env_script_arg`      The argument to call the environment script with
     * `is_checked`          Has the executable been run and the version output been
                             parsed?
+    * `version_timeout`     Optional: the timeout in seconds of the call to get the
+                            version, the default is 120 seconds
 
     Attributes:
         os_name (OSName): the OS we are building for
         arch (Arch): the CPU architecture we are building for
         build_tool_cfgs (list): the list of build tool configurations returned from
                         the script_paths in `configure_script_paths/OS`
+        version_probes (Dict[str, str]): the versions of the checked build tools,
+                        keyed by the fingerprint of the executable and of the
+                        arguments to get the version, see `getVersionProbeKey`
 
     Methods:
+        runScripts: runs the build tool configure scripts concurrently
+        runScript: runs a single build tool configure script
         isBuildToolCfgOK: checks if the build tool config has the minimum
                             needed attributes
         checkVersions: runs all build tools with the version argument, to check
                         if the executable works
+        checkVersionsAsync: runs all build tools with the version argument
+                        concurrently as asyncio subprocesses
     """
 
     ###########################################################################
     def __init__(
-        self, os_name: OSName, arch: Arch, user_path: FilePath, do_check: bool = True
+        self,
+        os_name: OSName,
+        arch: Arch,
+        user_path: FilePath,
+        do_check: bool = True,
+        num_jobs: int = 0,
+        version_probes: Dict[str, str] = None,
     ) -> None:
         """Constructor of Check, runs all build tool script_paths in
         `configure_script_paths`.
 
         All build tool script_paths in the `os` subdirectory of `configure_script_paths`
         are run, the CPU architecture `arch` is passed as an argument to each
-        script_path.
+        script_path. The scripts are run concurrently, using at most `num_jobs`
+        worker threads.
 
         Args:
             os_name (OSName): The OS we are building for
@@ -88,6 +119,12 @@ class Check(JSONBaseClass):
                                 scripts, passed as a command-line argument.
             do_check (bool): Whether to run all scripts in `configure_script_paths` or
                             not.
+            num_jobs (int): The maximum number of scripts and build tools to run at
+                            the same time. Defaults to 0, see `getNumJobs`.
+            version_probes (Dict[str, str]): The versions of build tools checked by a
+                            previous run, see `loadVersionProbes`. Build tools with
+                            an unchanged fingerprint are not run again. Defaults to
+                            `None`, run all build tools.
         """
         super().__init__(
             config_file_name=BUILD_TOOL_CONFIG_NAME, config_name="build tools"
@@ -96,6 +133,7 @@ class Check(JSONBaseClass):
         self.os = os_name
         self.arch = arch
         self.build_tool_cfgs = []
+        self.version_probes = {}
 
         if do_check:
             sys_configure_path = "/".join([MODULE_DIR_PATH, CONFIGURE_SCRIPTS_PATH])
@@ -111,17 +149,25 @@ class Check(JSONBaseClass):
                 )
                 script_paths.append(user_script_path)
 
+            scripts = []
             for script_dir in script_paths:
-                self.runScriptsInDir(script_dir)
+                scripts.extend(self.getScriptsInDir(script_dir))
+
+            self.runScripts(scripts, num_jobs)
 
-            self.checkVersions()
+            self.checkVersions(num_jobs, version_probes)
 
     ############################################################################
-    def runScriptsInDir(self, working_dir: pathlib.Path) -> None:
-        """Runs all build tool config scripts in the given path.
+    def getScriptsInDir(self, working_dir: pathlib.Path) -> List[pathlib.Path]:
+        """Returns the paths to all build tool config scripts in the given path,
+        sorted by name.
 
         Args:
-            working_dir (pathlib.Path): The path in which to run the build tool scripts.
+            working_dir (pathlib.Path): The path in which to search for build tool
+                                        scripts.
+
+        Returns:
+            List[pathlib.Path]: The sorted list of paths to the scripts.
         """
         if not working_dir.is_dir():
             self._logger.critical(
@@ -131,42 +177,46 @@ class Check(JSONBaseClass):
             )
             sys.exit(EXT_ERR_DIR)
 
-        for script_path in working_dir.glob("*"):
-            try:
-                self.runScript(script_path)
-            except Exception as excp:
-                self._logger.error(
-                    'error "{error}" build tool filename "{cfg}" not valid'.format(
-                        error=excp, cfg=script_path
-                    )
-                )
+        return sorted(path for path in working_dir.glob("*") if path.is_file())
 
     ############################################################################
-    def runScript(self, script_path: pathlib.Path) -> None:
-        """Runs the script at the given path and saves it's output.
+    def runScripts(self, scripts: List[pathlib.Path], num_jobs: int = 0) -> None:
+        """Runs the given build tool config scripts concurrently.
+
+        The build tool configurations returned by the scripts are added to
+        `build_tool_cfgs` in the order of the scripts in `scripts`, regardless of
+        the order in which the scripts finish.
 
         Args:
-            script_path (pathlib.Path): The path to the script to run.
+            scripts (List[pathlib.Path]): The paths to the scripts to run.
+            num_jobs (int, optional): The maximum number of scripts to run at the same
+                                time. Defaults to 0, see `getNumJobs`.
         """
-        if script_path.is_file():
-            self._logger.warning(
-                'Calling build tool config script "{path}"'.format(path=script_path)
-            )
+        num_jobs = getNumJobs(num_jobs)
+
+        start_time = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=num_jobs) as executor:
+            futures = [
+                executor.submit(self.runScript, script_path) for script_path in scripts
+            ]
+
+        for script_path, future in zip(scripts, futures):
             try:
-                script_out = runCommand(
-                    exe_args=ExeArgs(script_path.__str__(), [self.arch])
-                )
-                build_tool_cfg = json.loads(
-                    script_out.std_out,
-                    object_hook=lambda dict: SimpleNamespace(**dict),
-                )
+                build_tools, run_time = future.result()
             except Exception as excp:
                 self._logger.error(
-                    'error "{error}" running build tool script "{path}"'.format(
-                        error=excp, path=script_path
+                    'error "{error}" build tool filename "{cfg}" not valid'.format(
+                        error=excp, cfg=script_path
                     )
                 )
-            for item in build_tool_cfg.build_tools:
+                continue
+
+            self._logger.info(
+                'Build tool config script "{path}" took {time:.3f} s'.format(
+                    path=script_path, time=run_time
+                )
+            )
+            for item in build_tools:
                 if self.isBuildToolCfgOK(item):
                     self.build_tool_cfgs.append(item)
                 else:
@@ -176,6 +226,49 @@ class Check(JSONBaseClass):
                         )
                     )
 
+        self._logger.info(
+            "Running {num} build tool config scripts took {time:.3f} s".format(
+                num=len(scripts), time=time.perf_counter() - start_time
+            )
+        )
+
+    ############################################################################
+    def runScript(self, script_path: pathlib.Path) -> Tuple[List[object], float]:
+        """Runs the script at the given path and returns the build tool
+        configurations of it's output.
+
+        Called from the worker threads of `runScripts`.
+
+        Args:
+            script_path (pathlib.Path): The path to the script to run.
+
+        Returns:
+            Tuple[List[object], float]: The build tool configurations the script
+                    returned, an empty list on errors, and the run time of the
+                    script in seconds.
+        """
+        self._logger.warning(
+            'Calling build tool config script "{path}"'.format(path=script_path)
+        )
+        start_time = time.perf_counter()
+        try:
+            script_out = runCommand(
+                exe_args=ExeArgs(script_path.__str__(), [self.arch])
+            )
+            build_tool_cfg = json.loads(
+                script_out.std_out,
+                object_hook=recordFromDict,
+            )
+        except Exception as excp:
+            self._logger.error(
+                'error "{error}" running build tool script "{path}"'.format(
+                    error=excp, path=script_path
+                )
+            )
+            return [], time.perf_counter() - start_time
+
+        return build_tool_cfg.build_tools, time.perf_counter() - start_time
+
     ############################################################################
     def isBuildToolCfgOK(self, cfg: Any) -> bool:
         """Checks if the given object has all the needed attributes of a build
@@ -189,78 +282,142 @@ class Check(JSONBaseClass):
                   False else
         """
         # TODO add 'provides' (like "C++", "Java", "Python")
-        must_have_attrs = ["name", "build_tool_exe", "version_regex"]
-
-        for attr in must_have_attrs:
+        for attr in BUILD_TOOL_REQUIRED:
             if not hasattr(cfg, attr):
                 self._logger.error(
                     'build config has no attribute "{name}"'.format(name=attr)
                 )
                 return False
 
-        must_have_attribs = {
-            "name_long": "",
-            "version": "",
-            "install_path": "",
-            "env_script": "",
-            "env_script_arg": "",
-            "version_arg": "",
-        }
-        setAttrIfNotExist(instance=cfg, attributes=must_have_attribs)
+        setAttrIfNotExist(instance=cfg, attributes=BUILD_TOOL_ATTRIBUTES)
 
         return True
 
     ############################################################################
-    def checkVersions(self) -> None:
+    def checkVersions(
+        self, num_jobs: int = 0, version_probes: Dict[str, str] = None
+    ) -> None:
         """Runs all configured build tools with the 'show version' argument.
 
         To check, if the configured build tools exist and are working, try to
         execute each with the argument to get the version string of the build
-        tool.
+        tool. The build tools are run concurrently as asyncio subprocesses, see
+        `checkVersionsAsync`.
+
+        Args:
+            num_jobs (int, optional): The maximum number of build tools to run at the
+                                same time. Defaults to 0, see `getNumJobs`.
+            version_probes (Dict[str, str], optional): The versions of build tools
+                                checked by a previous run. Defaults to `None`.
         """
-        for tool in self.build_tool_cfgs:
-            if tool.build_tool_exe == "":
-                self._logger.error(
-                    'build tool "{name}" has no executable configured!'.format(
-                        name=tool.name
-                    )
-                )
-                continue
+        asyncio.run(self.checkVersionsAsync(num_jobs, version_probes))
 
-            exe_path = tool.build_tool_exe
+    ############################################################################
+    async def checkVersionsAsync(
+        self, num_jobs: int = 0, version_probes: Dict[str, str] = None
+    ) -> None:
+        """Runs all configured build tools with the 'show version' argument
+        concurrently, at most `num_jobs` at the same time.
 
-            # has environment script to call
-            if tool.env_script != "":
-                self._logger.info(
-                    '"{name}": calling environment script "{script}".'.format(
-                        name=tool.name, script=tool.env_script
-                    )
-                )
+        Args:
+            num_jobs (int, optional): The maximum number of build tools to run at the
+                                same time. Defaults to 0, see `getNumJobs`.
+            version_probes (Dict[str, str], optional): The versions of build tools
+                                checked by a previous run. Defaults to `None`.
+        """
+        num_jobs = getNumJobs(num_jobs)
+        if version_probes is None:
+            version_probes = {}
+
+        semaphore = asyncio.Semaphore(num_jobs)
+        start_time = time.perf_counter()
+        await asyncio.gather(
+            *(
+                self.checkVersion(tool, semaphore, version_probes)
+                for tool in self.build_tool_cfgs
+            )
+        )
+        self._logger.info(
+            "Checking the versions of {num} build tools took {time:.3f} s".format(
+                num=len(self.build_tool_cfgs), time=time.perf_counter() - start_time
+            )
+        )
 
-            # has full path (so maybe not in PATH)
-            elif tool.install_path != "":
-                exe_path = os.path.normpath(
-                    "/".join([tool.install_path, tool.build_tool_exe])
+    ############################################################################
+    async def checkVersion(
+        self,
+        tool: object,
+        semaphore: asyncio.Semaphore,
+        version_probes: Dict[str, str] = None,
+    ) -> None:
+        """Runs the build tool with the 'show version' argument and sets the
+        attributes `version` and `is_checked` of the build tool configuration.
+
+        If the fingerprint of the build tool is contained in `version_probes`, the
+        version is taken from there and the build tool isn't run.
+
+        Args:
+            tool (object): The build tool configuration to check.
+            semaphore (asyncio.Semaphore): The semaphore limiting the number of build
+                                        tools run at the same time.
+            version_probes (Dict[str, str], optional): The versions of build tools
+                                checked by a previous run. Defaults to `None`.
+        """
+        if tool.build_tool_exe == "":
+            self._logger.error(
+                'build tool "{name}" has no executable configured!'.format(
+                    name=tool.name
                 )
-                self._logger.info(
-                    '"{name}": using path "{path}".'.format(
-                        name=tool.name, path=exe_path
-                    )
+            )
+            return
+
+        exe_path = tool.build_tool_exe
+
+        # has environment script to call
+        if tool.env_script != "":
+            self._logger.info(
+                '"{name}": calling environment script "{script}".'.format(
+                    name=tool.name, script=tool.env_script
                 )
+            )
 
-            # no full path given, so it hopefully is in PATH
-            else:
-                self._logger.info(
-                    '"{name}": checking if executable "{exe}" is in PATH.'.format(
-                        name=tool.name, exe=tool.build_tool_exe
-                    )
+        # has full path (so maybe not in PATH)
+        elif tool.install_path != "":
+            exe_path = os.path.normpath(
+                "/".join([tool.install_path, tool.build_tool_exe])
+            )
+            self._logger.info(
+                '"{name}": using path "{path}".'.format(name=tool.name, path=exe_path)
+            )
+
+        # no full path given, so it hopefully is in PATH
+        else:
+            self._logger.info(
+                '"{name}": checking if executable "{exe}" is in PATH.'.format(
+                    name=tool.name, exe=tool.build_tool_exe
                 )
+            )
 
-            try:
+        source_env_script = self.os in (LINUX_OS_STRING, OSX_OS_STRING)
+        try:
 
-                source_env_script = self.os in (LINUX_OS_STRING, OSX_OS_STRING)
+            async with semaphore:
+                # may source the environment script, so not in the event loop
+                probe_key = await asyncio.to_thread(
+                    getVersionProbeKey, tool, exe_path, source_env_script
+                )
+                if version_probes is not None and probe_key in version_probes:
+                    tool.version = version_probes[probe_key]
+                    tool.is_checked = True
+                    self.version_probes[probe_key] = tool.version
+                    self._logger.info(
+                        '"{name}": executable "{exe}" unchanged, version "{version}"'.format(
+                            name=tool.name, exe=exe_path, version=tool.version
+                        )
+                    )
+                    return
 
-                tool.version = doesExecutableWork(
+                tool.version = await doesExecutableWorkAsync(
                     exe_args=ExeArgs(exe_path, [tool.version_arg]),
                     env_args=EnvArgs(
                         tool.env_script,
@@ -268,19 +425,22 @@ class Check(JSONBaseClass):
                         source_env_script,
                     ),
                     check_regex=RunRegex(tool.version_regex, 1),
+                    timeout=getattr(tool, "version_timeout", COMMAND_TIMEOUT),
                 )
-                if tool.version != "":
-                    tool.is_checked = True
+            if tool.version != "":
+                tool.is_checked = True
+                if probe_key is not None:
+                    self.version_probes[probe_key] = tool.version
 
-            except Exception as excp:
-                self._logger.error(
-                    'error "{error}" parsing version of "{exe} {opt}" using version regex "{regex}"'.format(
-                        error=excp,
-                        exe=exe_path,
-                        opt=tool.version_arg,
-                        regex=tool.version_regex,
-                    )
+        except Exception as excp:
+            self._logger.error(
+                'error "{error}" parsing version of "{exe} {opt}" using version regex "{regex}"'.format(
+                    error=excp,
+                    exe=exe_path,
+                    opt=tool.version_arg,
+                    regex=tool.version_regex,
                 )
+            )
 
     ############################################################################
     def searchBuildTool(self, name: str) -> object:
@@ -306,3 +466,110 @@ class Check(JSONBaseClass):
             )
 
         return None
+
+
+################################################################################
+def getNumJobs(num_jobs: int) -> int:
+    """Returns the number of configure scripts and build tools to run at the same
+    time.
+
+    Like the default of `concurrent.futures.ThreadPoolExecutor`, but using the
+    number of CPUs this process may use, `config_values.HOST_EFFECTIVE_CPUS`,
+    instead of all CPUs of the host.
+
+    Args:
+        num_jobs (int): The number of jobs given on the command line, 0 for the
+                        default.
+
+    Returns:
+        int: `num_jobs` if it is greater than 0, else the number of effective CPUs
+                plus 4, but at most 32.
+    """
+    if num_jobs > 0:
+        return num_jobs
+
+    return min(32, int(config_values.HOST_EFFECTIVE_CPUS) + 4)
+
+
+################################################################################
+def getVersionProbeKey(
+    tool: object, exe_path: FilePath, source_env_script: bool
+) -> str:
+    """Returns the fingerprint of the version check of the given build tool.
+
+    The fingerprint is the BLAKE2 hash of the resolved path to the executable, its
+    `stat` data (device, inode, size, modification and change time), the version
+    argument and regex and the path, argument and content hash of the environment
+    script. So an updated executable or environment script gets a new fingerprint.
+
+    The executable is searched in the `PATH` set by the environment script, if the
+    environment cache of `modules.helpers.env_cache` is used.
+
+    Args:
+        tool (object): The build tool configuration.
+        exe_path (FilePath): The name of or path to the executable to run.
+        source_env_script (bool): Whether the environment script is sourced.
+
+    Returns:
+        str: The fingerprint as hex string, `None` if the executable can't be
+                found or the environment script can't be sourced.
+    """
+    try:
+        search_path = os.environ.get("PATH")
+        env_script_hash = ""
+        if tool.env_script != "" and source_env_script:
+            env_cache = getEnvCache()
+            if env_cache is None:
+                return None
+            search_path = env_cache.getEnvironment(
+                tool.env_script, [tool.env_script_arg]
+            ).get("PATH")
+            env_script_hash = cachedHashFile(tool.env_script)
+
+        resolved_exe = shutil.which(exe_path, path=search_path)
+        if resolved_exe is None:
+            return None
+        resolved_exe = os.path.realpath(resolved_exe)
+
+        key_list = [
+            resolved_exe,
+            getStatKey(resolved_exe),
+            tool.version_arg,
+            tool.version_regex,
+            os.path.abspath(tool.env_script) if tool.env_script != "" else "",
+            tool.env_script_arg,
+            env_script_hash,
+        ]
+    except Exception:
+        return None
+
+    return hashlib.blake2b(
+        json.dumps(key_list).encode("utf-8"), digest_size=32
+    ).hexdigest()
+
+
+################################################################################
+def loadVersionProbes(json_path: FilePath) -> Dict[str, str]:
+    """Returns the versions of the build tools checked by a previous run, saved in
+    the build tool configuration JSON file `json_path`.
+
+    Args:
+        json_path (FilePath): The path to the build tool configuration JSON file.
+
+    Returns:
+        Dict[str, str]: The versions of the build tools keyed by the fingerprint of
+                        the version check, an empty dictionary if the file doesn't
+                        exist or isn't valid.
+    """
+    try:
+        with io.open(json_path, mode="r", encoding="utf-8") as file:
+            build_tools_json = json.load(file)
+        if build_tools_json.get("file_version") != ".".join(CFG_VERSION):
+            return {}
+        version_probes = build_tools_json.get("version_probes", {})
+        if isinstance(version_probes, dict):
+            return version_probes
+    except Exception:
+        pass
+
+    return {}
@@ -38,9 +38,12 @@ class ConfigFiles(NamedTuple):
                                        path and its status.
         project_cfg (ConfigTuple):  THe project configuration JSON file path and its
                                     status.
+        config_snapshot (ConfigTuple): The snapshot of the parsed project
+                                    configuration, the file path and its status.
     """
 
     host_cfg: ConfigTuple
     build_tools_cfg: ConfigTuple
     project_dep_cfg: ConfigTuple
     project_cfg: ConfigTuple
+    config_snapshot: ConfigTuple = ConfigTuple()
@@ -0,0 +1,458 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     config_records.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import copy
+from types import SimpleNamespace
+from typing import Callable, Dict, FrozenSet, Iterator, List, Tuple, Type
+
+BUILD_TOOL_REQUIRED: List[str] = ["name", "build_tool_exe", "version_regex"]
+"""The attributes a build tool configuration returned by a configure script must
+have.
+"""
+
+BUILD_TOOL_ATTRIBUTES: Dict[str, object] = {
+    "name_long": "",
+    "version": "",
+    "install_path": "",
+    "env_script": "",
+    "env_script_arg": "",
+    "version_arg": "",
+}
+"""The attributes of a build tool configuration and their default values.
+"""
+
+DEPENDENCY_ATTRIBUTES: Dict[str, object] = {
+    "name": "",
+    "website_url": "",
+    "download_url": "",
+    "download_dir": "",
+    "install_cmd": "",
+    "ok_if_exists": "",
+    "executable_check_regex": "",
+    "executable_argument": "",
+    "ok_if_executable": "",
+    "is_checked": False,
+    "install_arguments": [],
+}
+"""The attributes of a project dependency and their default values.
+"""
+
+STAGE_ATTRIBUTES: Dict[str, object] = {
+    "name": "",
+    "build_tool_name": "",
+    "results": [],
+}
+"""The attributes of a stage of a build configuration and their default values.
+"""
+
+
+class ConfigRecord:
+    """Base class of the records of a configuration that exist many times, like
+    targets, stages and project dependencies.
+
+    The known attributes of a record are stored in `__slots__`, which needs less
+    memory than the per-instance `__dict__` of a `SimpleNamespace` and is faster to
+    access. Records don't have a `__dict__`, attributes that aren't in `__slots__`
+    are stored in the dictionary `_extras`, which is only created when the first
+    such attribute is set. Attributes with a default value are set when the record
+    is created.
+
+    The names of the attributes are kept in the order they have been set, so a
+    record read from JSON is serialized in the same order as the `SimpleNamespace`
+    it replaces. The tuples of names are shared by all records with the same
+    attributes, see `_NAME_ORDERS`.
+
+    Like the attributes of a `SimpleNamespace`, the attributes of a record can be
+    read and set using `getattr` and `setattr`. `items`, `__getitem__` and
+    `__setitem__` access the attributes like a dictionary.
+
+    Methods:
+        fromDict: Returns a new record with the values of the given dictionary.
+        setDefaults: Sets all attributes with a default value that are not set.
+        items: Returns an iterator over the names and values of all attributes.
+        toDict: Returns a dictionary of all attributes.
+    """
+
+    __slots__ = ("_names", "_extras")
+
+    DEFAULTS: Dict[str, object] = {}
+
+    _SETTERS: Dict[str, Callable[[object, object], None]] = {}
+
+    _GETTERS: Dict[str, Callable[[object, type], object]] = {}
+
+    _MUTABLE_DEFAULTS: FrozenSet[str] = frozenset()
+
+    ###########################################################################
+    def __init_subclass__(cls, **kwargs: object) -> None:
+        """Sets `_SETTERS` and `_GETTERS` of the record class, the setters and
+        getters of the slot descriptors by attribute name, which are faster than
+        `setattr` and `getattr`, and `_MUTABLE_DEFAULTS`, the names of the default
+        values that have to be copied for each record.
+        """
+        super().__init_subclass__(**kwargs)
+        slots = (*cls.__slots__, *ConfigRecord.__slots__)
+        cls._SETTERS = {name: getattr(cls, name).__set__ for name in slots}
+        cls._GETTERS = {name: getattr(cls, name).__get__ for name in slots}
+        cls._MUTABLE_DEFAULTS = frozenset(
+            name
+            for name, default in cls.DEFAULTS.items()
+            if isinstance(default, (list, dict, set))
+        )
+
+    ###########################################################################
+    def __init__(self, **kwargs: object) -> None:
+        """Sets the given attributes and the default values of all other
+        attributes with a default value.
+        """
+        self._SETTERS["_names"](self, ())
+        for name, value in kwargs.items():
+            setattr(self, name, value)
+        self.setDefaults()
+
+    ############################################################################
+    @classmethod
+    def fromDict(cls, values: Dict[str, object]) -> ConfigRecord:
+        """Returns a new record with the values of the given dictionary as
+        attributes.
+
+        Args:
+            values (Dict[str, object]): The attribute names and values to set.
+
+        Returns:
+            ConfigRecord: The new record.
+        """
+        ret_val = cls.__new__(cls)
+        setters = cls._SETTERS
+        extras = None
+        for name, value in values.items():
+            setter = setters.get(name)
+            if setter is not None:
+                setter(ret_val, value)
+            else:
+                if extras is None:
+                    extras = {}
+                extras[name] = value
+
+        defaults = cls.DEFAULTS
+        if defaults:
+            missing = [name for name in defaults if name not in values]
+            mutable_defaults = cls._MUTABLE_DEFAULTS
+            for name in missing:
+                default = defaults[name]
+                if name in mutable_defaults:
+                    default = copy.copy(default)
+                setters[name](ret_val, default)
+            names = (*values, *missing)
+        else:
+            names = tuple(values)
+        setters["_names"](ret_val, _NAME_ORDERS.setdefault(names, names))
+        if extras is not None:
+            setters["_extras"](ret_val, extras)
+
+        return ret_val
+
+    ############################################################################
+    def __getattr__(self, name: str) -> object:
+        """Returns the attribute `name` that isn't in `__slots__`, called if the
+        attribute isn't found in the slots.
+
+        Raises:
+            AttributeError: if the record doesn't have the attribute.
+        """
+        if name not in ConfigRecord.__slots__:
+            try:
+                return self._GETTERS["_extras"](self, type(self))[name]
+            except (AttributeError, KeyError):
+                pass
+
+        raise AttributeError(
+            "'{cls}' object has no attribute '{name}'".format(
+                cls=type(self).__name__, name=name
+            )
+        )
+
+    ############################################################################
+    def __setattr__(self, name: str, value: object) -> None:
+        """Sets the attribute `name` to `value`, in `_extras` if it isn't in
+        `__slots__`, and appends `name` to the names of the attributes if it is a
+        new attribute."""
+        cls = type(self)
+        setter = cls._SETTERS.get(name)
+        if setter is not None:
+            setter(self, value)
+        else:
+            try:
+                extras = cls._GETTERS["_extras"](self, cls)
+            except AttributeError:
+                extras = {}
+                cls._SETTERS["_extras"](self, extras)
+            extras[name] = value
+
+        names = cls._GETTERS["_names"](self, cls)
+        if name not in names and name not in ConfigRecord.__slots__:
+            cls._SETTERS["_names"](self, getNameOrder((*names, name)))
+
+    ############################################################################
+    def __delattr__(self, name: str) -> None:
+        """Deletes the attribute `name`.
+
+        Raises:
+            AttributeError: if the record doesn't have the attribute.
+        """
+        cls = type(self)
+        if name in cls._SETTERS:
+            object.__delattr__(self, name)
+        else:
+            try:
+                del cls._GETTERS["_extras"](self, cls)[name]
+            except (AttributeError, KeyError):
+                raise AttributeError(name)
+
+        names = cls._GETTERS["_names"](self, cls)
+        cls._SETTERS["_names"](
+            self, getNameOrder(tuple(other for other in names if other != name))
+        )
+
+    ############################################################################
+    def __reduce__(self) -> Tuple[object, Tuple[Dict[str, object]]]:
+        """Copies and pickles the record as its dictionary of attributes, to keep
+        the order of the attributes."""
+        return type(self).fromDict, (self.toDict(),)
+
+    ############################################################################
+    def setDefaults(self) -> None:
+        """Sets all attributes with a default value that are not set yet."""
+        for name, default in self.DEFAULTS.items():
+            if not hasattr(self, name):
+                setattr(self, name, copy.copy(default))
+
+    ############################################################################
+    def __getitem__(self, name: str) -> object:
+        """Returns the attribute `name`, like `getattr`."""
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name)
+
+    ############################################################################
+    def __setitem__(self, name: str, value: object) -> None:
+        """Sets the attribute `name` to `value`, like `setattr`."""
+        setattr(self, name, value)
+
+    ############################################################################
+    def items(self) -> Iterator[Tuple[str, object]]:
+        """Returns an iterator over the names and values of all attributes of the
+        record, see `toDict`.
+
+        Returns:
+            Iterator[Tuple[str, object]]: The names and values of all attributes.
+        """
+        return iter(self.toDict().items())
+
+    ############################################################################
+    def toDict(self) -> Dict[str, object]:
+        """Returns a dictionary of the names and values of all attributes.
+
+        The attributes are in the order they have been set, the attributes of a
+        record read from JSON in the order of the keys of the JSON object.
+
+        Returns:
+            Dict[str, object]: The names and values of all attributes.
+        """
+        cls = type(self)
+        getters = cls._GETTERS
+        ret_val = {}
+        extras = None
+        for name in getters["_names"](self, cls):
+            getter = getters.get(name)
+            if getter is not None:
+                ret_val[name] = getter(self, cls)
+            else:
+                if extras is None:
+                    extras = getters["_extras"](self, cls)
+                ret_val[name] = extras[name]
+
+        return ret_val
+
+    ############################################################################
+    def __eq__(self, other: object) -> bool:
+        """Records are equal if they are of the same type and have the same
+        attributes.
+        """
+        if type(self) is not type(other):
+            return NotImplemented
+        return self.toDict() == other.toDict()
+
+    __hash__ = None
+
+    ############################################################################
+    def __repr__(self) -> str:
+        """Returns the record like `SimpleNamespace` does."""
+        return "{cls}({attrs})".format(
+            cls=type(self).__name__,
+            attrs=", ".join(
+                "{name}={value!r}".format(name=name, value=value)
+                for name, value in self.items()
+            ),
+        )
+
+
+class TargetRecord(ConfigRecord):
+    """A target of a module configuration."""
+
+    __slots__ = (
+        "name",
+        "alias",
+        "default",
+        "build_type",
+        "build_subtype",
+        "build_tool_type",
+        "build_tool",
+        "result",
+        "result_name",
+        "build_directory",
+        "sources",
+        "include_paths",
+        "library_paths",
+        "libraries",
+        "module_paths",
+        "dependencies",
+    )
+
+
+class BuildToolRecord(ConfigRecord):
+    """A build tool configuration returned by a configure script."""
+
+    __slots__ = (
+        *BUILD_TOOL_REQUIRED,
+        *BUILD_TOOL_ATTRIBUTES,
+        "is_checked",
+        "version_timeout",
+    )
+    DEFAULTS = BUILD_TOOL_ATTRIBUTES
+
+
+class StageRecord(ConfigRecord):
+    """A stage of a build configuration."""
+
+    __slots__ = (
+        *STAGE_ATTRIBUTES,
+        "description",
+        "build_tool",
+        "build_tool_out_dir",
+        "build_tool_working_dir",
+        "build_tool_arguments",
+        "call_build_tool",
+        "always_run_build",
+        "dependencies",
+        "memory_weight",
+    )
+    DEFAULTS = STAGE_ATTRIBUTES
+
+
+class ResultRecord(ConfigRecord):
+    """A result of a stage of a build configuration."""
+
+    __slots__ = ("type", "path_or_regexp", "source_name", "del_after_next_stage")
+
+
+class DependencyRecord(ConfigRecord):
+    """A project dependency of the project dependency configuration."""
+
+    __slots__ = tuple(DEPENDENCY_ATTRIBUTES)
+    DEFAULTS = DEPENDENCY_ATTRIBUTES
+
+
+RECORD_DISCRIMINATORS: List[Tuple[str, Type[ConfigRecord]]] = [
+    ("build_tool_exe", BuildToolRecord),
+    ("build_tool_name", StageRecord),
+    ("path_or_regexp", ResultRecord),
+    ("ok_if_executable", DependencyRecord),
+    ("ok_if_exists", DependencyRecord),
+    ("install_cmd", DependencyRecord),
+    ("build_type", TargetRecord),
+]
+"""The attribute names that identify the type of record of a JSON object. The
+first attribute name contained in the JSON object determines the record type.
+"""
+
+_NAME_ORDERS: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+"""The tuples of attribute names of the records, each order of names is stored
+once and shared by all records with these attributes.
+"""
+
+
+################################################################################
+def getNameOrder(names: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Returns the shared tuple equal to the given tuple of attribute names.
+
+    Args:
+        names (Tuple[str, ...]): The names of the attributes of a record.
+
+    Returns:
+        Tuple[str, ...]: The tuple of names stored in `_NAME_ORDERS`.
+    """
+    return _NAME_ORDERS.setdefault(names, names)
+
+
+################################################################################
+def recordFromDict(values: Dict[str, object]) -> object:
+    """Returns the record of the type identified by the keys of the given
+    dictionary, a `SimpleNamespace` if it isn't a known record type.
+
+    Used as `object_hook` of `json.load(s)`. The root objects of JSON
+    configuration files, which contain the attribute `file_name`, are always
+    returned as `SimpleNamespace`.
+
+    Args:
+        values (Dict[str, object]): The deserialized JSON object.
+
+    Returns:
+        object: The record or `SimpleNamespace` holding the values.
+    """
+    if "file_name" not in values:
+        for key, record_type in RECORD_DISCRIMINATORS:
+            if key in values:
+                return record_type.fromDict(values)
+
+    return SimpleNamespace(**values)
+
+
+################################################################################
+def getAttributes(instance: object) -> Dict[str, object]:
+    """Returns the attributes of a record or of an object with a `__dict__`.
+
+    The attributes of a record are returned as a new dictionary.
+
+    Args:
+        instance (object): The record or object to return the attributes of.
+
+    Returns:
+        Dict[str, object]: The names and values of the attributes.
+    """
+    if isinstance(instance, ConfigRecord):
+        return instance.toDict()
+
+    return instance.__dict__
+
+
+################################################################################
+def hasAttributes(instance: object) -> bool:
+    """Returns `True` if the given object is a record or has a `__dict__`.
+
+    Args:
+        instance (object): The object to check.
+
+    Returns:
+        bool: `True` if the object holds configuration values as attributes,
+                `False` else.
+    """
+    return isinstance(instance, ConfigRecord) or hasattr(instance, "__dict__")
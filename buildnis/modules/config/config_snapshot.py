@@ -0,0 +1,227 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     config_snapshot.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import io
+import json
+import logging
+import os
+import pathlib
+import pickle  # nosec
+from typing import List
+
+from buildnis.modules import VERSION, BuildnisException
+from buildnis.modules.config import (
+    BUILD_CONF_PATH,
+    CFG_VERSION,
+    FilePath,
+    config_values,
+)
+from buildnis.modules.config.config import Config
+from buildnis.modules.helpers import LOGGER_NAME
+from buildnis.modules.helpers.files import hashFiles
+from buildnis.modules.helpers.hash_cache import cachedHashFile
+
+_logger = logging.getLogger(LOGGER_NAME)
+
+SNAPSHOT_PICKLE_PROTOCOL: int = 5
+"""The pickle protocol version to use for the configuration snapshot.
+"""
+
+UNCACHEABLE_PLACEHOLDERS: List[bytes] = [b"${TIME}"]
+"""If a configuration file contains one of these placeholders, no snapshot is saved,
+as the expanded value changes with every run.
+"""
+
+
+class ConfigSnapshotException(BuildnisException):
+    """Exception raised if the configuration snapshot can't be written."""
+
+
+################################################################################
+def getSnapshotSources(cfg: Config, build_tools_cfg: FilePath) -> List[FilePath]:
+    """Returns the paths of all JSON files the given project configuration has been
+    parsed from.
+
+    Args:
+        cfg (Config): The parsed project configuration.
+        build_tools_cfg (FilePath): The path to the generated build tools
+                                    configuration JSON file.
+
+    Returns:
+        List[FilePath]: The paths of the JSON files the configuration depends on.
+    """
+    ret_val = [cfg.config_path]
+    ret_val.extend(module.config_path for module in cfg.module_cfgs)
+    ret_val.extend(build_cfg.config_path for build_cfg in cfg.build_cfgs)
+    if os.path.isfile(build_tools_cfg):
+        ret_val.append(build_tools_cfg)
+
+    return sorted({os.path.abspath(path) for path in ret_val})
+
+
+################################################################################
+def getSnapshotKey(project_config: FilePath, sources: List[FilePath]) -> str:
+    """Returns the key a configuration snapshot is valid for.
+
+    The key is the BLAKE2 hash of the hashes of all source JSON files and the build
+    configurations in the project's `build_conf` directory, the Buildnis version,
+    the host constants and the current date.
+
+    Args:
+        project_config (FilePath): The path to the project configuration file.
+        sources (List[FilePath]): The paths to the JSON files the configuration has
+                                been parsed from.
+
+    Raises:
+        FileCompareException: if a file can't be hashed.
+
+    Returns:
+        str: The key of the configuration as hex string.
+    """
+    build_conf_dir = pathlib.Path(
+        "/".join([os.path.dirname(os.path.abspath(project_config)), BUILD_CONF_PATH])
+    )
+    build_confs = sorted(str(path.absolute()) for path in build_conf_dir.glob("*.json"))
+
+    files = sorted({os.path.abspath(project_config), *sources, *build_confs})
+    hashes = hashFiles(files, hash_function=cachedHashFile)
+
+    key_dict = {
+        "version": list(VERSION),
+        "file_version": ".".join(CFG_VERSION),
+        "date": datetime.date.today().isoformat(),
+        "host": {
+            name: str(getattr(config_values, name))
+            for name in dir(config_values)
+            if name.startswith("HOST_")
+        },
+        "build_confs": build_confs,
+        "files": [[path, hashes[path]] for path in files],
+    }
+
+    return hashlib.blake2b(
+        json.dumps(key_dict, sort_keys=True).encode("utf-8"), digest_size=32
+    ).hexdigest()
+
+
+################################################################################
+def loadConfigSnapshot(snapshot_path: FilePath, project_config: FilePath) -> Config:
+    """Loads the project configuration from the snapshot file, if the snapshot is
+    still valid.
+
+    The returned configuration doesn't contain the project dependency
+    configuration, `project_dep_cfg` is `None`.
+
+    Args:
+        snapshot_path (FilePath): The path to the snapshot file.
+        project_config (FilePath): The path to the project configuration file.
+
+    Returns:
+        Config: The project configuration, `None` if the snapshot doesn't exist or
+                isn't valid anymore.
+    """
+    try:
+        with io.open(snapshot_path, mode="rb") as file:
+            header = pickle.load(file)  # nosec
+            if header.get("file_version") != ".".join(CFG_VERSION):
+                return None
+
+            key = getSnapshotKey(project_config, header.get("sources", []))
+            if key != header.get("key"):
+                _logger.info(
+                    'Configuration snapshot "{path}" is out of date'.format(
+                        path=snapshot_path
+                    )
+                )
+                return None
+
+            ret_val = pickle.load(file)  # nosec
+
+    except FileNotFoundError:
+        return None
+    except Exception as excp:
+        _logger.warning(
+            'error "{error}" loading configuration snapshot "{path}", not using it'.format(
+                error=excp, path=snapshot_path
+            )
+        )
+        return None
+
+    _logger.warning(
+        'Loaded project configuration from snapshot "{path}"'.format(path=snapshot_path)
+    )
+    ret_val.setProjectConstants()
+
+    return ret_val
+
+
+################################################################################
+def saveConfigSnapshot(
+    snapshot_path: FilePath, cfg: Config, build_tools_cfg: FilePath
+) -> bool:
+    """Saves the parsed project configuration to the snapshot file.
+
+    The project dependency configuration is not saved, it is always read from its
+    JSON file.
+
+    Args:
+        snapshot_path (FilePath): The path to the snapshot file to write.
+        cfg (Config): The parsed project configuration to save.
+        build_tools_cfg (FilePath): The path to the generated build tools
+                                    configuration JSON file.
+
+    Raises:
+        ConfigSnapshotException: if the snapshot can't be written.
+
+    Returns:
+        bool: `True` if the snapshot has been written, `False` if the configuration
+                can't be saved as a snapshot.
+    """
+    sources = getSnapshotSources(cfg, build_tools_cfg)
+
+    project_dep_cfg = cfg.project_dep_cfg
+    tmp_path = ".".join([snapshot_path, "tmp"])
+    try:
+        for source in sources:
+            content = pathlib.Path(source).read_bytes()
+            for placeholder in UNCACHEABLE_PLACEHOLDERS:
+                if placeholder in content:
+                    _logger.info(
+                        'not saving configuration snapshot, "{path}" contains the placeholder "{placeholder}"'.format(
+                            path=source, placeholder=placeholder.decode("utf-8")
+                        )
+                    )
+                    return False
+
+        header = {
+            "file_version": ".".join(CFG_VERSION),
+            "key": getSnapshotKey(cfg.config_path, sources),
+            "sources": sources,
+        }
+
+        cfg.project_dep_cfg = None
+        with io.open(tmp_path, mode="wb") as file:
+            pickle.dump(header, file, protocol=SNAPSHOT_PICKLE_PROTOCOL)
+            pickle.dump(cfg, file, protocol=SNAPSHOT_PICKLE_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+
+    except Exception as excp:
+        raise ConfigSnapshotException(excp)
+
+    finally:
+        cfg.project_dep_cfg = project_dep_cfg
+
+    _logger.warning(
+        'Writing configuration snapshot "{path}"'.format(path=snapshot_path)
+    )
+
+    return True
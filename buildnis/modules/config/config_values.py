@@ -79,3 +79,13 @@ HOST_NUM_CORES: int = 1
 HOST_NUM_LOG_CORES: int = 1
 """The number of logical cores (including Hyperthreading) cores of this host's CPU.
 """
+
+HOST_EFFECTIVE_CPUS: int = 1
+"""The number of CPUs this process may use, limited by the CPU affinity and the
+CPU quota of the cgroup (container). The default number of parallel jobs.
+"""
+
+HOST_EFFECTIVE_RAM: int = 0
+"""The amount of RAM in bytes this process may use, limited by the memory limit of
+the cgroup (container).
+"""
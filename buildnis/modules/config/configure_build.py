@@ -12,13 +12,18 @@ import logging
 import pathlib
 
 from buildnis.modules.config import FilePath, config_values
-from buildnis.modules.config.check import Check
+from buildnis.modules.config.check import Check, loadVersionProbes
 from buildnis.modules.config.config import Config
 from buildnis.modules.config.config_dir_json import ConfigDirJson
 from buildnis.modules.config.config_files import ConfigFiles
+from buildnis.modules.config.config_snapshot import (
+    loadConfigSnapshot,
+    saveConfigSnapshot,
+)
 from buildnis.modules.config.host import Host
 from buildnis.modules.config.project_dependency import ProjectDependency
 from buildnis.modules.helpers.commandline_arguments import CommandlineArguments
+from buildnis.modules.helpers.config_parser import parseConfigElement
 
 
 ################################################################################
@@ -29,7 +34,7 @@ def configureBuild(
     host_cfg: Host,
     host_cfg_filename: FilePath,
     json_config_files: ConfigFiles,
-) -> None:
+) -> Config:
     """Configures the build.
 
     Args:
@@ -42,6 +47,9 @@ def configureBuild(
         host_cfg_filename (FilePath): Path to the host configuration JSON file to write.
         json_config_files (ConfigFiles): Holds paths to all JSON configuration files to
                                         write.
+
+    Returns:
+        Config: The project configuration, with the build tools of all stages.
     """
     writeHostCfg(host_cfg, host_cfg_filename)
     if (
@@ -66,7 +74,7 @@ def configureBuild(
         build_tool_cfg.readJSON(json_path=json_config_files.build_tools_cfg.path)
 
     ifConfigureDeleteProjectJSON(commandline_args, logger, json_config_files)
-    cfg = setupProjectCfg(commandline_args, json_config_files)
+    cfg = loadProjectCfg(commandline_args, logger, json_config_files)
     if (
         not json_config_files.project_dep_cfg.exists
         or commandline_args.do_configure is True
@@ -93,6 +101,71 @@ def configureBuild(
     writeProjectJSON(host_cfg_filename, json_config_files, cfg)
     config_dir_config.writeJSON()
 
+    return cfg
+
+
+################################################################################
+def loadProjectCfg(
+    commandline_args: CommandlineArguments,
+    logger: logging.Logger,
+    json_config_files: ConfigFiles,
+) -> Config:
+    """Loads the project configuration from the configuration snapshot if it is
+    still valid, else parses all JSON configurations and saves the snapshot.
+
+    The snapshot isn't used if `--configure` or `--no-config-snapshot` has been
+    given.
+
+    Args:
+        commandline_args (CommandlineArguments): The object holding all command line
+                                                    arguments.
+        logger (logging.Logger): The logger to use.
+        json_config_files (ConfigFiles): Holds the paths to the JSON configuration
+                                        files and the configuration snapshot.
+
+    Returns:
+        Config: The project config containing all values
+    """
+    if not commandline_args.use_config_snapshot:
+        return setupProjectCfg(commandline_args, json_config_files)
+
+    snapshot = json_config_files.config_snapshot
+    cfg = None
+    if snapshot.exists and commandline_args.do_configure is False:
+        cfg = loadConfigSnapshot(
+            snapshot_path=snapshot.path,
+            project_config=commandline_args.project_config_file,
+        )
+
+    if cfg is not None:
+        cfg.project_dep_cfg = ProjectDependency(
+            cfg.project_dependency_config,
+            json_path=json_config_files.project_dep_cfg.path,
+        )
+        # the same parents as if expanded as part of the project configuration
+        parseConfigElement(cfg.project_dep_cfg, parents=[cfg, cfg])
+        return cfg
+
+    cfg = setupProjectCfg(commandline_args, json_config_files)
+    try:
+        if (
+            saveConfigSnapshot(
+                snapshot_path=snapshot.path,
+                cfg=cfg,
+                build_tools_cfg=json_config_files.build_tools_cfg.path,
+            )
+            and snapshot.path not in config_values.g_list_of_generated_files
+        ):
+            config_values.g_list_of_generated_files.append(snapshot.path)
+    except Exception as excp:
+        logger.error(
+            'error "{error}" writing configuration snapshot "{path}"'.format(
+                error=excp, path=snapshot.path
+            )
+        )
+
+    return cfg
+
 
 ################################################################################
 def setupProjectCfg(
@@ -193,6 +266,10 @@ def writeBuildTools(
 ) -> Check:
     """Writes the build tools configuration to disk.
 
+    The versions of the build tools checked by the previous run are read from the
+    existing build tools configuration, build tools whose executable hasn't changed
+    are not run again, unless `--no-version-cache` has been given.
+
     Args:
         commandline_args (CommandlineArguments): The object holding all command line
                                                     arguments.
@@ -204,10 +281,16 @@ def writeBuildTools(
     Returns:
         Check: The build tools configuration object to use.
     """
+    version_probes = {}
+    if json_config_files.build_tools_cfg.exists and commandline_args.use_version_cache:
+        version_probes = loadVersionProbes(json_config_files.build_tools_cfg.path)
+
     check_buildtools = Check(
         os_name=host_cfg.os,
         arch=host_cfg.cpu_arch,
         user_path=commandline_args.conf_scripts_dir,
+        num_jobs=commandline_args.configure_jobs,
+        version_probes=version_probes,
     )
     check_buildtools.writeJSON(json_path=json_config_files.build_tools_cfg.path)
     if not json_config_files.build_tools_cfg.exists:
@@ -8,7 +8,12 @@
 
 from __future__ import annotations
 
+import hashlib
+import io
+import json
+import os
 import platform
+from typing import Callable, Optional
 
 from buildnis.modules.config import (
     AMD64_ARCH_STRING,
@@ -18,6 +23,7 @@ from buildnis.modules.config import (
     OSX_NAME_DICT,
     OSX_OS_STRING,
     WINDOWS_OS_STRING,
+    FilePath,
     config_values,
 )
 from buildnis.modules.config.host_linux import (
@@ -28,9 +34,16 @@ from buildnis.modules.config.host_linux import (
     getL3CacheLinux,
     getNumCoresLinux,
     getNumLogCoresLinux,
-    getOSMajVers,
-    getOSVer,
     getRAMSizeLinux,
+    readCacheSizes,
+    readCgroupCPULimit,
+    readCgroupMemoryLimit,
+    readCPUInfo,
+    readGPUNames,
+    readHostFingerprintData,
+    readNumOnlineCPUs,
+    readOSRelease,
+    readRAMSize,
 )
 from buildnis.modules.config.host_osx import (
     getCPUNameOSX,
@@ -71,8 +84,14 @@ class Host(JSONBaseClass):
         num_cores (int):      The number of physical cores
         num_logical_cores (int): The number of logical, 'virtual' cores
         ram_total (int):      Amount of physical RAM in bytes
+        num_effective_cpus (int): The number of CPUs this process may use, limited
+                              by the CPU affinity and the cgroup CPU quota
+        ram_effective (int):  The amount of RAM in bytes this process may use,
+                              limited by the cgroup memory limit
         gpu List[str]:        The list of names of all GPUs
         python_version (str): The version of this host's Python interpreter
+        host_fingerprint (str): The fingerprint of this host's hardware and OS,
+                              see `getHostFingerprint`
         json_path(str):       The path to the written JSON host config file
 
     Methods
@@ -85,21 +104,30 @@ class Host(JSONBaseClass):
     """
 
     ###########################################################################
-    def __init__(self) -> None:
+    def __init__(self, do_collect: bool = True) -> None:
         """Constructor of class Host, gathers and sets the host's environment.
 
         Like OS, hostname, OS version, CPU architecture, ...
+
+        Args:
+            do_collect (bool, optional): Whether to gather the host's environment or
+                        not, to read it from a JSON file using `readJSON`. Defaults
+                        to `True`.
         """
         super().__init__(config_file_name=HOST_FILE_NAME, config_name="host")
 
-        self._logger.info("Gathering information about this host ...")
-
         self.file_name = HOST_FILE_NAME
         self.file_version = ".".join(CFG_VERSION)
 
+        if not do_collect:
+            return
+
+        self._logger.info("Gathering information about this host ...")
+
         self.getOSInfo()
 
         self.python_version = platform.python_version()
+        self.host_fingerprint = getHostFingerprint()
 
         if self.os == WINDOWS_OS_STRING:
             self.collectWindowsConfig()
@@ -123,21 +151,60 @@ class Host(JSONBaseClass):
 
     ############################################################################
     def setConstants(self) -> None:
-        """Set the host constants to use for configuration files."""
+        """Set the host constants to use for configuration files.
+
+        The effective number of CPUs and RAM size are always read again, because
+        the limits of the process may change without a change of the host.
+        """
         must_have_attrs = {
             "os": "",
             "cpu_arch": "",
             "host_name": "",
             "num_cores": 1,
             "num_logical_cores": 1,
+            "ram_total": 0,
         }
         self.addAttributesIfNotExist(must_have_attrs)
 
+        self.getEffectiveLimits()
+
         config_values.HOST_OS = self.os
         config_values.HOST_CPU_ARCH = self.cpu_arch
         config_values.HOST_NAME = self.host_name
         config_values.HOST_NUM_CORES = self.num_cores
         config_values.HOST_NUM_LOG_CORES = self.num_logical_cores
+        config_values.HOST_EFFECTIVE_CPUS = self.num_effective_cpus
+        config_values.HOST_EFFECTIVE_RAM = self.ram_effective
+
+    ############################################################################
+    def getEffectiveLimits(self) -> None:
+        """Sets the number of CPUs and the amount of RAM this process may use.
+
+        The number of CPUs is limited by the CPU affinity of the process and, on
+        Linux, by the CPU quota of the cgroup (`cpu.max` or `cpu.cfs_quota_us`).
+        The RAM is limited by the memory limit of the cgroup (`memory.max` or
+        `memory.limit_in_bytes`).
+        """
+        try:
+            self.num_effective_cpus = len(os.sched_getaffinity(0))
+        except AttributeError:
+            self.num_effective_cpus = os.cpu_count() or self.num_logical_cores
+        self.ram_effective = self.ram_total
+
+        if self.os == LINUX_OS_STRING:
+            cpu_limit = self.readLinuxFile(readCgroupCPULimit, None)
+            if cpu_limit is not None:
+                self.num_effective_cpus = min(self.num_effective_cpus, cpu_limit)
+
+            memory_limit = self.readLinuxFile(readCgroupMemoryLimit, None)
+            if memory_limit is not None:
+                self.ram_effective = (
+                    memory_limit
+                    if self.ram_total == 0
+                    else min(self.ram_total, memory_limit)
+                )
+
+        self.num_effective_cpus = max(1, self.num_effective_cpus)
 
     ############################################################################
     def getOSInfo(self) -> None:
@@ -280,29 +347,35 @@ class Host(JSONBaseClass):
     def collectLinuxConfig(self) -> None:
         """Collect information about the hardware we're running on on Linux.
 
-        Calls the following commands:
+        Reads the following files:
 
-        cat /etc/os-release
+        /etc/os-release
         NAME="Red Hat Enterprise Linux"
         VERSION="8.3 (Ootpa)"
 
+        /proc/cpuinfo                       CPU name, cores and logical cores
+        /proc/meminfo                       RAM size
+        /sys/devices/system/cpu/online      logical cores, if not in /proc/cpuinfo
+        /sys/devices/system/cpu/cpu0/cache  level 2 and level 3 cache sizes
+        /sys/bus/pci/devices and pci.ids    GPU names
+
+        Only if a file doesn't exist or doesn't contain the value, the following
+        commands are called:
+
         grep "model name" /proc/cpuinfo |uniq|cut -d':' -f2
         getconf -a|grep LEVEL2_CACHE_SIZE|awk '{print $2}'
         getconf -a|grep LEVEL3_CACHE_SIZE|awk '{print $2}'
         grep "cpu cores" /proc/cpuinfo |uniq|cut -d':' -f2
         grep "siblings" /proc/cpuinfo |uniq |cut -d':' -f2
         free -b|grep "Mem:"|awk '{print $2}'
-        grep "DISTRIB_DESCRIPTION" /etc/lsb-release
         lspci|grep VGA|cut -f3 -d':'
         """
         try:
             try:
                 if checkIfExists("/etc/os-release") is True:
-                    os_vers_maj = getOSMajVers()
-                    self.os_vers_major = os_vers_maj.std_out.strip()
-
-                    os_vers = getOSVer()
-                    self.os_vers = os_vers.std_out.strip()
+                    os_release = readOSRelease()
+                    self.os_vers_major = os_release.get("os_vers_major", "")
+                    self.os_vers = os_release.get("os_vers", "")
             except Exception as excp:
                 self._logger.error(
                     'error "{error}" trying to read /etc/os-release'.format(error=excp)
@@ -317,27 +390,72 @@ class Host(JSONBaseClass):
 
     ############################################################################
     def collectLinuxCpuGpuRam(self):
-        """Collects information about this host's CPU, GPU, and so on on Linux."""
-        cpu_name_cmd = getCPUNameLinux()
-        self.cpu = cpu_name_cmd.std_out.strip()
+        """Collects information about this host's CPU, GPU, and so on on Linux.
 
-        cpu_num_cores = getNumCoresLinux()
-        self.num_cores = int(cpu_num_cores.std_out.strip())
+        Reads the files in `/proc` and `/sys`, calls the commands only if a file
+        doesn't exist or doesn't contain the value.
+        """
+        cpu_info = self.readLinuxFile(readCPUInfo, {})
+        cache_sizes = self.readLinuxFile(readCacheSizes, {})
 
-        cpu_num_log_cpus = getNumLogCoresLinux()
-        self.num_logical_cores = int(cpu_num_log_cpus.std_out.strip())
+        self.cpu = cpu_info.get("cpu")
+        if self.cpu is None:
+            cpu_name_cmd = getCPUNameLinux()
+            self.cpu = cpu_name_cmd.std_out.strip()
 
-        cpu_l2_cache = getL2CacheLinux()
-        self.level2_cache = int(cpu_l2_cache.std_out.strip())
+        self.num_cores = cpu_info.get("num_cores")
+        if self.num_cores is None:
+            cpu_num_cores = getNumCoresLinux()
+            self.num_cores = int(cpu_num_cores.std_out.strip())
+
+        self.num_logical_cores = cpu_info.get("num_logical_cores")
+        if self.num_logical_cores is None:
+            self.num_logical_cores = self.readLinuxFile(readNumOnlineCPUs, None)
+        if self.num_logical_cores is None:
+            cpu_num_log_cpus = getNumLogCoresLinux()
+            self.num_logical_cores = int(cpu_num_log_cpus.std_out.strip())
+
+        self.level2_cache = cache_sizes.get(2)
+        if self.level2_cache is None:
+            cpu_l2_cache = getL2CacheLinux()
+            self.level2_cache = int(cpu_l2_cache.std_out.strip())
+
+        self.level3_cache = cache_sizes.get(3)
+        if self.level3_cache is None:
+            cpu_l3_cache = getL3CacheLinux()
+            self.level3_cache = int(cpu_l3_cache.std_out.strip())
+
+        self.ram_total = self.readLinuxFile(readRAMSize, None)
+        if self.ram_total is None:
+            ram_size = getRAMSizeLinux()
+            self.ram_total = int(ram_size.std_out.strip())
+
+        self.gpu = self.readLinuxFile(readGPUNames, None)
+        if self.gpu is None:
+            self.gpu = []
+            self.getGPUNamesLinux()
 
-        cpu_l3_cache = getL3CacheLinux()
-        self.level3_cache = int(cpu_l3_cache.std_out.strip())
+    ############################################################################
+    def readLinuxFile(self, reader: Callable[[], object], default: object) -> object:
+        """Returns the host information read by `reader` from `/proc` or `/sys`.
 
-        ram_size = getRAMSizeLinux()
-        self.ram_total = int(ram_size.std_out.strip())
-        self.gpu = []
+        Args:
+            reader (Callable[[], object]): The function of
+                                    `modules.config.host_linux` reading the file.
+            default (object): The value to return if the file can't be read.
 
-        self.getGPUNamesLinux()
+        Returns:
+            object: The value returned by `reader`, `default` on errors.
+        """
+        try:
+            return reader()
+        except (OSError, ValueError) as excp:
+            self._logger.info(
+                'error "{error}" reading host information, using commands'.format(
+                    error=excp
+                )
+            )
+            return default
 
     ############################################################################
     def getGPUNamesLinux(self) -> None:
@@ -424,6 +542,79 @@ def printHostInfo() -> None:
     print(Host())
 
 
+################################################################################
+def getHostFingerprint() -> Optional[str]:
+    """Returns the fingerprint of this host's hardware and OS.
+
+    The fingerprint is the BLAKE2 hash of the hostname, OS, kernel release, CPU
+    architecture, Python version and configuration version and on Linux of the
+    CPU model names, the total memory and the list of PCI devices, see
+    `modules.config.host_linux.readHostFingerprintData`.
+
+    Returns:
+        Optional[str]: The fingerprint as hex string, `None` if this isn't Linux
+                or the hardware information can't be read.
+    """
+    uname = platform.uname()
+    if uname.system != LINUX_OS_STRING:
+        return None
+
+    try:
+        hardware_data = readHostFingerprintData()
+    except OSError:
+        return None
+
+    fingerprint_data = [
+        uname.node,
+        uname.system,
+        uname.release,
+        uname.machine,
+        platform.python_version(),
+        ".".join(CFG_VERSION),
+        *hardware_data,
+    ]
+
+    return hashlib.blake2b(
+        json.dumps(fingerprint_data).encode("utf-8"), digest_size=32
+    ).hexdigest()
+
+
+################################################################################
+def loadHostCfg(json_path: FilePath) -> Host:
+    """Returns the host configuration saved in the JSON file `json_path`, if its
+    fingerprint is the same as this host's fingerprint.
+
+    Args:
+        json_path (FilePath): The path to the host configuration JSON file.
+
+    Returns:
+        Host: The host configuration read from the file, `None` if the file doesn't
+                exist, isn't valid or the fingerprint has changed.
+    """
+    try:
+        with io.open(json_path, mode="r", encoding="utf-8") as file:
+            host_json = json.load(file)
+    except Exception:
+        return None
+
+    fingerprint = getHostFingerprint()
+    if (
+        fingerprint is None
+        or host_json.get("host_fingerprint") != fingerprint
+        or host_json.get("file_version") != ".".join(CFG_VERSION)
+    ):
+        return None
+
+    host_cfg = Host(do_collect=False)
+    host_cfg.readJSON(json_path=json_path)
+    # the host configuration is generated, not an original configuration file
+    if hasattr(host_cfg, "orig_file"):
+        del host_cfg.orig_file
+    host_cfg.setConstants()
+
+    return host_cfg
+
+
 ################################################################################
 if __name__ == "__main__":
     printHostInfo()
@@ -8,9 +8,61 @@
 
 from __future__ import annotations
 
-from buildnis.modules.config import CmdOutput
+import io
+import math
+import pathlib
+from typing import Dict, List, Set, Tuple
+
+from buildnis.modules.config import CmdOutput, FilePath
 from buildnis.modules.helpers.execute import ExeArgs, runCommand
 
+OS_RELEASE_PATH: FilePath = "/etc/os-release"
+"""The path to the file containing the OS name and version.
+"""
+
+CPUINFO_PATH: FilePath = "/proc/cpuinfo"
+"""The path to the file containing the CPU information.
+"""
+
+MEMINFO_PATH: FilePath = "/proc/meminfo"
+"""The path to the file containing the memory information.
+"""
+
+SYS_CPU_PATH: FilePath = "/sys/devices/system/cpu"
+"""The path to the sysfs directory of the CPUs, containing the list of online CPUs
+and the CPU caches.
+"""
+
+SYS_PCI_DEVICES_PATH: FilePath = "/sys/bus/pci/devices"
+"""The path to the sysfs directory of the PCI devices.
+"""
+
+CGROUP_ROOT_PATH: FilePath = "/sys/fs/cgroup"
+"""The path to the mount point of the cgroup file systems.
+"""
+
+PROC_SELF_CGROUP_PATH: FilePath = "/proc/self/cgroup"
+"""The path to the file containing the cgroups of this process.
+"""
+
+CGROUP_V1_UNLIMITED = 2**62
+"""Memory limits of cgroup v1 greater than this are unlimited, the value
+`memory.limit_in_bytes` contains if no limit is set is the biggest page aligned
+64 bit integer.
+"""
+
+PCI_IDS_PATHS: List[FilePath] = [
+    "/usr/share/hwdata/pci.ids",
+    "/usr/share/misc/pci.ids",
+    "/usr/share/pci.ids",
+]
+"""The paths to search for the PCI ID database, used to get the names of the GPUs.
+"""
+
+PCI_CLASS_VGA = "0x0300"
+"""The PCI class of a VGA compatible controller, the class `lspci` shows as `VGA`.
+"""
+
 
 ################################################################################
 def getOSMajVers() -> CmdOutput:
@@ -166,3 +218,451 @@ def getGPUNamesSbinLinux() -> CmdOutput:
     return runCommand(
         exe_args=ExeArgs("bash", ["-c", "/sbin/lspci|grep VGA|cut -f3 -d':'"])
     )
+
+
+################################################################################
+def readOSRelease(path: FilePath = OS_RELEASE_PATH) -> Dict[str, str]:
+    """Returns the OS name and version read from `/etc/os-release`.
+
+    Like the command `grep NAME /etc/os-release |head -1|cut -d'=' -f2`, the first
+    line containing `NAME` and the first line containing `VERSION` are used.
+
+    Args:
+        path (FilePath, optional): The path to the file to read. Defaults to
+                                    `/etc/os-release`.
+
+    Raises:
+        OSError: if the file can't be read.
+
+    Returns:
+        Dict[str, str]: The OS name with the key `os_vers_major` and the OS version
+                        with the key `os_vers`, if these are contained in the file.
+    """
+    ret_val = {}
+    with io.open(path, mode="r", encoding="utf-8") as file:
+        for line in file:
+            for key, attribute in [("NAME", "os_vers_major"), ("VERSION", "os_vers")]:
+                if key in line and attribute not in ret_val:
+                    ret_val[attribute] = line.split("=")[1].strip().replace('"', "")
+
+    return ret_val
+
+
+################################################################################
+def readCPUInfo(path: FilePath = CPUINFO_PATH) -> Dict[str, object]:
+    """Returns the CPU name and the number of cores read from `/proc/cpuinfo`.
+
+    Like the `grep` commands, the values of the first processor are used.
+
+    Args:
+        path (FilePath, optional): The path to the file to read. Defaults to
+                                    `/proc/cpuinfo`.
+
+    Raises:
+        OSError: if the file can't be read.
+
+    Returns:
+        Dict[str, object]: The CPU name with the key `cpu`, the number of physical
+                        cores with the key `num_cores` and the number of logical
+                        cores with the key `num_logical_cores`, if these are
+                        contained in the file.
+    """
+    keys = {
+        "model name": "cpu",
+        "cpu cores": "num_cores",
+        "siblings": "num_logical_cores",
+    }
+    ret_val = {}
+    with io.open(path, mode="r", encoding="utf-8") as file:
+        for line in file:
+            key, _, value = line.partition(":")
+            attribute = keys.get(key.strip())
+            if attribute is not None and attribute not in ret_val:
+                ret_val[attribute] = value.strip()
+
+    if "num_cores" in ret_val:
+        ret_val["num_cores"] = int(ret_val["num_cores"])
+    if "num_logical_cores" in ret_val:
+        ret_val["num_logical_cores"] = int(ret_val["num_logical_cores"])
+
+    return ret_val
+
+
+################################################################################
+def readNumOnlineCPUs(sys_cpu_path: FilePath = SYS_CPU_PATH) -> int:
+    """Returns the number of online logical CPUs, read from
+    `/sys/devices/system/cpu/online`.
+
+    Used if `/proc/cpuinfo` doesn't contain the number of cores, like on ARM.
+
+    Args:
+        sys_cpu_path (FilePath, optional): The path to the sysfs CPU directory.
+                                    Defaults to `/sys/devices/system/cpu`.
+
+    Raises:
+        OSError: if the file can't be read.
+        ValueError: if the file's content isn't a valid CPU list.
+
+    Returns:
+        int: The number of online CPUs.
+    """
+    online = pathlib.Path(sys_cpu_path, "online").read_text().strip()
+
+    ret_val = 0
+    for cpu_range in online.split(","):
+        first, _, last = cpu_range.partition("-")
+        ret_val += int(last) - int(first) + 1 if last != "" else 1
+
+    return ret_val
+
+
+################################################################################
+def readCacheSizes(sys_cpu_path: FilePath = SYS_CPU_PATH) -> Dict[int, int]:
+    """Returns the sizes of the data and unified caches of the first CPU, read from
+    `/sys/devices/system/cpu/cpu0/cache/index*`.
+
+    Args:
+        sys_cpu_path (FilePath, optional): The path to the sysfs CPU directory.
+                                    Defaults to `/sys/devices/system/cpu`.
+
+    Raises:
+        OSError: if the files can't be read.
+
+    Returns:
+        Dict[int, int]: The cache sizes in bytes, keyed by the cache level.
+    """
+    units = {"K": 1024, "M": 1024 * 1024, "G": 1024 * 1024 * 1024}
+    ret_val = {}
+    for index_dir in sorted(pathlib.Path(sys_cpu_path, "cpu0", "cache").glob("index*")):
+        if (index_dir / "type").read_text().strip() == "Instruction":
+            continue
+        level = int((index_dir / "level").read_text())
+        size = (index_dir / "size").read_text().strip()
+        if size[-1:] in units:
+            ret_val[level] = int(size[:-1]) * units[size[-1]]
+        else:
+            ret_val[level] = int(size)
+
+    return ret_val
+
+
+################################################################################
+def readRAMSize(path: FilePath = MEMINFO_PATH) -> int:
+    """Returns the RAM size in bytes, read from `/proc/meminfo`.
+
+    Args:
+        path (FilePath, optional): The path to the file to read. Defaults to
+                                    `/proc/meminfo`.
+
+    Raises:
+        OSError: if the file can't be read.
+        ValueError: if the file doesn't contain the total memory.
+
+    Returns:
+        int: The RAM size in bytes.
+    """
+    with io.open(path, mode="r", encoding="utf-8") as file:
+        for line in file:
+            if line.startswith("MemTotal:"):
+                size, _, unit = line.split(":")[1].strip().partition(" ")
+                return int(size) * 1024 if unit == "kB" else int(size)
+
+    raise ValueError('"MemTotal" not found in "{path}"'.format(path=path))
+
+
+################################################################################
+def readGPUNames(
+    pci_devices_path: FilePath = SYS_PCI_DEVICES_PATH,
+    pci_ids_paths: List[FilePath] = None,
+) -> List[str]:
+    """Returns the names of the GPUs, the VGA compatible PCI devices, in the format
+    of `lspci`.
+
+    The PCI vendor and device IDs are read from `/sys/bus/pci/devices`, the names
+    are looked up in the PCI ID database `pci.ids`.
+
+    Args:
+        pci_devices_path (FilePath, optional): The path to the sysfs PCI device
+                                    directory. Defaults to `/sys/bus/pci/devices`.
+        pci_ids_paths (List[FilePath], optional): The paths to search for the PCI ID
+                                    database. Defaults to `PCI_IDS_PATHS`.
+
+    Raises:
+        OSError: if the files can't be read or the PCI ID database isn't found.
+
+    Returns:
+        List[str]: The names of the GPUs.
+    """
+    if pci_ids_paths is None:
+        pci_ids_paths = PCI_IDS_PATHS
+
+    gpus = []
+    for device_dir in sorted(pathlib.Path(pci_devices_path).glob("*")):
+        if not (device_dir / "class").read_text().startswith(PCI_CLASS_VGA):
+            continue
+        gpus.append(
+            (
+                (device_dir / "vendor").read_text().strip()[2:].lower(),
+                (device_dir / "device").read_text().strip()[2:].lower(),
+                int((device_dir / "revision").read_text().strip(), 16),
+            )
+        )
+
+    if gpus == []:
+        return []
+
+    pci_ids_path = next(
+        (path for path in pci_ids_paths if pathlib.Path(path).is_file()), None
+    )
+    if pci_ids_path is None:
+        raise FileNotFoundError(
+            'PCI ID database not found in "{paths}"'.format(paths=pci_ids_paths)
+        )
+
+    vendor_names, device_names = readPCINames(
+        pci_ids_path, {(vendor, device) for vendor, device, _ in gpus}
+    )
+
+    ret_val = []
+    for vendor, device, revision in gpus:
+        name = " ".join(
+            [
+                vendor_names.get(vendor, vendor),
+                device_names.get((vendor, device), device),
+            ]
+        )
+        if revision != 0:
+            name = "{name} (rev {rev:02x})".format(name=name, rev=revision)
+        ret_val.append(name)
+
+    return ret_val
+
+
+################################################################################
+def readCgroupDirs(
+    controller: str,
+    cgroup_root: FilePath = CGROUP_ROOT_PATH,
+    proc_self_cgroup: FilePath = PROC_SELF_CGROUP_PATH,
+) -> List[pathlib.Path]:
+    """Returns the directories of the cgroup of this process and of all parent
+    cgroups, of cgroup v1 with the given controller and of cgroup v2.
+
+    Directories that don't exist, like the cgroup path of the host in a container,
+    are skipped. The root directories of the cgroup hierarchies are always
+    returned, as these are the cgroup of the container in a container.
+
+    Args:
+        controller (str): The name of the cgroup v1 controller, like `cpu` or
+                        `memory`.
+        cgroup_root (FilePath, optional): The mount point of the cgroup file
+                        systems. Defaults to `/sys/fs/cgroup`.
+        proc_self_cgroup (FilePath, optional): The path to the file containing the
+                        cgroups of this process. Defaults to `/proc/self/cgroup`.
+
+    Raises:
+        OSError: if `/proc/self/cgroup` can't be read.
+
+    Returns:
+        List[pathlib.Path]: The existing cgroup directories.
+    """
+    hierarchy_dirs = []
+    with io.open(proc_self_cgroup, mode="r", encoding="utf-8") as file:
+        for line in file:
+            _, controllers, cgroup_path = line.strip().split(":", 2)
+            if controllers == "":
+                # cgroup v2, mounted at the root or at `unified` in hybrid mode
+                for mount_dir in ["", "unified"]:
+                    hierarchy_dirs.append(
+                        (pathlib.Path(cgroup_root, mount_dir), cgroup_path)
+                    )
+            elif controller in controllers.split(","):
+                for mount_dir in [controllers, controller]:
+                    hierarchy_dirs.append(
+                        (pathlib.Path(cgroup_root, mount_dir), cgroup_path)
+                    )
+
+    ret_val = []
+    for hierarchy_dir, cgroup_path in hierarchy_dirs:
+        cgroup_dir = pathlib.Path(hierarchy_dir, cgroup_path.lstrip("/"))
+        while cgroup_dir != hierarchy_dir:
+            if cgroup_dir.is_dir() and cgroup_dir not in ret_val:
+                ret_val.append(cgroup_dir)
+            cgroup_dir = cgroup_dir.parent
+        if hierarchy_dir.is_dir() and hierarchy_dir not in ret_val:
+            ret_val.append(hierarchy_dir)
+
+    return ret_val
+
+
+################################################################################
+def readCgroupCPULimit(
+    cgroup_root: FilePath = CGROUP_ROOT_PATH,
+    proc_self_cgroup: FilePath = PROC_SELF_CGROUP_PATH,
+) -> int:
+    """Returns the number of CPUs this process may use, the CPU quota of the
+    cgroup v2 `cpu.max` or of cgroup v1 `cpu.cfs_quota_us` divided by the period,
+    rounded up.
+
+    The smallest quota of the process' cgroup and all parent cgroups is used.
+
+    Args:
+        cgroup_root (FilePath, optional): The mount point of the cgroup file
+                        systems. Defaults to `/sys/fs/cgroup`.
+        proc_self_cgroup (FilePath, optional): The path to the file containing the
+                        cgroups of this process. Defaults to `/proc/self/cgroup`.
+
+    Raises:
+        OSError: if `/proc/self/cgroup` can't be read.
+
+    Returns:
+        int: The number of CPUs, `None` if no CPU quota is set.
+    """
+    ret_val = None
+    for cgroup_dir in readCgroupDirs("cpu", cgroup_root, proc_self_cgroup):
+        try:
+            if (cgroup_dir / "cpu.max").is_file():
+                quota, _, period = (cgroup_dir / "cpu.max").read_text().partition(" ")
+            else:
+                quota = (cgroup_dir / "cpu.cfs_quota_us").read_text()
+                period = (cgroup_dir / "cpu.cfs_period_us").read_text()
+            if quota.strip() in ["max", "-1"]:
+                continue
+            num_cpus = max(1, math.ceil(int(quota) / int(period)))
+        except (OSError, ValueError, ZeroDivisionError):
+            continue
+        if ret_val is None or num_cpus < ret_val:
+            ret_val = num_cpus
+
+    return ret_val
+
+
+################################################################################
+def readCgroupMemoryLimit(
+    cgroup_root: FilePath = CGROUP_ROOT_PATH,
+    proc_self_cgroup: FilePath = PROC_SELF_CGROUP_PATH,
+) -> int:
+    """Returns the memory this process may use in bytes, the limit of the
+    cgroup v2 `memory.max` or of cgroup v1 `memory.limit_in_bytes`.
+
+    The smallest limit of the process' cgroup and all parent cgroups is used.
+
+    Args:
+        cgroup_root (FilePath, optional): The mount point of the cgroup file
+                        systems. Defaults to `/sys/fs/cgroup`.
+        proc_self_cgroup (FilePath, optional): The path to the file containing the
+                        cgroups of this process. Defaults to `/proc/self/cgroup`.
+
+    Raises:
+        OSError: if `/proc/self/cgroup` can't be read.
+
+    Returns:
+        int: The memory limit in bytes, `None` if no memory limit is set.
+    """
+    ret_val = None
+    for cgroup_dir in readCgroupDirs("memory", cgroup_root, proc_self_cgroup):
+        try:
+            if (cgroup_dir / "memory.max").is_file():
+                limit = (cgroup_dir / "memory.max").read_text().strip()
+            else:
+                limit = (cgroup_dir / "memory.limit_in_bytes").read_text().strip()
+            if limit == "max" or int(limit) > CGROUP_V1_UNLIMITED:
+                continue
+            memory = int(limit)
+        except (OSError, ValueError):
+            continue
+        if ret_val is None or memory < ret_val:
+            ret_val = memory
+
+    return ret_val
+
+
+################################################################################
+def readHostFingerprintData(
+    cpuinfo_path: FilePath = CPUINFO_PATH,
+    meminfo_path: FilePath = MEMINFO_PATH,
+    pci_devices_path: FilePath = SYS_PCI_DEVICES_PATH,
+) -> List[str]:
+    """Returns the hardware information the fingerprint of this host is calculated
+    of: the CPU model names of `/proc/cpuinfo`, the total memory of `/proc/meminfo`
+    and the PCI IDs and classes of all PCI devices.
+
+    Args:
+        cpuinfo_path (FilePath, optional): The path to the CPU information. Defaults
+                                    to `/proc/cpuinfo`.
+        meminfo_path (FilePath, optional): The path to the memory information.
+                                    Defaults to `/proc/meminfo`.
+        pci_devices_path (FilePath, optional): The path to the sysfs PCI device
+                                    directory. Defaults to `/sys/bus/pci/devices`.
+
+    Raises:
+        OSError: if `/proc/cpuinfo` or `/proc/meminfo` can't be read.
+
+    Returns:
+        List[str]: The lines of hardware information.
+    """
+    ret_val = []
+    with io.open(cpuinfo_path, mode="r", encoding="utf-8") as file:
+        ret_val.extend(line.strip() for line in file if line.startswith("model name"))
+    with io.open(meminfo_path, mode="r", encoding="utf-8") as file:
+        ret_val.extend(line.strip() for line in file if line.startswith("MemTotal:"))
+
+    for device_dir in sorted(pathlib.Path(pci_devices_path).glob("*")):
+        try:
+            ret_val.append(
+                " ".join(
+                    [device_dir.name]
+                    + [
+                        (device_dir / name).read_text().strip()
+                        for name in ["vendor", "device", "class"]
+                    ]
+                )
+            )
+        except OSError:
+            ret_val.append(device_dir.name)
+
+    return ret_val
+
+
+################################################################################
+def readPCINames(
+    path: FilePath, ids: Set[Tuple[str, str]]
+) -> Tuple[Dict[str, str], Dict[Tuple[str, str], str]]:
+    """Returns the vendor and device names of the given PCI IDs, read from the PCI
+    ID database `pci.ids`.
+
+    Args:
+        path (FilePath): The path to the PCI ID database.
+        ids (Set[Tuple[str, str]]): The `(vendor ID, device ID)` tuples to look up,
+                                    the IDs as lowercase hex strings.
+
+    Raises:
+        OSError: if the file can't be read.
+
+    Returns:
+        Tuple[Dict[str, str], Dict[Tuple[str, str], str]]: The vendor names keyed by
+                        the vendor ID and the device names keyed by the
+                        `(vendor ID, device ID)` tuples.
+    """
+    vendors = {vendor for vendor, _ in ids}
+    vendor_names = {}
+    device_names = {}
+    vendor = None
+    with io.open(path, mode="r", encoding="utf-8", errors="replace") as file:
+        for line in file:
+            if line.startswith("#") or line.strip() == "":
+                continue
+            # the device classes follow the vendors and devices
+            if line.startswith("C "):
+                break
+            if not line.startswith("\t"):
+                vendor, _, vendor_name = line.strip().partition("  ")
+                if vendor in vendors:
+                    vendor_names[vendor] = vendor_name
+                else:
+                    vendor = None
+            elif vendor is not None and not line.startswith("\t\t"):
+                device, _, device_name = line.strip().partition("  ")
+                if (vendor, device) in ids:
+                    device_names[(vendor, device)] = device_name
+
+    return vendor_names, device_names
@@ -8,6 +8,7 @@
 
 from __future__ import annotations
 
+import copy
 import logging
 import pprint
 import sys
@@ -17,6 +18,7 @@ from buildnis.modules import EXT_ERR_LD_FILE
 from buildnis.modules.config import CFG_VERSION, FilePath
 from buildnis.modules.helpers import LOGGER_NAME
 from buildnis.modules.helpers.config_parser import parseConfigElement
+from buildnis.modules.helpers.inotify import InotifyException, getConfigWatcher
 from buildnis.modules.helpers.json import getJSONDict, readJSON, writeJSON
 
 
@@ -26,10 +28,15 @@ class JSONBaseClass:
     Holds the values of the JSON file in it'S attributes (all except
     `_logger`, the `loggin.Logger` instance).
 
+    If the inotify watcher of `modules.helpers.inotify` is running, the original
+    JSON file is only hashed again if it has changed since the last check.
+
     Methods:
         hasConfigChangedOnDisk: Returns `True` if the JSON configuration has
                                 changed since the time the checksum has been
                                 calculated.
+        hasOrigFileChanged: Like `hasConfigChangedOnDisk`, but raises an
+                                exception on errors.
         expandAllPlaceholders: Replaces all placeholders (like `${PLACEHOLDER}`)
                                 in the instance's attribute values.
         readJSON: Reads the JSON config file and saves the values to attributes.
@@ -147,7 +154,7 @@ class JSONBaseClass:
                    `False` else
         """
         try:
-            return self.orig_file.hasChanged(not_exist_is_excp=True)
+            return self.hasOrigFileChanged()
         except Exception as excp:
             self._logger.error(
                 'error "{error}" calculating checksum of JSON file "{path}"'.format(
@@ -162,7 +169,7 @@ class JSONBaseClass:
         time the checksum has been calculated, if yes, it is reread from disk.
         """
         try:
-            if self.orig_file.hasChanged(not_exist_is_excp=True):
+            if self.hasOrigFileChanged():
                 self._logger.warning(
                     'Rereading {name} configuration from JSON file "{json_path}"'.format(
                         name=self.config_name, json_path=self.orig_file.path
@@ -186,7 +193,7 @@ class JSONBaseClass:
         and the generated JSON file is written to it's file path.
         """
         try:
-            if self.orig_file.hasChanged(not_exist_is_excp=True):
+            if self.hasOrigFileChanged():
                 tmp_json_path = self.json_path
                 self.readJSON(json_path=self.orig_file.path)
                 self.json_path = tmp_json_path
@@ -199,6 +206,44 @@ class JSONBaseClass:
                 )
             )
 
+    ###########################################################################
+    def hasOrigFileChanged(self) -> bool:
+        """Returns `True` if the original JSON file has changed since the time the
+        checksum has been calculated.
+
+        If the configuration file watcher is running and the file hasn't changed
+        since the last check, the file isn't hashed again.
+
+        Raises:
+            FileCompareException: if the file doesn't exist or can't be hashed.
+
+        Returns:
+            bool: `True` if the original JSON file has changed, `False` else.
+        """
+        watcher = getConfigWatcher()
+        if watcher is None:
+            return self.orig_file.hasChanged(not_exist_is_excp=True)
+
+        path = self.orig_file.path
+        if not watcher.isDirty(path, self.orig_file.hash):
+            return False
+
+        try:
+            watcher.watch(path, self.orig_file.hash)
+        except InotifyException as excp:
+            self._logger.warning(
+                'error "{error}" watching JSON file "{path}"'.format(
+                    error=excp, path=path
+                )
+            )
+            return self.orig_file.hasChanged(not_exist_is_excp=True)
+
+        has_changed = self.orig_file.hasChanged(not_exist_is_excp=True)
+        if has_changed:
+            watcher.markDirty(path)
+
+        return has_changed
+
     ##########################################################################
     def addAttributesIfNotExist(self, attributes: Dict[str, object]) -> None:
         """Adds each attribute in the given dictionary of attributes.
@@ -231,7 +276,7 @@ class JSONBaseClass:
 ################################################################################
 def setAttrIfNotExist(instance: object, attributes: Dict[str, object]) -> None:
     """Check if the given object has each of the given attributes, if not, set it to
-    the given value.
+    a copy of the given value.
 
     Args:
         instance (object): The instance to check for attributes.
@@ -240,4 +285,4 @@ def setAttrIfNotExist(instance: object, attributes: Dict[str, object]) -> None:
     """
     for attr in attributes:
         if not hasattr(instance, attr):
-            setattr(instance, attr, attributes[attr])
+            setattr(instance, attr, copy.copy(attributes[attr]))
@@ -14,6 +14,7 @@ import pathlib
 from typing import List
 
 from buildnis.modules.config import PROJECT_DEP_FILE_NAME, FilePath
+from buildnis.modules.config.config_records import DEPENDENCY_ATTRIBUTES
 from buildnis.modules.config.json_base_class import JSONBaseClass, setAttrIfNotExist
 from buildnis.modules.helpers.execute import (
     ExeArgs,
@@ -140,20 +141,7 @@ class ProjectDependency(JSONBaseClass):
         Args:
             dep (object): The object to check for must-have attributes.
         """
-        must_have_attrs = {
-            "name": "",
-            "website_url": "",
-            "download_url": "",
-            "download_dir": "",
-            "install_cmd": "",
-            "ok_if_exists": "",
-            "executable_check_regex": "",
-            "executable_argument": "",
-            "ok_if_executable": "",
-            "is_checked": False,
-            "install_arguments": [],
-        }
-        setAttrIfNotExist(instance=dep, attributes=must_have_attrs)
+        setAttrIfNotExist(instance=dep, attributes=DEPENDENCY_ATTRIBUTES)
 
     ############################################################################
     def isDependencyFulfilled(self, dep: object) -> bool:
@@ -11,9 +11,13 @@ __all__ = [
     "commandline",
     "commandline_arguments",
     "config_parser",
+    "env_cache",
     "execute",
     "files",
     "file_compare",
+    "hash_cache",
+    "inotify",
+    "jobserver",
     "json",
     "logging",
     "web",
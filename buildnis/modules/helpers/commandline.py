@@ -155,6 +155,145 @@ Examples:
         help="The directory in which additional build tool configure scripts are shearched for. Default: none, use only included ones.",
     )
 
+    cache_group = cmd_line_parser.add_argument_group(
+        "Caches", "Options about the caches used to speed up the build"
+    )
+
+    cache_group.add_argument(
+        "--no-hash-cache",
+        help="Do not use the cache of file hashes, always read files to compare them.",
+        default=True,
+        action="store_false",
+        dest="use_hash_cache",
+    )
+
+    cache_group.add_argument(
+        "--no-host-cache",
+        help="Do not reuse the host configuration written by a previous run if the host's fingerprint is unchanged, gather the host's information again.",
+        default=True,
+        action="store_false",
+        dest="use_host_cache",
+    )
+
+    cache_group.add_argument(
+        "--no-version-cache",
+        help="Do not use the versions of the build tools saved in the build tool configuration, run every build tool to check its version.",
+        default=True,
+        action="store_false",
+        dest="use_version_cache",
+    )
+
+    cache_group.add_argument(
+        "--no-env-cache",
+        help="Do not use the cache of environments set by environment scripts, source the environment script of a build tool for every call.",
+        default=True,
+        action="store_false",
+        dest="use_env_cache",
+    )
+
+    cache_group.add_argument(
+        "--no-build-log",
+        help="Do not use the log of the build jobs run by previous builds, run every build job even if it is up to date.",
+        default=True,
+        action="store_false",
+        dest="use_build_log",
+    )
+
+    cache_group.add_argument(
+        "--no-config-snapshot",
+        help="Do not use the snapshot of the parsed project configuration, always parse all JSON configuration files.",
+        default=True,
+        action="store_false",
+        dest="use_config_snapshot",
+    )
+
+    cache_group.add_argument(
+        "--artifact-cache-size",
+        help="The maximum size of the cache of build stage results in MiB. The least recently used results are deleted if the cache gets bigger. Default: 2048 MiB",
+        type=int,
+        default=2048,
+        metavar="SIZE",
+        dest="artifact_cache_size",
+    )
+
+    cache_group.add_argument(
+        "--artifact-cache-hardlinks",
+        help="Restore build stage results from the cache using hard links, if reflinks are not supported by the file system. Only use this if no build tool changes existing output files.",
+        default=False,
+        action="store_true",
+        dest="artifact_cache_hardlinks",
+    )
+
+    cache_group.add_argument(
+        "--artifact-cache-stats",
+        help="Only print the statistics of the cache of build stage results, the hit and miss counts and the size of the cache.",
+        default=False,
+        action="store_true",
+        dest="show_artifact_cache_stats",
+    )
+
+    parallel_group = cmd_line_parser.add_argument_group(
+        "Parallel execution", "Options about running commands concurrently"
+    )
+
+    parallel_group.add_argument(
+        "--configure-jobs",
+        help="The maximum number of build tool configure scripts and build tool version checks to run at the same time. Default: 0, the number of CPUs Buildnis may use (CPU affinity and container CPU quota) plus 4, but at most 32.",
+        type=int,
+        default=0,
+        metavar="NUM",
+        dest="configure_jobs",
+    )
+    parallel_group.add_argument(
+        "-j",
+        "--jobs",
+        help="The maximum number of build jobs to run at the same time. Default: 0, the number of CPUs Buildnis may use (CPU affinity and container CPU quota).",
+        type=int,
+        default=0,
+        metavar="NUM",
+        dest="build_jobs",
+    )
+    parallel_group.add_argument(
+        "-k",
+        "--keep-going",
+        help="Don't stop the build at the first failed build job, build everything that doesn't depend on a failed job.",
+        default=False,
+        action="store_true",
+        dest="keep_going",
+    )
+    parallel_group.add_argument(
+        "--memory-fraction",
+        help="Only start a build job if the estimated memory usage of all running build jobs stays below this fraction of the RAM Buildnis may use (physical RAM and container memory limit). 0 disables the limit. Default: 0.8",
+        type=float,
+        default=0.8,
+        metavar="FRACTION",
+        dest="memory_fraction",
+    )
+    parallel_group.add_argument(
+        "-l",
+        "--max-load",
+        help="Don't start a new build job while another one is running and the load average is at least LOAD. Default: 0, no limit.",
+        type=float,
+        default=0.0,
+        metavar="LOAD",
+        dest="max_load",
+    )
+    parallel_group.add_argument(
+        "--max-cpu-pressure",
+        help="Don't start a new build job while another one is running and the CPU pressure (Linux PSI, percentage of the last 10 seconds tasks have waited for a CPU) is at least PERCENT. Default: 0, no limit.",
+        type=float,
+        default=0.0,
+        metavar="PERCENT",
+        dest="max_cpu_pressure",
+    )
+    parallel_group.add_argument(
+        "--no-jobserver",
+        help="Do not use the GNU make jobserver of a calling make and do not pass a jobserver to the makes called by build tools.",
+        default=True,
+        action="store_false",
+        dest="use_jobserver",
+    )
+
     phase_group = cmd_line_parser.add_argument_group(
         "Phases of the build", "Only run one of the phases of a full build."
     )
@@ -182,6 +321,13 @@ Examples:
         nargs="*",
         action="append",
     )
+    phase_group.add_argument(
+        "--generator",
+        help="Write a build file for the given build system to the generated configuration directory, to build the project with it instead of Buildnis. Supported: ninja",
+        choices=["ninja"],
+        default="",
+        dest="generator",
+    )
     phase_group.add_argument(
         "--clean",
         help="Clean the project. Deletes all files and directories generated during the build.",
@@ -31,6 +31,36 @@ class CommandlineArguments:
                                 configurations to
         conf_scripts_dir (FilePath): the path to the directory to search for additional
                                     build tool configure scripts.
+        use_hash_cache (bool): use the persistent cache of file hashes.
+        use_config_snapshot (bool): use the snapshot of the parsed project
+                                    configuration.
+        use_env_cache (bool): use the persistent cache of environments set by
+                                environment scripts.
+        use_build_log (bool): skip build jobs that are up to date according to the
+                                log of the previous builds.
+        use_version_cache (bool): use the versions of the build tools checked by
+                                the previous run.
+        use_host_cache (bool): reuse the host configuration if the host's
+                                fingerprint hasn't changed.
+        artifact_cache_size (int): the maximum size of the artifact cache in MiB.
+        artifact_cache_hardlinks (bool): restore cached build results using hard
+                                        links.
+        show_artifact_cache_stats (bool): only show the artifact cache statistics.
+        configure_jobs (int): the maximum number of configure scripts and build
+                                tool version checks to run at the same time, 0
+                                uses the default.
+        build_jobs (int): the maximum number of build jobs to run at the same time,
+                            0 uses the default.
+        keep_going (bool): don't stop the build at the first failed build job.
+        memory_fraction (float): the fraction of the RAM the estimated memory usage
+                                of all running build jobs must stay below, 0 for
+                                no limit.
+        max_load (float): the load average to not start new build jobs at, 0 for
+                                no limit.
+        max_cpu_pressure (float): the CPU pressure in percent to not start new
+                                build jobs at, 0 for no limit.
+        use_jobserver (bool): use the GNU make jobserver of a calling make or
+                                create one for the called makes.
         log_file (FilePath): the path to the log file to write.
         log_level (int): the minimum log level
         do_configure (bool): run only  the configure phase of the build
@@ -38,6 +68,8 @@ class CommandlineArguments:
         build_targets (List[str]): list of build targets that should be build
         do_install (bool): only run the install phase of the build
         install_targets (List[str]): the list of targets to install
+        generator (str): the build system to write a build file for, the empty
+                        string for none.
         do_clean (bool): delete all files generated by the build phase
         do_distclean (bool): delete all generated files (build and configuration)
         do_check_what_to_do (bool): do everything that has not been done yet.
@@ -79,6 +111,10 @@ class CommandlineArguments:
 
         self.setStages(src)
 
+        self.setCaches(src)
+
+        self.setParallelism(src)
+
         try:
             self.build_targets: List(str) = src.build_targets
         except AttributeError:
@@ -108,6 +144,88 @@ class CommandlineArguments:
         except AttributeError:
             self.conf_scripts_dir: FilePath = ""
 
+    ############################################################################
+    def setCaches(self, src: object) -> None:
+        """Set arguments about the caches to use.
+
+        Args:
+            src (object): The original object holding the command line arguments.
+        """
+        try:
+            self.use_hash_cache: bool = src.use_hash_cache
+        except AttributeError:
+            self.use_hash_cache: bool = True
+        try:
+            self.use_config_snapshot: bool = src.use_config_snapshot
+        except AttributeError:
+            self.use_config_snapshot: bool = True
+        try:
+            self.use_env_cache: bool = src.use_env_cache
+        except AttributeError:
+            self.use_env_cache: bool = True
+        try:
+            self.use_build_log: bool = src.use_build_log
+        except AttributeError:
+            self.use_build_log: bool = True
+
+        try:
+            self.use_version_cache: bool = src.use_version_cache
+        except AttributeError:
+            self.use_version_cache: bool = True
+
+        try:
+            self.use_host_cache: bool = src.use_host_cache
+        except AttributeError:
+            self.use_host_cache: bool = True
+        try:
+            self.artifact_cache_size: int = src.artifact_cache_size
+        except AttributeError:
+            self.artifact_cache_size: int = 2048
+        try:
+            self.artifact_cache_hardlinks: bool = src.artifact_cache_hardlinks
+        except AttributeError:
+            self.artifact_cache_hardlinks: bool = False
+        try:
+            self.show_artifact_cache_stats: bool = src.show_artifact_cache_stats
+        except AttributeError:
+            self.show_artifact_cache_stats: bool = False
+
+    ############################################################################
+    def setParallelism(self, src: object) -> None:
+        """Set arguments about running commands concurrently.
+
+        Args:
+            src (object): The original object holding the command line arguments.
+        """
+        try:
+            self.configure_jobs: int = src.configure_jobs
+        except AttributeError:
+            self.configure_jobs: int = 0
+        try:
+            self.build_jobs: int = src.build_jobs
+        except AttributeError:
+            self.build_jobs: int = 0
+        try:
+            self.keep_going: bool = src.keep_going
+        except AttributeError:
+            self.keep_going: bool = False
+        try:
+            self.memory_fraction: float = src.memory_fraction
+        except AttributeError:
+            self.memory_fraction: float = 0.8
+        try:
+            self.max_load: float = src.max_load
+        except AttributeError:
+            self.max_load: float = 0.0
+        try:
+            self.max_cpu_pressure: float = src.max_cpu_pressure
+        except AttributeError:
+            self.max_cpu_pressure: float = 0.0
+        try:
+            self.use_jobserver: bool = src.use_jobserver
+        except AttributeError:
+            self.use_jobserver: bool = True
+
     ############################################################################
     def setStages(self, src: object) -> None:
         """Set arguments for the stages of the build.
@@ -127,6 +245,10 @@ class CommandlineArguments:
             self.do_install: bool = src.do_install
         except AttributeError:
             self.do_install: bool = False
+        try:
+            self.generator: str = src.generator
+        except AttributeError:
+            self.generator: str = ""
         self.setCleanStages(src)
 
     ############################################################################
@@ -8,23 +8,142 @@
 
 from __future__ import annotations
 
+import functools
 import logging
-import re
-from typing import List
+from typing import Callable, Dict, List, NamedTuple, Set, Tuple
 
+from buildnis.modules.config.config_records import ConfigRecord, hasAttributes
+from buildnis.modules.helpers import LOGGER_NAME
 from buildnis.modules.helpers.file_compare import FileCompare
-from buildnis.modules.helpers.placeholder_regex import (
-    placeholder_regex,
-    replaceConstants,
-)
+from buildnis.modules.helpers.placeholder_regex import CONSTANT_GETTERS, constant_regex
+
+TEMPLATE_CACHE_SIZE: int = 16384
+"""The maximum number of compiled templates of configuration strings to cache.
+"""
+
+
+class Reference(NamedTuple):
+    """A placeholder referencing another configuration value, like `${../name}`.
+
+    Attributes:
+        parent_id (int): The index of the parent to search the value in, minus the
+                        number of `../`.
+        name (str): The name of the configuration value to substitute.
+        text (str): The placeholder's text, including `${` and `}`.
+    """
+
+    parent_id: int
+    name: str
+    text: str
+
+
+class Template(NamedTuple):
+    """A configuration string parsed into its segments.
+
+    Attributes:
+        segments (Tuple[object, ...]): The segments of the string: literal strings,
+                            functions returning the value of a constant and
+                            `Reference` instances.
+        num_references (int): The number of `Reference` segments.
+    """
+
+    segments: Tuple[object, ...]
+    num_references: int
+
+
+############################################################################
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compileTemplate(item: str) -> Template:
+    """Parses the given string into a template of literal strings, constants and
+    references to other configuration values.
+
+    The results are cached, each distinct string is only parsed once.
+
+    Args:
+        item (str): The string to parse.
+
+    Returns:
+        Template: The segments of the string.
+    """
+    segments = []
+    num_references = 0
+    position = 0
+    for match in constant_regex.finditer(item):
+        if match.start() > position:
+            segments.append(item[position : match.start()])
+        position = match.end()
+
+        placeholder = match.group(1)
+        getter = CONSTANT_GETTERS.get(placeholder)
+        if getter is not None:
+            segments.append(getter)
+            continue
+
+        parent_to_use_id = 0
+        while placeholder.startswith("../"):
+            placeholder = placeholder[3:]
+            parent_to_use_id -= 1
+        segments.append(
+            Reference(parent_id=parent_to_use_id, name=placeholder, text=match.group(0))
+        )
+        num_references += 1
+
+    if position < len(item):
+        segments.append(item[position:])
+
+    return Template(segments=tuple(segments), num_references=num_references)
+
+
+############################################################################
+def expandTemplate(template: Template, lookup: Callable[[Reference], object]) -> object:
+    """Returns the string of the given template with all constants and references
+    expanded.
+
+    References that can't be looked up are left unaltered.
+
+    Args:
+        template (Template): The compiled template of the string to expand.
+        lookup (Callable[[Reference], object]): The function returning the value of
+                            a reference. Raises an exception if the reference can't
+                            be found.
+
+    Returns:
+        object: The expanded string. If the string contains a single reference to
+                an object that is not a string, this object is returned.
+    """
+    ret_val = []
+    for segment in template.segments:
+        if isinstance(segment, str):
+            ret_val.append(segment)
+
+        elif isinstance(segment, Reference):
+            try:
+                substitute = lookup(segment)
+            except Exception:
+                ret_val.append(segment.text)
+                continue
+            if isinstance(substitute, str):
+                ret_val.append(substitute)
+            elif template.num_references == 1:
+                return substitute
+            else:
+                ret_val.append(segment.text)
+
+        else:
+            ret_val.append(segment())
+
+    return "".join(ret_val)
 
 
 ############################################################################
 def expandItem(item: str, parents: List[object]) -> object:
-    """Parses the given item, if it contains a placeholder, that placeholder
-    is expanded. If the item doesn't contain a placeholder, the item's
+    """Parses the given item, if it contains placeholders, these placeholders
+    are expanded. If the item doesn't contain a placeholder, the item's
     unaltered string is returned.
 
+    References are looked up as they are, placeholders in the referenced values
+    are not expanded. Use `parseConfigElement` to expand whole configurations.
+
     Args:
         item (str): The item to parse and expand its placeholder
         parents (List[object]): The parents of the item to search for
@@ -35,36 +154,17 @@ def expandItem(item: str, parents: List[object]) -> object:
              original string else. If the placeholder points to another
              object that is not a string, this object is returned.
     """
-    ret_val = replaceConstants(item)
-
-    result = placeholder_regex.search(ret_val)
-    parent_to_use_id = 0
-    if result:
-        # print("Found Placeholder: {place}".format(place=result.group(1)))
-        placeholder = result.group(1)
-        parent_regex = re.compile(r"(\.\./)")
-
-        result = parent_regex.match(placeholder)
-        while result is not None:
-            placeholder = placeholder.removeprefix("../")
-            result = parent_regex.match(placeholder)
-            parent_to_use_id -= 1
+    if "${" not in item:
+        return item
 
-        try:
-            substitute = getPlaceholder(
-                parents=parents,
-                parent_to_use_id=parent_to_use_id,
-                placeholder=placeholder,
-            )
-        except Exception:
-            return ret_val
-
-        if isinstance(substitute, str):
-            ret_val = placeholder_regex.sub(substitute, item)
-        else:
-            ret_val = substitute
-
-    return ret_val
+    return expandTemplate(
+        compileTemplate(item),
+        lambda reference: getPlaceholder(
+            parents=parents,
+            parent_to_use_id=reference.parent_id,
+            placeholder=reference.name,
+        ),
+    )
 
 
 ################################################################################
@@ -87,30 +187,267 @@ def getPlaceholder(
     Returns:
         object: The replacement for the placeholder.
     """
-    try:
-        parent = parents[parent_to_use_id]
+    parent = parents[parent_to_use_id]
+
+    if isinstance(parent, dict):
+        return parent[placeholder]
+
+    return getattr(parent, placeholder)
+
+
+class Location(NamedTuple):
+    """A string containing placeholders in a configuration.
+
+    Attributes:
+        container (object): The `__dict__` of the object, the record, the list or
+                            dictionary holding the string.
+        key (object): The attribute name, list index or dictionary key of the
+                        string.
+        template (Template): The compiled template of the string.
+        parents (List[object]): The parents the string has been found with first.
+    """
+
+    container: object
+    key: object
+    template: Template
+    parents: List[object]
+
+
+class PlaceholderResolver:
+    """Expands all placeholders of a configuration in dependency order.
+
+    First all strings containing placeholders are collected, strings that only
+    reference values without placeholders are expanded at once. Then each of the
+    remaining strings is expanded exactly once. Objects that are part of the configuration more than once
+    are expanded using the parents they have been found with first. If a string references another string that contains
+    placeholders, the referenced string is expanded first. Cyclic references are
+    logged and left unexpanded.
+
+    Methods:
+        collect: Collects all strings containing placeholders of a configuration.
+        resolveAll: Expands all collected strings.
+    """
 
-        if isinstance(parent[placeholder], str):
-            substitute = parent[placeholder].replace("\\", "\\\\")
+    ############################################################################
+    def __init__(self) -> None:
+        """Initializes an empty resolver."""
+        self._logger = logging.getLogger(LOGGER_NAME)
+        # (id of the object, the attribute name, list index or dictionary key)
+        self._locations: Dict[Tuple[int, object], Location] = {}
+        self._resolved: Set[Tuple[int, object]] = set()
+        self._in_progress: Set[Tuple[int, object]] = set()
+        self._collected: Set[int] = set()
+
+    ############################################################################
+    def collect(self, element: object, parents: List[object]) -> None:
+        """Collects all strings containing placeholders of the given configuration
+        element and its children.
+
+        Args:
+            element (object): The configuration element to search.
+            parents (List[object]): The list of parents of `element`.
+        """
+        if isinstance(element, list):
+            container = element
+            items = enumerate(element)
+            local_parents = parents
+        elif isinstance(element, dict):
+            container = element
+            items = element.items()
+            local_parents = parents + [element]
+        elif isinstance(element, ConfigRecord):
+            container = element
+            items = element.items()
+            local_parents = parents + [element]
+        elif hasattr(element, "__dict__") and not isinstance(
+            element, (FileCompare, logging.Logger)
+        ):
+            container = element.__dict__
+            items = element.__dict__.items()
+            local_parents = parents + [element]
         else:
-            substitute = parent[placeholder]
-        # print("Replace {ph} with: {elem}".format(ph=placeholder, elem=substitute))
-    except Exception:
-        try:
-            parent = parents[parent_to_use_id]
-            if isinstance(getattr(parent, placeholder), str):
-                substitute = getattr(parent, placeholder).replace("\\", "\\\\")
-            else:
-                substitute = getattr(parent, placeholder)
-                # print(
-                #     "Replace {ph} with: {elem}, class".format(
-                #         ph=placeholder, elem=substitute
-                #     )
-                # )
-        except Exception as excp:
-            raise excp
+            return
+
+        if id(element) in self._collected:
+            return
+        self._collected.add(id(element))
+
+        for key, value in items:
+            if isinstance(value, str):
+                if "${" in value:
+                    self.addLocation(element, container, key, value, local_parents)
+            elif isinstance(value, (list, dict)) or hasAttributes(value):
+                self.collect(value, local_parents)
+
+    ############################################################################
+    def addLocation(
+        self,
+        owner: object,
+        container: object,
+        key: object,
+        item: str,
+        parents: List[object],
+    ) -> None:
+        """Adds a string containing placeholders.
+
+        If all values the string references don't contain placeholders, the string
+        is expanded at once, else it is expanded by `resolveAll`.
+
+        Args:
+            owner (object): The object, list or dictionary holding the string.
+            container (object): The `__dict__` of `owner` or `owner` itself, if it
+                                is a record, list or dictionary.
+            key (object): The attribute name, list index or dictionary key.
+            item (str): The string to add.
+            parents (List[object]): The parents of the string.
+        """
+        template = compileTemplate(item)
+
+        is_final = True
+
+        def lookup(reference: Reference) -> object:
+            nonlocal is_final
+            ret_val = getPlaceholder(
+                parents=parents,
+                parent_to_use_id=reference.parent_id,
+                placeholder=reference.name,
+            )
+            if isinstance(ret_val, str) and "${" in ret_val:
+                is_final = False
+            return ret_val
 
-    return substitute
+        expanded = expandTemplate(template, lookup)
+        if is_final:
+            container[key] = expanded
+            return
+
+        self._locations[(id(owner), key)] = Location(
+            container=container, key=key, template=template, parents=parents
+        )
+
+    ############################################################################
+    def resolveAll(self) -> None:
+        """Expands all collected strings."""
+        for location_key in self._locations:
+            self.resolve(location_key)
+
+    ############################################################################
+    def resolve(self, location_key: Tuple[int, object]) -> None:
+        """Expands the string at the given location, after expanding all strings it
+        references.
+
+        Uses a depth first search with an explicit stack, so long chains of
+        references don't exceed the recursion limit.
+
+        Args:
+            location_key (Tuple[int, object]): The key of the location to expand.
+        """
+        stack = [location_key]
+        while stack:
+            current = stack[-1]
+            if current in self._resolved:
+                stack.pop()
+                continue
+
+            if current not in self._in_progress:
+                self._in_progress.add(current)
+                pending = False
+                for dependency in self.getDependencies(current):
+                    if dependency in self._resolved:
+                        continue
+                    if dependency in self._in_progress:
+                        self.logCycle(stack, dependency)
+                        continue
+                    stack.append(dependency)
+                    pending = True
+                if pending:
+                    continue
+
+            location = self._locations[current]
+            location.container[location.key] = expandTemplate(
+                location.template, lambda reference: self.lookup(reference, location)
+            )
+            self._in_progress.discard(current)
+            self._resolved.add(current)
+            stack.pop()
+
+    ############################################################################
+    def getDependencies(
+        self, location_key: Tuple[int, object]
+    ) -> List[Tuple[int, object]]:
+        """Returns the locations of the strings with placeholders referenced by the
+        string at the given location.
+
+        Args:
+            location_key (Tuple[int, object]): The key of the location.
+
+        Returns:
+            List[Tuple[int, object]]: The keys of the referenced locations.
+        """
+        location = self._locations[location_key]
+        ret_val = []
+        for segment in location.template.segments:
+            if not isinstance(segment, Reference):
+                continue
+            try:
+                parent = location.parents[segment.parent_id]
+            except IndexError:
+                continue
+            dependency = (id(parent), segment.name)
+            if dependency in self._locations:
+                ret_val.append(dependency)
+
+        return ret_val
+
+    ############################################################################
+    def lookup(self, reference: Reference, location: Location) -> object:
+        """Returns the value of the reference in the string at the given location.
+
+        Args:
+            reference (Reference): The reference to return the value of.
+            location (Location): The location of the string containing the
+                                reference.
+
+        Raises:
+            Exception: if the reference can't be found or is part of a cycle.
+
+        Returns:
+            object: The expanded value of the reference.
+        """
+        parent = location.parents[reference.parent_id]
+
+        dependency = (id(parent), reference.name)
+        if dependency in self._locations and dependency not in self._resolved:
+            raise KeyError(reference.text)
+
+        return getPlaceholder(
+            parents=location.parents,
+            parent_to_use_id=reference.parent_id,
+            placeholder=reference.name,
+        )
+
+    ############################################################################
+    def logCycle(
+        self, stack: List[Tuple[int, object]], dependency: Tuple[int, object]
+    ) -> None:
+        """Logs the cycle of references ending in `dependency`.
+
+        Args:
+            stack (List[Tuple[int, object]]): The stack of the depth first search.
+            dependency (Tuple[int, object]): The location referenced again.
+        """
+        path = [
+            location_key for location_key in stack if location_key in self._in_progress
+        ]
+        cycle = path[path.index(dependency) :]
+        self._logger.error(
+            'error expanding placeholders, cyclic references: "{cycle}"'.format(
+                cycle=" -> ".join(
+                    str(self._locations[location_key].key)
+                    for location_key in [*cycle, dependency]
+                )
+            )
+        )
 
 
 ###############################################################################
@@ -120,6 +457,9 @@ def parseConfigElement(element: object, parents: List[object] = None) -> object:
     dollar sign followed by an opening curly brace and end with a curly brace.
     The string between the two curly braces is changed against it's value.
 
+    All strings are expanded in place, in the order of their references, see
+    `PlaceholderResolver`.
+
     Args:
         element (object): The configuration element to parse and expand.
         parent (List[object], optional): The parent and the parent's parent and it's
@@ -130,62 +470,12 @@ def parseConfigElement(element: object, parents: List[object] = None) -> object:
     """
     if parents is None:
         parents = []
-    # print("parseConfigElement: {element}, parents: {parents}".format(
-    #    element=element.__class__, parents=len(parents)))
-    local_parents = parents.copy()
-
-    ret_val = element
-
-    if isinstance(element, list):
-        ret_val = parseList(element, local_parents)
-
-    elif isinstance(element, FileCompare):
-        ret_val = element
-
-    elif isinstance(element, logging.Logger):
-        ret_val = element
-
-    elif isinstance(element, str):
-        ret_val = expandItem(element, local_parents)
-
-    elif hasattr(element, "__dict__"):
-        local_parents = parents.copy()
-        local_parents.append(element)
-        for key in element.__dict__:
-            element.__dict__[key] = parseConfigElement(
-                element.__dict__[key], local_parents
-            )
-        ret_val = element
-
-    return ret_val
 
+    if isinstance(element, str):
+        return expandItem(element, parents)
 
-################################################################################
-def parseList(element: List[object], local_parents: List[object]) -> List[object]:
-    """Parses the items of a list.
-
-    Args:
-        element (List[object]): The list to parse
-        local_parents (List[object]): The list of parents
-
-    Returns:
-        List[object]: The parsed and, if applicable, expanded, list of items.
-    """
-    tmp_list = []
-    for subitem in element:
-        if hasattr(subitem, "__dict__"):
-            tmp_list.append(parseConfigElement(subitem, local_parents))
-
-        elif isinstance(subitem, dict):
-            local_parents.append(element)
-            for key in subitem:
-                subitem[key] = parseConfigElement(subitem[key], local_parents)
-            tmp_list.append(subitem)
-
-        else:
-            if isinstance(subitem, str):
-                tmp_list.append(expandItem(subitem, local_parents))
-            else:
-                tmp_list.append(subitem)
+    resolver = PlaceholderResolver()
+    resolver.collect(element, parents)
+    resolver.resolveAll()
 
-    return tmp_list
+    return element
@@ -0,0 +1,383 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     env_cache.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import logging
+import os
+import shlex
+import subprocess  # nosec
+import sys
+import threading
+from typing import Dict, List, Set, Tuple
+
+from buildnis.modules import BuildnisException
+from buildnis.modules.config import CFG_VERSION, FilePath
+from buildnis.modules.helpers import LOGGER_NAME
+from buildnis.modules.helpers.hash_cache import cachedHashFile
+
+_logger = logging.getLogger(LOGGER_NAME)
+
+CAPTURE_TIMEOUT: float = 120
+"""The timeout in seconds of sourcing an environment script.
+"""
+
+IGNORED_VARIABLES: List[str] = ["_", "SHLVL", "PWD", "OLDPWD"]
+"""Environment variables set by the shell itself, that are not part of the
+environment an environment script sets.
+"""
+
+KEY_VARIABLES: List[str] = [
+    "PATH",
+    "LD_LIBRARY_PATH",
+    "DYLD_LIBRARY_PATH",
+    "LIBRARY_PATH",
+    "CPATH",
+    "C_INCLUDE_PATH",
+    "CPLUS_INCLUDE_PATH",
+    "PKG_CONFIG_PATH",
+    "CMAKE_PREFIX_PATH",
+    "MANPATH",
+    "HOME",
+]
+"""The environment variables of this process that are part of the key of a cache
+entry. Environment scripts prepend to these search paths, so a changed value
+changes the environment the script sets. All other variables, like the IDs of CI
+jobs or the sockets of SSH agents, change between runs and would make the cache
+miss every time.
+"""
+
+_DUMP_ENVIRONMENT = " ".join(
+    [
+        shlex.quote(sys.executable),
+        "-c",
+        shlex.quote("import json, os, sys; json.dump(dict(os.environ), sys.stdout)"),
+    ]
+)
+"""The shell command printing the environment as JSON.
+"""
+
+
+class EnvCacheException(BuildnisException):
+    """Exception raised if an environment script can't be sourced."""
+
+
+class EnvCache:
+    """Persistent cache of the environments set by sourcing environment scripts.
+
+    Each environment script is sourced once with the given arguments, the
+    environment variables it sets or unsets are saved. Commands needing the
+    environment are run with the saved environment instead of sourcing the script
+    again. An entry is only valid for the same script path, arguments and script
+    content (BLAKE2 hash) and the same values of the variables `KEY_VARIABLES` of
+    this process. The cache is saved as JSON file.
+
+    Different scripts are sourced at the same time, the same script and arguments
+    are only sourced once.
+
+    Attributes:
+        cache_path (FilePath): The path to the JSON file the cache is saved to, the
+                                empty string if the cache isn't saved.
+        hits (int): The number of environments returned from the cache.
+        misses (int): The number of environment scripts that had to be sourced.
+
+    Methods:
+        getEnvironment: Returns the environment to run a command with after sourcing
+                        the given environment script.
+        save: Writes the cache to disk.
+    """
+
+    ############################################################################
+    def __init__(self, cache_path: FilePath = "") -> None:
+        """Loads the environment cache from the given file, if it exists.
+
+        Args:
+            cache_path (FilePath, optional): The path to the JSON file of the cache.
+                                Defaults to "", the cache is not saved to disk.
+        """
+        self.cache_path = cache_path
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Dict[str, object]] = {}
+        self._used: Set[str] = set()
+        self._failed: Set[str] = set()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+        if self.cache_path != "":
+            self.load()
+
+    ############################################################################
+    def load(self) -> None:
+        """Loads the cache entries from the cache's JSON file.
+
+        A missing or invalid cache file is not an error, the cache starts empty.
+        """
+        try:
+            with io.open(self.cache_path, mode="r", encoding="utf-8") as file:
+                cache_json = json.load(file)
+            if cache_json.get("file_version") == ".".join(CFG_VERSION):
+                self._entries = cache_json.get("entries", {})
+        except FileNotFoundError:
+            pass
+        except Exception as excp:
+            _logger.warning(
+                'error "{error}" reading environment cache "{path}", not using it'.format(
+                    error=excp, path=self.cache_path
+                )
+            )
+
+    ############################################################################
+    def getEnvironment(self, script: FilePath, args: List[str]) -> Dict[str, str]:
+        """Returns the environment to run a command with, that has been set by
+        sourcing the environment script `script` with the arguments `args`.
+
+        The script is only sourced if there is no valid entry in the cache. If
+        sourcing the script fails, it isn't tried again.
+
+        Args:
+            script (FilePath): The path to the environment script.
+            args (List[str]): The arguments to source the script with.
+
+        Raises:
+            EnvCacheException: if the script can't be sourced.
+
+        Returns:
+            Dict[str, str]: The environment to pass to the command to run.
+        """
+        try:
+            key = getEnvironmentKey(script, args)
+        except Exception as excp:
+            raise EnvCacheException(excp)
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # only sourcing the same script waits, other scripts are sourced meanwhile
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self.hits += 1
+                    self._used.add(key)
+                elif key in self._failed:
+                    raise EnvCacheException(
+                        'sourcing environment script "{script}" has already failed'.format(
+                            script=script
+                        )
+                    )
+                else:
+                    self.misses += 1
+
+            if entry is None:
+                _logger.info(
+                    'Sourcing environment script "{script}"'.format(script=script)
+                )
+                try:
+                    to_set, to_unset = captureEnvironment(script, args)
+                except EnvCacheException:
+                    with self._lock:
+                        self._failed.add(key)
+                    raise
+                entry = {
+                    "script": os.path.abspath(script),
+                    "args": list(args),
+                    "set": to_set,
+                    "unset": to_unset,
+                }
+                with self._lock:
+                    self._entries[key] = entry
+                    self._used.add(key)
+
+        ret_val = dict(os.environ)
+        ret_val.update(entry["set"])
+        for name in entry["unset"]:
+            ret_val.pop(name, None)
+
+        return ret_val
+
+    ############################################################################
+    def prune(self) -> None:
+        """Removes all entries that have not been used in this run, if the script
+        doesn't exist any more or another entry of the same script and arguments
+        has been used in this run.
+        """
+        with self._lock:
+            used_scripts = {
+                (self._entries[key]["script"], tuple(self._entries[key]["args"]))
+                for key in self._used
+            }
+            for key in list(self._entries):
+                if key in self._used:
+                    continue
+                entry = self._entries[key]
+                if (
+                    entry["script"],
+                    tuple(entry["args"]),
+                ) in used_scripts or not os.path.isfile(entry["script"]):
+                    del self._entries[key]
+
+    ############################################################################
+    def save(self) -> None:
+        """Prunes the cache and writes it to its JSON file.
+
+        Raises:
+            EnvCacheException: if the cache file can't be written.
+        """
+        if self.cache_path == "":
+            return
+
+        self.prune()
+
+        tmp_path = ".".join([self.cache_path, "tmp"])
+        try:
+            with io.open(tmp_path, mode="w", encoding="utf-8") as file:
+                json.dump(
+                    {"file_version": ".".join(CFG_VERSION), "entries": self._entries},
+                    file,
+                )
+            os.replace(tmp_path, self.cache_path)
+        except Exception as excp:
+            raise EnvCacheException(excp)
+
+        _logger.info(
+            'Saved environment cache "{path}": {hits} hits, {misses} misses, {num} entries'.format(
+                path=self.cache_path,
+                hits=self.hits,
+                misses=self.misses,
+                num=len(self._entries),
+            )
+        )
+
+
+_env_cache: EnvCache = None
+"""The environment cache used to run commands, `None` if environment scripts are
+sourced for every command.
+"""
+
+
+################################################################################
+def getEnvironmentKey(script: FilePath, args: List[str]) -> str:
+    """Returns the key of the cache entry of the given environment script.
+
+    The key is the BLAKE2 hash of the script's path, the arguments, the hash of
+    the script's content and the values of the environment variables
+    `KEY_VARIABLES` of this process.
+
+    Args:
+        script (FilePath): The path to the environment script.
+        args (List[str]): The arguments to source the script with.
+
+    Raises:
+        FileCompareException: if the script can't be hashed.
+
+    Returns:
+        str: The key as hex string.
+    """
+    key_dict = {
+        "script": os.path.abspath(script),
+        "args": args,
+        "hash": cachedHashFile(script),
+        "environment": [os.environ.get(name) for name in KEY_VARIABLES],
+    }
+
+    return hashlib.blake2b(
+        json.dumps(key_dict).encode("utf-8"), digest_size=32
+    ).hexdigest()
+
+
+################################################################################
+def captureEnvironment(
+    script: FilePath, args: List[str]
+) -> Tuple[Dict[str, str], List[str]]:
+    """Sources the given environment script in `bash` and returns the environment
+    variables it has changed.
+
+    The script is sourced the same way `modules.helpers.execute.runCommand` would,
+    its output is discarded.
+
+    Args:
+        script (FilePath): The path to the environment script.
+        args (List[str]): The arguments to source the script with.
+
+    Raises:
+        EnvCacheException: if the script can't be sourced.
+
+    Returns:
+        Tuple[Dict[str, str], List[str]]: The names and values of all set or changed
+                        variables and the list of names of unset variables.
+    """
+    source_cmd = "source " + script + " " + " ".join(args)
+    source_cmd = source_cmd + " 1>&2 && " + _DUMP_ENVIRONMENT
+
+    before = runBash(_DUMP_ENVIRONMENT)
+    after = runBash(source_cmd)
+
+    to_set = {
+        name: value
+        for name, value in after.items()
+        if before.get(name) != value and name not in IGNORED_VARIABLES
+    }
+    to_unset = [
+        name for name in before if name not in after and name not in IGNORED_VARIABLES
+    ]
+
+    return to_set, to_unset
+
+
+################################################################################
+def runBash(command: str) -> Dict[str, str]:
+    """Runs the given command in `bash` and returns the environment the command
+    prints as JSON.
+
+    Args:
+        command (str): The command to run.
+
+    Raises:
+        EnvCacheException: if the command fails.
+
+    Returns:
+        Dict[str, str]: The environment printed by the command.
+    """
+    try:
+        process_result = subprocess.run(  # nosec
+            args=["bash", "-c", command],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=CAPTURE_TIMEOUT,
+        )
+        return json.loads(process_result.stdout)
+    except Exception as excp:
+        raise EnvCacheException(excp)
+
+
+################################################################################
+def setEnvCache(cache: EnvCache) -> None:
+    """Sets the environment cache to use to run commands.
+
+    Args:
+        cache (EnvCache): The environment cache to use, `None` to source the
+                        environment script for every command.
+    """
+    global _env_cache
+    _env_cache = cache
+
+
+################################################################################
+def getEnvCache() -> EnvCache:
+    """Returns the environment cache in use.
+
+    Returns:
+        EnvCache: The environment cache used to run commands, `None` if no cache is
+                    used.
+    """
+    return _env_cache
@@ -8,11 +8,25 @@
 
 from __future__ import annotations
 
+import asyncio
+import logging
+import os
 import re
 import subprocess  # nosec
-from typing import List, NamedTuple
+import sys
+import threading
+from typing import Dict, List, NamedTuple, Tuple
 
 from buildnis.modules.config import CmdOutput, FilePath
+from buildnis.modules.helpers import LOGGER_NAME
+from buildnis.modules.helpers.env_cache import EnvCacheException, getEnvCache
+from buildnis.modules.helpers.jobserver import getJobServer
+
+_logger = logging.getLogger(LOGGER_NAME)
+
+COMMAND_TIMEOUT: float = 120
+"""The default timeout in seconds of executed commands.
+"""
 
 
 class ExecuteException(Exception):
@@ -63,6 +77,8 @@ class EnvArgs(NamedTuple):
 def runCommand(
     exe_args: ExeArgs,
     env_args: EnvArgs = EnvArgs(script="", args=None, do_source=False),
+    working_dir: FilePath = None,
+    timeout: float = COMMAND_TIMEOUT,
 ) -> CmdOutput:
     """Executes the given command with the given arguments.
 
@@ -70,6 +86,14 @@ def runCommand(
     be passed in the list `exe_args.args`.
     In `env_args` the command to set up an environment can be given, with
     needed arguments to this environment script in the list `env_args.args`.
+    If an environment cache is set (see `modules.helpers.env_cache`), an
+    environment script to source is only sourced once and the command is run
+    directly with the saved environment.
+    If a jobserver is set (see `modules.helpers.jobserver`), the command is run
+    with its `MAKEFLAGS` and inherits its pipe, so a make called by the command
+    shares the jobserver's tokens.
+    On OSes supporting `os.wait4`, the peak memory usage of the command is
+    returned in `max_rss`, see `waitForProcess`.
 
     Args:
         exe_args (ExeArgs): The name of the executable or path to the executable
@@ -80,12 +104,241 @@ def runCommand(
                             script with in `env_args.args` and if the environment script
                             has to be sourced instead of running it,
                             `env_args.do_source` ir `True`.
+        working_dir (FilePath, optional): The working directory to run the command
+                            in. Defaults to `None`, the current working directory.
+        timeout (float, optional): The timeout in seconds, `None` for no timeout.
+                            Defaults to `COMMAND_TIMEOUT`.
 
     Raises:
         ExecuteException: if something goes wrong
 
     Returns:
-        CmdOutput: The output of the executed command as tuple (stdout, stderr)
+        CmdOutput: The output of the executed command as tuple (stdout, stderr,
+                    return code, peak memory usage)
+    """
+    cmd_line_args, environment = getCommand(exe_args, env_args)
+    pass_fds = ()
+    job_server = getJobServer()
+    if job_server is not None:
+        environment = job_server.getEnvironment(environment)
+        pass_fds = job_server.getPassFds()
+
+    if not hasattr(os, "wait4"):
+        try:
+            process_result = subprocess.run(  # nosec
+                args=cmd_line_args,
+                env=environment,
+                cwd=working_dir,
+                pass_fds=pass_fds,
+                capture_output=True,
+                text=True,
+                check=False,
+                timeout=timeout,
+            )
+        except Exception as excp:
+            raise ExecuteException(excp)
+
+        return CmdOutput(
+            std_out=process_result.stdout,
+            err_out=process_result.stderr,
+            return_code=process_result.returncode,
+        )
+
+    try:
+        process = subprocess.Popen(  # nosec
+            args=cmd_line_args,
+            env=environment,
+            cwd=working_dir,
+            pass_fds=pass_fds,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+    except Exception as excp:
+        raise ExecuteException(excp)
+
+    return waitForProcess(process, timeout)
+
+
+################################################################################
+def waitForProcess(process: subprocess.Popen, timeout: float) -> CmdOutput:
+    """Reads the output of the given process and waits for it to terminate.
+
+    The process is reaped using `os.wait4` instead of `Popen.wait`, to get the
+    peak memory usage of the process and its child processes. This is the
+    process' own peak, unlike `resource.getrusage(resource.RUSAGE_CHILDREN)`,
+    which is the peak of all child processes of this process so far. On Linux,
+    the peak includes the memory usage of this process when starting the process,
+    as the kernel keeps the peak of the forked process' memory over `exec`.
+
+    Args:
+        process (subprocess.Popen): The process started with pipes for `stdout`
+                                    and `stderr`.
+        timeout (float): The timeout in seconds, `None` for no timeout.
+
+    Raises:
+        ExecuteException: if the process times out or something else goes wrong
+
+    Returns:
+        CmdOutput: The output, exit code and peak memory usage of the process.
+    """
+    outputs = {}
+
+    def readPipe(pipe: object) -> None:
+        with pipe:
+            outputs[pipe] = pipe.read()
+
+    readers = [
+        threading.Thread(target=readPipe, args=(pipe,), daemon=True)
+        for pipe in [process.stdout, process.stderr]
+    ]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join(timeout)
+    is_timeout = any(reader.is_alive() for reader in readers)
+    if is_timeout:
+        process.kill()
+        for reader in readers:
+            reader.join()
+
+    try:
+        _, status, rusage = os.wait4(process.pid, 0)
+    except Exception as excp:
+        raise ExecuteException(excp)
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    if is_timeout:
+        raise ExecuteException(
+            'command "{cmd}" timed out after {timeout} seconds'.format(
+                cmd=process.args, timeout=timeout
+            )
+        )
+
+    return CmdOutput(
+        std_out=outputs[process.stdout],
+        err_out=outputs[process.stderr],
+        return_code=process.returncode,
+        max_rss=(
+            rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+        ),
+    )
+
+
+################################################################################
+async def runCommandAsync(
+    exe_args: ExeArgs,
+    env_args: EnvArgs = EnvArgs(script="", args=None, do_source=False),
+    timeout: float = COMMAND_TIMEOUT,
+) -> CmdOutput:
+    """Executes the given command with the given arguments as an asyncio
+    subprocess.
+
+    Like `runCommand`, but doesn't block the event loop while the command runs, so
+    other commands can run at the same time. If the command hasn't finished after
+    `timeout` seconds, it is killed.
+
+    Args:
+        exe_args (ExeArgs): The name of the executable or path to the executable
+                        to call and the arguments to pass to the executable.
+        env_args (EnvArgs): The arguments needed for the environment script, if
+                            applicable. See `runCommand`.
+        timeout (float, optional): The timeout in seconds. Defaults to
+                            `COMMAND_TIMEOUT`.
+
+    Raises:
+        ExecuteException: if something goes wrong or the command times out.
+
+    Returns:
+        CmdOutput: The output of the executed command as tuple (stdout, stderr,
+                    return code)
+    """
+    cmd_line_args, environment = getCommand(exe_args, env_args)
+
+    try:
+        process = await asyncio.create_subprocess_exec(  # nosec
+            *cmd_line_args,
+            env=environment,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except Exception as excp:
+        raise ExecuteException(excp)
+
+    try:
+        std_out, err_out = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise ExecuteException(
+            'command "{cmd}" timed out after {timeout} seconds'.format(
+                cmd=" ".join(cmd_line_args), timeout=timeout
+            )
+        )
+    except Exception as excp:
+        raise ExecuteException(excp)
+
+    # like the universal newlines of `subprocess.run(text=True)`
+    return CmdOutput(
+        std_out=std_out.decode(errors="replace").replace("\r\n", "\n"),
+        err_out=err_out.decode(errors="replace").replace("\r\n", "\n"),
+        return_code=process.returncode,
+    )
+
+
+################################################################################
+def getCommand(
+    exe_args: ExeArgs, env_args: EnvArgs
+) -> Tuple[List[str], Dict[str, str]]:
+    """Returns the list of command line arguments and the environment to execute the
+    given command with.
+
+    If the environment script has to be sourced and an environment cache is set,
+    the environment is taken from the cache and the command is run without sourcing
+    the script in a shell. If the script can't be sourced by the cache, the command
+    line sourcing the script is returned.
+
+    Args:
+        exe_args (ExeArgs): The name of the executable or path to the executable
+                        to call and the arguments to pass to the executable.
+        env_args (EnvArgs): The arguments needed for the environment script, if
+                            applicable. See `runCommand`.
+
+    Returns:
+        Tuple[List[str], Dict[str, str]]: The command line arguments and the
+                        environment to run the command with, `None` to use the
+                        environment of this process.
+    """
+    env_cache = getEnvCache()
+    if env_args.script != "" and env_args.do_source is True and env_cache is not None:
+        try:
+            environment = env_cache.getEnvironment(
+                env_args.script, [] if env_args.args is None else env_args.args
+            )
+            return getCommandLine(exe_args, EnvArgs()), environment
+        except EnvCacheException as excp:
+            _logger.warning(
+                'error "{error}" sourcing environment script "{script}", sourcing it for each command'.format(
+                    error=excp, script=env_args.script
+                )
+            )
+
+    return getCommandLine(exe_args, env_args), None
+
+
+################################################################################
+def getCommandLine(exe_args: ExeArgs, env_args: EnvArgs) -> List[str]:
+    """Returns the list of command line arguments to execute the given command.
+
+    Args:
+        exe_args (ExeArgs): The name of the executable or path to the executable
+                        to call and the arguments to pass to the executable.
+        env_args (EnvArgs): The arguments needed for the environment script, if
+                            applicable. See `runCommand`.
+
+    Returns:
+        List[str]: The command line arguments, the first element is the program to
+                    execute.
     """
     if exe_args.args is None:
         exe_args_real = []
@@ -108,18 +361,7 @@ def runCommand(
             if arg != "":
                 cmd_line_args.append(arg)
 
-    try:
-        process_result = subprocess.run(  # nosec
-            args=cmd_line_args,
-            capture_output=True,
-            text=True,
-            check=False,
-            timeout=120,
-        )
-    except Exception as excp:
-        raise ExecuteException(excp)
-
-    return CmdOutput(std_out=process_result.stdout, err_out=process_result.stderr)
+    return cmd_line_args
 
 
 ################################################################################
@@ -190,21 +432,71 @@ def doesExecutableWork(
         str: the matched string if the regex matches the output, the empty string
              '' otherwise.
     """
-    ret_val = ""
-
     try:
         output = runCommand(exe_args=exe_args, env_args=env_args)
 
-        run_regex = re.search(check_regex.regex, output.std_out)
-        if run_regex is not None and run_regex.group(check_regex.group):
-            ret_val = run_regex.group(check_regex.group)
+        return matchOutput(output, check_regex)
 
-        else:
-            run_regex = re.search(check_regex.regex, output.err_out)
-            if run_regex is not None and run_regex.group(check_regex.group):
-                ret_val = run_regex.group(check_regex.group).strip()
+    except Exception as excp:
+        raise ExecuteException(excp)
+
+
+################################################################################
+async def doesExecutableWorkAsync(
+    exe_args: ExeArgs,
+    check_regex: RunRegex,
+    env_args: EnvArgs = EnvArgs(script="", args=None, do_source=False),
+    timeout: float = COMMAND_TIMEOUT,
+) -> str:
+    """Checks if the given command line works, like `doesExecutableWork`, but runs
+    the command as an asyncio subprocess using `runCommandAsync`.
+
+    Args:
+        exe_args (ExeArgs): The name of the executable or path to the executable
+                        to call and the arguments to pass to the executable.
+        check_regex (RunRegex): The regex to match the output of the command with.
+        env_args (EnvArgs): The arguments needed to setup the environment for the
+                            executable, if applicable. Defaults to ("", None, False).
+        timeout (float, optional): The timeout in seconds. Defaults to
+                            `COMMAND_TIMEOUT`.
+
+    Raises:
+        ExecuteException: if something goes wrong or the command times out.
+
+    Returns:
+        str: the matched string if the regex matches the output, the empty string
+             '' otherwise.
+    """
+    try:
+        output = await runCommandAsync(
+            exe_args=exe_args, env_args=env_args, timeout=timeout
+        )
+
+        return matchOutput(output, check_regex)
 
     except Exception as excp:
         raise ExecuteException(excp)
 
-    return ret_val
+
+################################################################################
+def matchOutput(output: CmdOutput, check_regex: RunRegex) -> str:
+    """Matches the regex `check_regex` with the output of a command, first with
+    `stdout`, then with `stderr`.
+
+    Args:
+        output (CmdOutput): The output of the command.
+        check_regex (RunRegex): The regex and the match group to return.
+
+    Returns:
+        str: the matched string if the regex matches the output, the empty string
+             '' otherwise.
+    """
+    run_regex = re.search(check_regex.regex, output.std_out)
+    if run_regex is not None and run_regex.group(check_regex.group):
+        return run_regex.group(check_regex.group)
+
+    run_regex = re.search(check_regex.regex, output.err_out)
+    if run_regex is not None and run_regex.group(check_regex.group):
+        return run_regex.group(check_regex.group).strip()
+
+    return ""
@@ -10,9 +10,15 @@ from __future__ import annotations
 
 import os
 import pathlib
+from typing import Dict, List
 
 from buildnis.modules.config import FilePath
-from buildnis.modules.helpers.files import FileCompareException, checkIfIsFile, hashFile
+from buildnis.modules.helpers.files import (
+    FileCompareException,
+    checkIfIsFile,
+    hashFiles,
+)
+from buildnis.modules.helpers.hash_cache import cachedHashFile
 
 
 class FileCompare:
@@ -23,6 +29,9 @@ class FileCompare:
         * compares the file sizes, if they are the same
         * compares the Blake2 hashes of both files
 
+    The hashes are taken from the hash cache, if one is set, see
+    `modules.helpers.hash_cache`.
+
     Attributes:
         path (FilePath): path to the file as string
         path_obj (pathlib.Path): the `Path` object of the file
@@ -37,7 +46,7 @@ class FileCompare:
     """
 
     ############################################################################
-    def __init__(self, file: FilePath) -> None:
+    def __init__(self, file: FilePath, file_hash: str = "") -> None:
         """Initializes the `FileCompare` object using it's path.
 
         If the given path `file` isn't a file or is not accessible, an exception
@@ -48,6 +57,8 @@ class FileCompare:
 
         Args:
             file (FilePath): The path to the file.
+            file_hash (str, optional): The already calculated hash of the file.
+                                    Defaults to "", the file is hashed.
         """
         try:
             self.path = os.path.abspath(file)
@@ -63,7 +74,10 @@ class FileCompare:
 
             self.size = self.path_obj.stat().st_size
 
-            self.hash = hashFile(self.path)
+            if file_hash == "":
+                self.hash = cachedHashFile(self.path)
+            else:
+                self.hash = file_hash
 
         except Exception as excp:
             raise FileCompareException(excp)
@@ -80,7 +94,7 @@ class FileCompare:
         Returns:
             str: The hash of the file with path `path` as hex string.
         """
-        return hashFile(self.path)
+        return cachedHashFile(self.path)
 
     ############################################################################
     def isSameFile(self, other: FileCompare) -> bool:
@@ -149,7 +163,7 @@ class FileCompare:
             if self.size != tmp_size:
                 return False
 
-            tmp_hash = hashFile(tmp_path)
+            tmp_hash = cachedHashFile(tmp_path)
 
             if self.hash != tmp_hash:
                 return False
@@ -194,7 +208,7 @@ class FileCompare:
                 file_size_now = self.path_obj.stat().st_size
                 if file_size_now != self.size:
                     return True
-                hash_now = hashFile(self.path)
+                hash_now = cachedHashFile(self.path)
                 if hash_now != self.hash:
                     return True
 
@@ -249,10 +263,44 @@ def areHashesSame(
         if file_size1 != file_size2:
             return False
 
-        hash1 = hashFile(file1)
-        hash2 = hashFile(file2)
+        hash1 = cachedHashFile(file1)
+        hash2 = cachedHashFile(file2)
 
         return hash1 == hash2
 
     except Exception as excp:
         raise FileCompareException(excp)
+
+
+################################################################################
+def getFileCompares(
+    file_list: List[FilePath], num_workers: int = 0
+) -> Dict[FilePath, FileCompare]:
+    """Returns a `FileCompare` instance for each of the given files.
+
+    The files are hashed in parallel using the hash cache, see
+    `modules.helpers.files.hashFiles`.
+
+    Args:
+        file_list (List[FilePath]): The list of files to generate `FileCompare`
+                                    instances of.
+        num_workers (int, optional): The maximum number of threads to use to hash
+                                    the files. Defaults to 0, the number of CPUs
+                                    this process may use,
+                                    `config_values.HOST_EFFECTIVE_CPUS`.
+
+    Raises:
+        FileCompareException: if something goes wrong
+
+    Returns:
+        Dict[FilePath, FileCompare]: The `FileCompare` instances, the keys are the
+                                    given file paths.
+    """
+    file_hashes = hashFiles(
+        file_list=file_list, num_workers=num_workers, hash_function=cachedHashFile
+    )
+
+    return {
+        file: FileCompare(file=file, file_hash=file_hash)
+        for file, file_hash in file_hashes.items()
+    }
@@ -8,14 +8,25 @@
 
 from __future__ import annotations
 
+import glob
 import hashlib
+import io
 import logging
+import mmap
 import os
 import pathlib
-from typing import List
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
 
 from buildnis.modules import BuildnisException
-from buildnis.modules.config import FilePath
+from buildnis.modules.config import FilePath, config_values
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 
 class FileCompareException(BuildnisException):
@@ -24,6 +35,25 @@ class FileCompareException(BuildnisException):
     """
 
 
+HASH_BUFFER_SIZE: int = 1024 * 1024
+"""Size of the buffer in bytes, that is used to read files to hash.
+"""
+
+HASH_MMAP_THRESHOLD: int = 64 * 1024 * 1024
+"""Files of at least this size in bytes are hashed using `mmap` instead of reading
+them into the hash buffer.
+"""
+
+FICLONE: int = 0x40049409
+"""The Linux `ioctl` request to reflink (clone) a file, see `ioctl_ficlone(2)`.
+"""
+
+_hash_buffers = threading.local()
+"""Holds the hash buffer of each thread, so the buffer is reused between calls of
+`hashFile`.
+"""
+
+
 ################################################################################
 def checkIfExists(file: FilePath) -> bool:
     """Returns `True` if the given file exists.
@@ -169,6 +199,11 @@ def hashFile(file: FilePath) -> str:
     Returns the hash as a hex string.
     If something goes wrong, it returns an `FileCompareException` instance.
 
+    The file is never read into memory as a whole: files smaller than
+    `HASH_MMAP_THRESHOLD` are read in chunks into a fixed size buffer of
+    `HASH_BUFFER_SIZE` bytes, that is reused between calls. Bigger files are
+    memory mapped and hashed in chunks of the same size.
+
     Raises:
             FileCompareException: if something goes wrong
 
@@ -182,9 +217,13 @@ def hashFile(file: FilePath) -> str:
     try:
         hash_func = hashlib.blake2b()
 
-        file_data = pathlib.Path(file).read_bytes()
+        with io.open(file, mode="rb", buffering=0) as file_obj:
+            file_size = os.fstat(file_obj.fileno()).st_size
 
-        hash_func.update(file_data)
+            if file_size >= HASH_MMAP_THRESHOLD:
+                hashMappedFile(file_obj, hash_func)
+            else:
+                hashReadFile(file_obj, hash_func)
 
         ret_val = hash_func.hexdigest()
     except Exception as excp:
@@ -193,6 +232,95 @@ def hashFile(file: FilePath) -> str:
     return ret_val
 
 
+################################################################################
+def hashFiles(
+    file_list: List[FilePath],
+    num_workers: int = 0,
+    hash_function: Callable[[FilePath], str] = hashFile,
+) -> Dict[FilePath, str]:
+    """Generates the BLAKE2 hashes of all given files in parallel.
+
+    The files are hashed by a pool of `num_workers` threads, hashing and reading
+    files releases the GIL, so this runs on all cores.
+
+    Raises:
+            FileCompareException: if something goes wrong hashing any of the files
+
+    Args:
+        file_list (List[FilePath]): The list of files to hash.
+        num_workers (int, optional): The maximum number of threads to use. Defaults
+                                    to 0, which uses the number of CPUs this process
+                                    may use, `config_values.HOST_EFFECTIVE_CPUS`.
+        hash_function (Callable[[FilePath], str], optional): The function to use to
+                                    hash a single file. Defaults to `hashFile`.
+
+    Returns:
+        Dict[FilePath, str]: The hex hashes of the files' contents, the keys are the
+                            given file paths.
+    """
+    if num_workers <= 0:
+        num_workers = int(config_values.HOST_EFFECTIVE_CPUS)
+    num_workers = max(1, min(num_workers, len(file_list)))
+
+    if num_workers == 1:
+        return {file: hash_function(file) for file in file_list}
+
+    try:
+        with ThreadPoolExecutor(
+            max_workers=num_workers, thread_name_prefix="hashFiles"
+        ) as executor:
+            return dict(zip(file_list, executor.map(hash_function, file_list)))
+    except FileCompareException as excp:
+        raise excp
+    except Exception as excp:
+        raise FileCompareException(excp)
+
+
+################################################################################
+def hashReadFile(file_obj: io.RawIOBase, hash_func: hashlib.blake2b) -> None:
+    """Reads the given file in chunks into the hash buffer of this thread and
+    updates the hash with each chunk.
+
+    Args:
+        file_obj (io.RawIOBase): The unbuffered file object to read from.
+        hash_func (hashlib.blake2b): The hash object to update.
+    """
+    buffer = getattr(_hash_buffers, "buffer", None)
+    if buffer is None:
+        buffer = memoryview(bytearray(HASH_BUFFER_SIZE))
+        _hash_buffers.buffer = buffer
+
+    num_read = file_obj.readinto(buffer)
+    while num_read:
+        hash_func.update(buffer[:num_read])
+        num_read = file_obj.readinto(buffer)
+
+
+################################################################################
+def hashMappedFile(file_obj: io.RawIOBase, hash_func: hashlib.blake2b) -> None:
+    """Memory maps the given file and updates the hash in chunks of
+    `HASH_BUFFER_SIZE` bytes. Already hashed pages are released, so the mapping
+    doesn't grow the resident set size of the process.
+
+    Args:
+        file_obj (io.RawIOBase): The file object to map.
+        hash_func (hashlib.blake2b): The hash object to update.
+    """
+    with mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+        can_advise = hasattr(mapped_file, "madvise")
+        if can_advise and hasattr(mmap, "MADV_SEQUENTIAL"):
+            mapped_file.madvise(mmap.MADV_SEQUENTIAL)
+        can_drop = can_advise and hasattr(mmap, "MADV_DONTNEED")
+
+        with memoryview(mapped_file) as view:
+            for offset in range(0, len(view), HASH_BUFFER_SIZE):
+                length = min(HASH_BUFFER_SIZE, len(view) - offset)
+                hash_func.update(view[offset : offset + length])
+                # drop the already hashed pages, so they don't count to our RSS
+                if can_drop:
+                    mapped_file.madvise(mmap.MADV_DONTNEED, offset, length)
+
+
 ################################################################################
 def returnExistingFile(file_list: List[FilePath]) -> FilePath:
     """Returns the first existing path in the list of given paths, and `""`
@@ -259,3 +387,116 @@ def deleteFiles(logger, list_of_files: List[FilePath]) -> None:
             pathlib.Path(file_path).unlink(missing_ok=True)
     except Exception as excp:
         raise FileCompareException(excp)
+
+
+################################################################################
+def cloneFile(src: FilePath, dst: FilePath, allow_hardlink: bool = True) -> str:
+    """Creates the file `dst` with the same content as the file `src`, without
+    copying the data if possible.
+
+    Tries, in this order, to reflink (clone) the file, to create a hard link and
+    to copy the file. An existing file `dst` is replaced.
+
+    Raises:
+            FileCompareException: if something goes wrong
+
+    Args:
+        src (FilePath): The path of the file to clone.
+        dst (FilePath): The path of the file to create.
+        allow_hardlink (bool, optional): If `False`, never hard link `dst` to
+                                        `src`. Defaults to True.
+
+    Returns:
+        str: How the file has been created, one of "reflink", "hardlink" or "copy".
+    """
+    try:
+        pathlib.Path(dst).unlink(missing_ok=True)
+
+        if reflinkFile(src, dst):
+            return "reflink"
+
+        if allow_hardlink:
+            try:
+                os.link(src, dst)
+                return "hardlink"
+            except OSError:
+                pass
+
+        shutil.copy2(src, dst)
+
+    except Exception as excp:
+        raise FileCompareException(excp)
+
+    return "copy"
+
+
+################################################################################
+def reflinkFile(src: FilePath, dst: FilePath) -> bool:
+    """Tries to reflink (clone) the file `src` to `dst` using `FICLONE`.
+
+    Only works on Linux with file systems that support reflinks, like Btrfs or XFS.
+
+    Args:
+        src (FilePath): The path of the file to clone.
+        dst (FilePath): The path of the file to create, must not exist.
+
+    Returns:
+        bool: `True` if the file has been cloned, `False` else.
+    """
+    if fcntl is None:
+        return False
+
+    try:
+        with io.open(src, mode="rb") as src_file, io.open(dst, mode="xb") as dst_file:
+            fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+    except OSError:
+        pathlib.Path(dst).unlink(missing_ok=True)
+        return False
+
+    shutil.copystat(src, dst)
+
+    return True
+
+
+################################################################################
+def expandFileList(items: object, base_dir: FilePath = ".") -> List[FilePath]:
+    """Returns the list of absolute paths of all files given by `items`.
+
+    `items` may be a single path or glob pattern, or an arbitrarily nested list of
+    paths and glob patterns. Relative paths are relative to `base_dir`. Paths that
+    don't contain wildcards are returned even if they don't exist. Each path is
+    only returned once, in the order found.
+
+    Args:
+        items (object): The path or (nested) list of paths and glob patterns.
+        base_dir (FilePath, optional): The directory relative paths are relative to.
+                                        Defaults to ".".
+
+    Returns:
+        List[FilePath]: The list of absolute, normalized file paths.
+    """
+    ret_val = []
+    seen = set()
+
+    to_expand = [items]
+    while to_expand:
+        item = to_expand.pop()
+        if isinstance(item, (list, tuple)):
+            to_expand.extend(reversed(item))
+            continue
+        if not isinstance(item, str) or item == "":
+            continue
+
+        path = os.path.normpath(os.path.join(base_dir, item))
+        if any(wildcard in item for wildcard in "*?["):
+            matches = sorted(glob.glob(path, recursive=True))
+        else:
+            matches = [path]
+
+        for match in matches:
+            match = os.path.abspath(match)
+            if match not in seen:
+                seen.add(match)
+                ret_val.append(match)
+
+    return ret_val
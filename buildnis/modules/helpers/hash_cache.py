@@ -0,0 +1,238 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     hash_cache.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import io
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Set, Tuple
+
+from buildnis.modules.config import CFG_VERSION, FilePath
+from buildnis.modules.helpers import LOGGER_NAME
+from buildnis.modules.helpers.files import FileCompareException, hashFile
+
+_logger = logging.getLogger(LOGGER_NAME)
+
+StatKey = Tuple[int, int, int, int, int]
+"""The `stat` data a cached hash is valid for: `(st_dev, st_ino, st_size,
+st_mtime_ns, st_ctime_ns)`.
+"""
+
+RACY_TIME_NS: int = 2 * 1000 * 1000 * 1000
+"""Files modified less than this number of nanoseconds ago are not cached, because
+a change in the same timestamp granularity wouldn't change the file's `stat` data.
+"""
+
+
+class HashCache:
+    """Persistent cache of the BLAKE2 hashes of files.
+
+    The hash of a file is only calculated again, if the `stat` data of the file
+    (device, inode, size, modification and change time) has changed since the hash
+    has been saved. The cache is saved as JSON file.
+
+    Attributes:
+        cache_path (FilePath): The path to the JSON file the cache is saved to.
+        hits (int): The number of hashes returned from the cache.
+        misses (int): The number of hashes that had to be calculated.
+
+    Methods:
+        getHash: Returns the hash of the given file, from the cache if possible.
+        save: Writes the cache to disk, removing entries of files that have
+                changed or don't exist any more.
+    """
+
+    ############################################################################
+    def __init__(self, cache_path: FilePath) -> None:
+        """Loads the hash cache from the given file, if it exists.
+
+        Args:
+            cache_path (FilePath): The path to the JSON file of the cache.
+        """
+        self.cache_path = cache_path
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[FilePath, List] = {}
+        self._used: Set[FilePath] = set()
+        self._lock = threading.Lock()
+
+        self.load()
+
+    ############################################################################
+    def load(self) -> None:
+        """Loads the cache entries from the cache's JSON file.
+
+        A missing or invalid cache file is not an error, the cache starts empty.
+        """
+        try:
+            with io.open(self.cache_path, mode="r", encoding="utf-8") as file:
+                cache_json = json.load(file)
+            if cache_json.get("file_version") == ".".join(CFG_VERSION):
+                self._entries = cache_json.get("entries", {})
+        except FileNotFoundError:
+            pass
+        except Exception as excp:
+            _logger.warning(
+                'error "{error}" reading hash cache "{path}", not using it'.format(
+                    error=excp, path=self.cache_path
+                )
+            )
+
+    ############################################################################
+    def getHash(self, file: FilePath) -> str:
+        """Returns the BLAKE2 hash of the given file as hex string.
+
+        The file is only read, if it's `stat` data has changed since the hash has
+        been saved in the cache.
+
+        Args:
+            file (FilePath): The path to the file to return the hash of.
+
+        Raises:
+            FileCompareException: if something goes wrong
+
+        Returns:
+            str: The hex hash of the file's content.
+        """
+        path = os.path.abspath(file)
+        try:
+            stat_key = getStatKey(path)
+        except Exception as excp:
+            raise FileCompareException(excp)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and tuple(entry[:-1]) == stat_key:
+                self.hits += 1
+                self._used.add(path)
+                return entry[-1]
+
+        file_hash = hashFile(path)
+
+        with self._lock:
+            self.misses += 1
+            if time.time_ns() - stat_key[3] > RACY_TIME_NS:
+                self._entries[path] = [*stat_key, file_hash]
+                self._used.add(path)
+            else:
+                self._entries.pop(path, None)
+
+        return file_hash
+
+    ############################################################################
+    def prune(self) -> None:
+        """Removes all entries of files that have not been used in this run and
+        whose `stat` data has changed or that do not exist any more.
+        """
+        with self._lock:
+            for path in list(self._entries):
+                if path in self._used:
+                    continue
+                try:
+                    if tuple(self._entries[path][:-1]) == getStatKey(path):
+                        continue
+                except OSError:
+                    pass
+                del self._entries[path]
+
+    ############################################################################
+    def save(self) -> None:
+        """Prunes the cache and writes it to its JSON file.
+
+        Raises:
+            FileCompareException: if the cache file can't be written.
+        """
+        self.prune()
+
+        tmp_path = ".".join([self.cache_path, "tmp"])
+        try:
+            with io.open(tmp_path, mode="w", encoding="utf-8") as file:
+                json.dump(
+                    {"file_version": ".".join(CFG_VERSION), "entries": self._entries},
+                    file,
+                )
+            os.replace(tmp_path, self.cache_path)
+        except Exception as excp:
+            raise FileCompareException(excp)
+
+        _logger.info(
+            'Saved hash cache "{path}": {hits} hits, {misses} misses, {num} entries'.format(
+                path=self.cache_path,
+                hits=self.hits,
+                misses=self.misses,
+                num=len(self._entries),
+            )
+        )
+
+
+_hash_cache: HashCache = None
+"""The hash cache used by `cachedHashFile`, `None` if no cache is used.
+"""
+
+
+################################################################################
+def getStatKey(path: FilePath) -> StatKey:
+    """Returns the `stat` data of the given file a cached hash is valid for.
+
+    Args:
+        path (FilePath): The path to the file.
+
+    Raises:
+        OSError: if the file can't be accessed.
+
+    Returns:
+        StatKey: The tuple `(st_dev, st_ino, st_size, st_mtime_ns, st_ctime_ns)`.
+    """
+    stat = os.stat(path)
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+
+
+################################################################################
+def setHashCache(cache: HashCache) -> None:
+    """Sets the hash cache to use by `cachedHashFile`.
+
+    Args:
+        cache (HashCache): The hash cache to use, `None` to not use a cache.
+    """
+    global _hash_cache
+    _hash_cache = cache
+
+
+################################################################################
+def getHashCache() -> HashCache:
+    """Returns the hash cache in use.
+
+    Returns:
+        HashCache: The hash cache used by `cachedHashFile`, `None` if no cache is
+                    used.
+    """
+    return _hash_cache
+
+
+################################################################################
+def cachedHashFile(file: FilePath) -> str:
+    """Returns the BLAKE2 hash of the given file as hex string, using the hash
+    cache if one has been set using `setHashCache`.
+
+    Args:
+        file (FilePath): The path to the file to return the hash of.
+
+    Raises:
+        FileCompareException: if something goes wrong
+
+    Returns:
+        str: The hex hash of the file's content.
+    """
+    if _hash_cache is None:
+        return hashFile(file)
+
+    return _hash_cache.getHash(file)
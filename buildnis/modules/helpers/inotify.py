@@ -0,0 +1,319 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     inotify.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import struct
+import threading
+from typing import Dict, Set, Tuple
+
+from buildnis.modules import BuildnisException
+from buildnis.modules.config import FilePath
+from buildnis.modules.helpers import LOGGER_NAME
+
+_logger = logging.getLogger(LOGGER_NAME)
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+"""The events that mark a file as changed. Directories are watched instead of the
+files themselves, because editors often replace a file by renaming another one.
+"""
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyException(BuildnisException):
+    """Exception raised if inotify is not available or a watch can't be added."""
+
+
+class ConfigWatcher:
+    """Watches files for changes using Linux' inotify, loaded using `ctypes`.
+
+    Keeps a set of the watched files, that have changed since they have been
+    watched - 'dirty' files - and the hash of each watched file's content at the
+    time it has been watched. Whether a watched file has changed can be answered
+    without accessing it.
+
+    Attributes:
+        fd (int): The inotify file descriptor.
+
+    Methods:
+        watch: Starts watching a file and marks it as clean.
+        isWatched: Returns `True` if the file is watched.
+        isDirty: Returns `True` if the watched file may have changed.
+        markDirty: Marks the watched file as changed.
+        close: Stops watching all files.
+    """
+
+    ############################################################################
+    def __init__(self) -> None:
+        """Initializes inotify.
+
+        Raises:
+            InotifyException: if inotify isn't available.
+        """
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise InotifyException("C library not found, inotify not available")
+
+        try:
+            self._libc = ctypes.CDLL(libc_name, use_errno=True)
+            self._libc.inotify_init1.argtypes = [ctypes.c_int]
+            self._libc.inotify_add_watch.argtypes = [
+                ctypes.c_int,
+                ctypes.c_char_p,
+                ctypes.c_uint32,
+            ]
+        except (OSError, AttributeError) as excp:
+            raise InotifyException(excp)
+
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise InotifyException(os.strerror(ctypes.get_errno()))
+
+        self._lock = threading.Lock()
+        # watch descriptor -> directory path
+        self._dirs: Dict[int, FilePath] = {}
+        # directory path -> watch descriptor
+        self._wds: Dict[FilePath, int] = {}
+        # (directory, file name) of watched files
+        self._files: Set[Tuple[FilePath, str]] = set()
+        # path -> hash of the file's content when it has been watched
+        self._hashes: Dict[FilePath, str] = {}
+        self._dirty: Set[FilePath] = set()
+
+    ############################################################################
+    def watch(self, file: FilePath, file_hash: str = "") -> None:
+        """Starts watching the given file and marks it as clean.
+
+        Call this before checking the file's content, so that changes happening
+        while reading it are not lost.
+
+        Args:
+            file (FilePath): The path to the file to watch.
+            file_hash (str, optional): The hash of the file's content the file is
+                                    clean for. Defaults to "".
+
+        Raises:
+            InotifyException: if the watch can't be added.
+        """
+        path = os.path.abspath(file)
+        directory, name = os.path.split(path)
+
+        with self._lock:
+            self._readEvents()
+            if directory not in self._wds:
+                wd = self._libc.inotify_add_watch(
+                    self.fd, os.fsencode(directory), WATCH_MASK
+                )
+                if wd < 0:
+                    raise InotifyException(
+                        'error "{error}" watching directory "{path}"'.format(
+                            error=os.strerror(ctypes.get_errno()), path=directory
+                        )
+                    )
+                self._wds[directory] = wd
+                self._dirs[wd] = directory
+            self._files.add((directory, name))
+            self._hashes[path] = file_hash
+            self._dirty.discard(path)
+
+    ############################################################################
+    def isWatched(self, file: FilePath) -> bool:
+        """Returns `True` if the given file is being watched.
+
+        Args:
+            file (FilePath): The path to the file.
+
+        Returns:
+            bool: `True` if the file is watched, `False` else.
+        """
+        return os.path.split(os.path.abspath(file)) in self._files
+
+    ############################################################################
+    def isDirty(self, file: FilePath, file_hash: str = "") -> bool:
+        """Returns `True` if the given watched file may have changed since it has
+        been marked as clean using `watch`.
+
+        Files that aren't watched and files that have been watched using another
+        hash than `file_hash` are always dirty.
+
+        Args:
+            file (FilePath): The path to the file.
+            file_hash (str, optional): The hash of the file's content to check
+                                    against. Defaults to "".
+
+        Returns:
+            bool: `True` if the file may have changed, `False` if it has not changed.
+        """
+        path = os.path.abspath(file)
+        with self._lock:
+            self._readEvents()
+            return (
+                path in self._dirty
+                or os.path.split(path) not in self._files
+                or self._hashes.get(path) != file_hash
+            )
+
+    ############################################################################
+    def markDirty(self, file: FilePath) -> None:
+        """Marks the given file as changed.
+
+        Args:
+            file (FilePath): The path to the file.
+        """
+        with self._lock:
+            self._dirty.add(os.path.abspath(file))
+
+    ############################################################################
+    def _readEvents(self) -> None:
+        """Reads all pending inotify events and marks the watched files as dirty.
+        The caller must hold the lock.
+        """
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return
+            except OSError as excp:
+                if excp.errno == errno.EINTR:
+                    continue
+                raise InotifyException(excp)
+
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset : offset + name_len].rstrip(b"\0"))
+                offset += name_len
+                self._handleEvent(wd, mask, name)
+
+    ############################################################################
+    def _handleEvent(self, wd: int, mask: int, name: str) -> None:
+        """Marks files as dirty according to the given event. The caller must hold
+        the lock.
+
+        Args:
+            wd (int): The watch descriptor of the event.
+            mask (int): The event's mask.
+            name (str): The name of the file in the watched directory.
+        """
+        if mask & IN_Q_OVERFLOW:
+            # events have been lost, every file may have changed
+            self._dirty.update(
+                os.path.join(directory, file_name)
+                for directory, file_name in self._files
+            )
+            return
+
+        directory = self._dirs.get(wd)
+        if directory is None:
+            return
+
+        if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+            self._dirty.update(
+                os.path.join(directory, file_name)
+                for watched_dir, file_name in self._files
+                if watched_dir == directory
+            )
+            self._files = {item for item in self._files if item[0] != directory}
+            self._hashes = {
+                path: file_hash
+                for path, file_hash in self._hashes.items()
+                if os.path.dirname(path) != directory
+            }
+            del self._dirs[wd]
+            del self._wds[directory]
+            return
+
+        if (directory, name) in self._files:
+            self._dirty.add(os.path.join(directory, name))
+
+    ############################################################################
+    def close(self) -> None:
+        """Stops watching and closes the inotify file descriptor."""
+        with self._lock:
+            if self.fd >= 0:
+                os.close(self.fd)
+                self.fd = -1
+            self._files = set()
+            self._hashes = {}
+            self._dirs = {}
+            self._wds = {}
+
+
+_config_watcher: ConfigWatcher = None
+"""The watcher used for the JSON configuration files, `None` if not available.
+"""
+
+
+################################################################################
+def startConfigWatcher() -> ConfigWatcher:
+    """Starts watching JSON configuration files using inotify, if available.
+
+    Returns:
+        ConfigWatcher: The watcher instance, `None` if inotify isn't available.
+    """
+    global _config_watcher
+    if _config_watcher is None:
+        try:
+            _config_watcher = ConfigWatcher()
+        except Exception as excp:
+            _logger.info(
+                'inotify not available ("{error}"), checking configuration files using their checksums'.format(
+                    error=excp
+                )
+            )
+    return _config_watcher
+
+
+################################################################################
+def getConfigWatcher() -> ConfigWatcher:
+    """Returns the configuration file watcher, if it has been started.
+
+    Returns:
+        ConfigWatcher: The watcher instance, `None` if it isn't running.
+    """
+    return _config_watcher
+
+
+################################################################################
+def stopConfigWatcher() -> None:
+    """Stops watching the JSON configuration files."""
+    global _config_watcher
+    if _config_watcher is not None:
+        _config_watcher.close()
+        _config_watcher = None
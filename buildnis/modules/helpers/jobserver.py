@@ -0,0 +1,314 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     jobserver.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import logging
+import os
+import select
+import shlex
+import threading
+from typing import Dict, Tuple
+
+from buildnis.modules import BuildnisException
+from buildnis.modules.helpers import LOGGER_NAME
+
+_logger = logging.getLogger(LOGGER_NAME)
+
+JOBSERVER_TOKEN: bytes = b"+"
+"""The token written to the pipe of a jobserver Buildnis has created.
+"""
+
+
+class JobServerException(BuildnisException):
+    """Exception raised if a token can't be read from or written to the jobserver."""
+
+
+class JobServer:
+    """A GNU make jobserver, a pipe or named pipe (FIFO) holding one byte - a token -
+    for each job that may run in addition to the first one.
+
+    Every process taking part - make, Buildnis, ninja - may always run one job
+    without a token, the implicit token of the process. To run another job at the
+    same time, it has to read a token from the jobserver, and write the same token
+    back after the job has finished. So the number of jobs running at the same time
+    of all processes sharing the jobserver is the number of tokens plus one.
+
+    A jobserver is either connected to using `connectJobServer`, if Buildnis is
+    called from a make, or created using `createJobServer`. The `MAKEFLAGS` of the
+    jobserver are passed to all commands run by `modules.helpers.execute.runCommand`,
+    so a make called by Buildnis uses the same jobserver.
+
+    Attributes:
+        read_fd (int): The file descriptor to read tokens from.
+        write_fd (int): The file descriptor to write tokens to.
+        makeflags (str): The value of `MAKEFLAGS` to pass to child processes.
+        fifo_path (str): The path to the named pipe, the empty string if the
+                        jobserver is an anonymous pipe.
+        is_owner (bool): `True` if Buildnis has created the jobserver.
+        num_acquired (int): The number of tokens that have been read.
+
+    Methods:
+        acquire: Reads a token from the jobserver, blocks until one is available.
+        release: Writes a token back to the jobserver.
+        getPassFds: Returns the file descriptors child processes have to inherit.
+        getEnvironment: Returns the environment to run child processes with.
+        close: Closes the file descriptors of the jobserver.
+    """
+
+    ############################################################################
+    def __init__(
+        self,
+        read_fd: int,
+        write_fd: int,
+        makeflags: str,
+        fifo_path: str = "",
+        is_owner: bool = False,
+    ) -> None:
+        """Constructor of a jobserver.
+
+        Args:
+            read_fd (int): The file descriptor to read tokens from.
+            write_fd (int): The file descriptor to write tokens to.
+            makeflags (str): The value of `MAKEFLAGS` to pass to child processes.
+            fifo_path (str, optional): The path to the named pipe. Defaults to "",
+                                    the jobserver is an anonymous pipe.
+            is_owner (bool, optional): `True` if Buildnis has created the
+                                    jobserver. Defaults to False.
+        """
+        self.read_fd = read_fd
+        self.write_fd = write_fd
+        self.makeflags = makeflags
+        self.fifo_path = fifo_path
+        self.is_owner = is_owner
+        self.num_acquired = 0
+        self._lock = threading.Lock()
+
+    ############################################################################
+    def acquire(self) -> bytes:
+        """Reads a token from the jobserver, blocks until one is available.
+
+        GNU make 4.3 and later set the read end of the pipe to non-blocking, so
+        if no token is available, this waits until the pipe is readable and
+        tries again. Other processes may take the token first.
+
+        Raises:
+            JobServerException: if the token can't be read.
+
+        Returns:
+            bytes: The token read, to pass to `release`.
+        """
+        while True:
+            try:
+                token = os.read(self.read_fd, 1)
+                break
+            except BlockingIOError:
+                try:
+                    select.select([self.read_fd], [], [])
+                except Exception as excp:
+                    raise JobServerException(excp)
+            except Exception as excp:
+                raise JobServerException(excp)
+
+        if token == b"":
+            raise JobServerException(
+                "the jobserver has been closed by the calling make"
+            )
+
+        with self._lock:
+            self.num_acquired += 1
+
+        return token
+
+    ############################################################################
+    def release(self, token: bytes) -> None:
+        """Writes the given token back to the jobserver.
+
+        Args:
+            token (bytes): The token returned by `acquire`.
+
+        Raises:
+            JobServerException: if the token can't be written.
+        """
+        try:
+            os.write(self.write_fd, token)
+        except Exception as excp:
+            raise JobServerException(excp)
+
+    ############################################################################
+    def getPassFds(self) -> Tuple[int, ...]:
+        """Returns the file descriptors child processes have to inherit to use the
+        jobserver.
+
+        Returns:
+            Tuple[int, ...]: The file descriptors of the pipe, an empty tuple if the
+                            jobserver is a named pipe.
+        """
+        if self.fifo_path != "":
+            return ()
+
+        return (self.read_fd, self.write_fd)
+
+    ############################################################################
+    def getEnvironment(self, environment: Dict[str, str] = None) -> Dict[str, str]:
+        """Returns the environment to run child processes with, the given
+        environment with `MAKEFLAGS` set to the jobserver's.
+
+        Args:
+            environment (Dict[str, str], optional): The environment to add
+                            `MAKEFLAGS` to. Defaults to None, the environment of
+                            this process.
+
+        Returns:
+            Dict[str, str]: The environment including `MAKEFLAGS`.
+        """
+        ret_val = dict(os.environ if environment is None else environment)
+        ret_val["MAKEFLAGS"] = self.makeflags
+
+        return ret_val
+
+    ############################################################################
+    def close(self) -> None:
+        """Closes the file descriptors of the jobserver, if Buildnis has created or
+        opened them.
+
+        The pipe of a calling make is not closed.
+        """
+        if self.is_owner or self.fifo_path != "":
+            for fd in {self.read_fd, self.write_fd}:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+
+        _logger.info("Jobserver: {num} tokens acquired".format(num=self.num_acquired))
+
+
+_job_server: JobServer = None
+"""The jobserver used by child processes, `None` if no jobserver is used.
+"""
+
+
+################################################################################
+def connectJobServer(makeflags: str) -> JobServer:
+    """Connects to the jobserver of a calling make, given by `--jobserver-auth`
+    (or `--jobserver-fds` of make before 4.2) in `makeflags`.
+
+    Both the named pipe of make 4.4, `--jobserver-auth=fifo:PATH`, and the anonymous
+    pipe `--jobserver-auth=R,W` are supported. The file descriptors of an anonymous
+    pipe are only inherited if the rule calling Buildnis is marked as recursive,
+    by a `+` or the variable `$(MAKE)`.
+
+    Args:
+        makeflags (str): The value of the environment variable `MAKEFLAGS`.
+
+    Returns:
+        JobServer: The connected jobserver, `None` if `makeflags` doesn't contain a
+                    usable jobserver.
+    """
+    auth = ""
+    try:
+        flags = shlex.split(makeflags)
+    except ValueError:
+        flags = makeflags.split()
+    for flag in flags:
+        for prefix in ["--jobserver-auth=", "--jobserver-fds="]:
+            if flag.startswith(prefix):
+                auth = flag[len(prefix) :]
+
+    if auth == "":
+        return None
+
+    if auth.startswith("fifo:"):
+        fifo_path = auth[len("fifo:") :]
+        try:
+            fd = os.open(fifo_path, os.O_RDWR)
+        except Exception as excp:
+            _logger.warning(
+                'error "{error}" opening jobserver "{path}", not using it'.format(
+                    error=excp, path=fifo_path
+                )
+            )
+            return None
+        return JobServer(fd, fd, makeflags, fifo_path=fifo_path)
+
+    try:
+        read_fd, write_fd = [int(fd) for fd in auth.split(",")]
+        if read_fd < 0 or write_fd < 0:
+            return None
+        os.fstat(read_fd)
+        os.fstat(write_fd)
+    except Exception as excp:
+        _logger.warning(
+            'error "{error}" connecting to jobserver "{auth}", not using it. Mark the make rule calling Buildnis as recursive using "+"'.format(
+                error=excp, auth=auth
+            )
+        )
+        return None
+
+    return JobServer(read_fd, write_fd, makeflags)
+
+
+################################################################################
+def createJobServer(num_jobs: int) -> JobServer:
+    """Creates a jobserver for `num_jobs` jobs running at the same time, an
+    anonymous pipe holding `num_jobs - 1` tokens.
+
+    The pipe is passed to child processes as `--jobserver-auth=R,W`, which is
+    understood by GNU make since version 4.2.
+
+    Args:
+        num_jobs (int): The number of jobs that may run at the same time.
+
+    Raises:
+        JobServerException: if the pipe can't be created.
+
+    Returns:
+        JobServer: The created jobserver, `None` on Windows, where make uses a
+                    semaphore instead of a pipe.
+    """
+    if os.name == "nt":
+        return None
+
+    try:
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, JOBSERVER_TOKEN * (max(1, num_jobs) - 1))
+    except Exception as excp:
+        raise JobServerException(excp)
+
+    return JobServer(
+        read_fd,
+        write_fd,
+        " -j{num} --jobserver-auth={read},{write}".format(
+            num=num_jobs, read=read_fd, write=write_fd
+        ),
+        is_owner=True,
+    )
+
+
+################################################################################
+def setJobServer(job_server: JobServer) -> None:
+    """Sets the jobserver child processes use.
+
+    Args:
+        job_server (JobServer): The jobserver to use, `None` to not pass a
+                                jobserver to child processes.
+    """
+    global _job_server
+    _job_server = job_server
+
+
+################################################################################
+def getJobServer() -> JobServer:
+    """Returns the jobserver in use.
+
+    Returns:
+        JobServer: The jobserver child processes use, `None` if no jobserver is
+                    used.
+    """
+    return _job_server
@@ -15,11 +15,15 @@ import logging
 import os
 import sys
 from logging import Logger
-from types import SimpleNamespace
 from typing import Dict, List
 
 from buildnis.modules import EXT_ERR_LD_FILE, EXT_ERR_NOT_VLD, EXT_ERR_WR_FILE
 from buildnis.modules.config import CFG_VERSION, FilePath
+from buildnis.modules.config.config_records import (
+    getAttributes,
+    hasAttributes,
+    recordFromDict,
+)
 from buildnis.modules.helpers import LOGGER_NAME
 from buildnis.modules.helpers.file_compare import FileCompare
 
@@ -30,7 +34,8 @@ _logger = logging.getLogger(LOGGER_NAME)
 def getJSONDict(src: object, to_ignore: List[str] = None) -> Dict:
     """Returns a dictionary suitable to pass to `json.dump(s)`.
 
-    Attention: only works with simple classes obtained from `json.load(s)`.
+    Attention: only works with simple classes obtained from `json.load(s)` and
+    with the records of `modules.config.config_records`.
 
     Args:
         src (object): The class to serialize.
@@ -43,20 +48,24 @@ def getJSONDict(src: object, to_ignore: List[str] = None) -> Dict:
         to_ignore = []
     ret_val = {}
 
-    for item in src.__dict__:
-        parseItem(src, to_ignore, ret_val, item)
+    attributes = getAttributes(src)
+    for item in attributes:
+        parseItem(attributes, to_ignore, ret_val, item)
 
     return ret_val
 
 
 ################################################################################
 def parseItem(
-    src: object, to_ignore: List[str], ret_val: Dict[str, object], item: object
+    src: Dict[str, object],
+    to_ignore: List[str],
+    ret_val: Dict[str, object],
+    item: object,
 ) -> None:
     """Parses an item of `src`'s dictionary of attributes.
 
     Args:
-        src (object): The object to serialize.
+        src (Dict[str, object]): The attributes of the object to serialize.
         to_ignore (List[str]): The list of attributes to ignore and not serialize.
         ret_val (Dict[str, object]): The dictionary to return, the serialized object
                                     src.
@@ -64,17 +73,17 @@ def parseItem(
     """
     if item in to_ignore:
         return
-    if isinstance(src.__dict__[item], Logger):
+    if isinstance(src[item], Logger):
         return
 
-    if isinstance(src.__dict__[item], list):
+    if isinstance(src[item], list):
         parseList(src, ret_val, item)
-    elif isinstance(src.__dict__[item], FileCompare):
+    elif isinstance(src[item], FileCompare):
         setFileCompare(src, ret_val, item)
-    elif hasattr(src.__dict__[item], "__dict__"):
-        ret_val[item] = getJSONDict(src.__dict__[item], to_ignore=to_ignore)
+    elif hasAttributes(src[item]):
+        ret_val[item] = getJSONDict(src[item], to_ignore=to_ignore)
     else:
-        ret_val[item] = src.__dict__[item]
+        ret_val[item] = src[item]
 
 
 ################################################################################
@@ -82,14 +91,14 @@ def parseList(src, ret_val, item) -> None:
     """Parse the elements of a list.
 
     Args:
-        src (object): The object to serialize.
+        src (Dict[str, object]): The attributes of the object to serialize.
         ret_val (Dict[str, object]): The dictionary to return, the serialized object
                                     src.
         item (object): The current item to serialize.
     """
     sub_list = []
-    for subitem in src.__dict__[item]:
-        if hasattr(subitem, "__dict__"):
+    for subitem in src[item]:
+        if hasAttributes(subitem):
             sub_list.append(getJSONDict(subitem))
         else:
             sub_list.append(subitem)
@@ -97,19 +106,21 @@ def parseList(src, ret_val, item) -> None:
 
 
 ################################################################################
-def setFileCompare(src: object, ret_val: Dict[str, object], item: object) -> None:
+def setFileCompare(
+    src: Dict[str, object], ret_val: Dict[str, object], item: object
+) -> None:
     """Set the attributes of the `FileCompare` instance in the JSON dictionary.
 
     Args:
-        src (object): The object to serialize.
+        src (Dict[str, object]): The attributes of the object to serialize.
         ret_val (Dict[str, object]): The dictionary to return, the serialized object
                                     src.
         item (object): The current item to serialize.
     """
     tmp_dict = {}
-    tmp_dict["path"] = src.__dict__[item].__dict__["path"]
-    tmp_dict["size"] = src.__dict__[item].__dict__["size"]
-    tmp_dict["hash"] = src.__dict__[item].__dict__["hash"]
+    tmp_dict["path"] = src[item].__dict__["path"]
+    tmp_dict["size"] = src[item].__dict__["size"]
+    tmp_dict["hash"] = src[item].__dict__["hash"]
     ret_val[item] = tmp_dict
 
 
@@ -196,7 +207,7 @@ def readJSON(
 
     try:
         with io.open(json_path, mode="r", encoding="utf-8") as file:
-            ret_val = json.load(file, object_hook=lambda dict: SimpleNamespace(**dict))
+            ret_val = json.load(file, object_hook=recordFromDict)
 
     except Exception as exp:
         _logger.critical(
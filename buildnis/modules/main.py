@@ -16,33 +16,58 @@ from buildnis.modules import EXT_ERR_IMP_MOD
 try:
     import logging
     import os
+    import platform
     from typing import List, Tuple
 except ImportError as exp:
     print('ERROR: error "{error}" importing modules'.format(error=exp), file=sys.stderr)
     sys.exit(EXT_ERR_IMP_MOD)
 
 try:
-    from buildnis.modules import EXT_OK
+    from buildnis.modules import EXT_ERR_BUILD, EXT_OK
+    from buildnis.modules.builds.artifact_cache import ArtifactCache
+    from buildnis.modules.builds.build_graph import BuildGraph
+    from buildnis.modules.builds.build_log import BuildLog
+    from buildnis.modules.builds.ninja_generator import NINJA_GENERATOR, NinjaGenerator
+    from buildnis.modules.builds.scheduler import BuildScheduler
     from buildnis.modules.config import (
+        ARTIFACT_CACHE_DIR_NAME,
+        BUILD_LOG_FILE_NAME,
         BUILD_TOOL_CONFIG_NAME,
         CFG_DIR_NAME,
+        CONFIG_SNAPSHOT_FILE_NAME,
+        ENV_CACHE_FILE_NAME,
+        HASH_CACHE_FILE_NAME,
         HOST_FILE_NAME,
         PROJECT_DEP_FILE_NAME,
         PROJECT_FILE_NAME,
         FilePath,
         config_values,
     )
+    from buildnis.modules.config.config import Config
     from buildnis.modules.config.config_dir_json import ConfigDirJson
     from buildnis.modules.config.config_files import ConfigFiles, ConfigTuple
     from buildnis.modules.config.configure_build import configureBuild
-    from buildnis.modules.config.host import Host
+    from buildnis.modules.config.host import Host, loadHostCfg
     from buildnis.modules.helpers.commandline import parseCommandLine
     from buildnis.modules.helpers.commandline_arguments import (
         CommandlineArguments,
         doDistClean,
         setupLogger,
     )
+    from buildnis.modules.helpers.env_cache import EnvCache, getEnvCache, setEnvCache
     from buildnis.modules.helpers.files import checkIfIsFile
+    from buildnis.modules.helpers.hash_cache import (
+        HashCache,
+        getHashCache,
+        setHashCache,
+    )
+    from buildnis.modules.helpers.inotify import startConfigWatcher, stopConfigWatcher
+    from buildnis.modules.helpers.jobserver import (
+        JobServer,
+        connectJobServer,
+        createJobServer,
+        setJobServer,
+    )
 except ImportError as exp:
     print(
         'ERROR: error "{error}" importing own modules'.format(error=exp),
@@ -68,7 +93,22 @@ def main():
     )
 
     # Always create host config
-    host_cfg, host_cfg_filename = setUpHostCfg(logger, project_cfg_dir)
+    host_cfg, host_cfg_filename = setUpHostCfg(
+        commandline_args, logger, project_cfg_dir
+    )
+
+    setUpHashCache(commandline_args, logger, project_cfg_dir, host_cfg)
+
+    setUpEnvCache(commandline_args, logger, project_cfg_dir, host_cfg)
+
+    # only hash JSON configurations again if inotify reports a change
+    startConfigWatcher()
+
+    artifact_cache = setUpArtifactCache(
+        commandline_args, logger, project_cfg_dir, host_cfg
+    )
+
+    build_log = setUpBuildLog(commandline_args, logger, project_cfg_dir, host_cfg)
 
     json_config_files = setUpPaths(
         project_cfg_dir=project_cfg_dir,
@@ -77,8 +117,12 @@ def main():
         host_cfg=host_cfg,
     )
 
-    if not commandline_args.do_clean:
-        configureBuild(
+    exit_code = EXT_OK
+    if commandline_args.show_artifact_cache_stats:
+        logger.warning(artifact_cache.getStats())
+
+    elif not commandline_args.do_clean:
+        cfg = configureBuild(
             commandline_args,
             logger,
             config_dir_config,
@@ -86,12 +130,29 @@ def main():
             host_cfg_filename,
             json_config_files,
         )
+        if commandline_args.generator == NINJA_GENERATOR:
+            if not writeNinjaFile(logger, cfg, project_cfg_dir):
+                exit_code = EXT_ERR_BUILD
+        if not runBuild(commandline_args, logger, cfg, artifact_cache, build_log):
+            exit_code = EXT_ERR_BUILD
 
     else:
         logger.warning(
             'Not doing anything but deleting files, a "clean" argument ("--clean" or "--distclean") has been given!'
         )
 
+    stopConfigWatcher()
+
+    saveEnvCache(commandline_args, logger)
+
+    saveHashCache(commandline_args, logger)
+
+    if commandline_args.do_distclean:
+        logger.warning(
+            'deleting artifact cache "{path}"'.format(path=artifact_cache.cache_dir)
+        )
+        artifact_cache.clear()
+
     # ! WARNING: no more logging after this function!
     # Logger is shut down
     doDistClean(
@@ -101,7 +162,7 @@ def main():
         list_of_generated_dirs=config_values.g_list_of_generated_dirs,
     )
 
-    sys.exit(EXT_OK)
+    sys.exit(exit_code)
 
 
 ################################################################################
@@ -195,11 +256,20 @@ def setUpPaths(
         config_name=PROJECT_FILE_NAME,
     )
 
+    config_snapshot = setUpConfigFile(
+        project_cfg_dir=project_cfg_dir,
+        list_of_generated_files=list_of_generated_files,
+        host_cfg=host_cfg,
+        config_name=CONFIG_SNAPSHOT_FILE_NAME,
+        extension="pickle",
+    )
+
     return ConfigFiles(
         host_cfg=ConfigTuple(path=host_cfg_file, exists=host_cfg_filename_exists),
         build_tools_cfg=build_tools,
         project_dep_cfg=project_dep,
         project_cfg=project_config,
+        config_snapshot=config_snapshot,
     )
 
 
@@ -209,6 +279,7 @@ def setUpConfigFile(
     list_of_generated_files: List[FilePath],
     host_cfg: Host,
     config_name: str,
+    extension: str = "json",
 ) -> ConfigTuple:
     """Set up each the path to each of the configuration files.
 
@@ -219,6 +290,8 @@ def setUpConfigFile(
         list_of_generated_files (List[FilePath]): List of generated JSON files
         host_cfg (Host): host configuration object instance
         config_name (str): The name of the config file to return the path of.
+        extension (str, optional): The file extension of the config file. Defaults
+                                    to "json".
 
     Returns:
         ConfigTuple: The path to the configuration JSON file and `True`, if
@@ -228,7 +301,7 @@ def setUpConfigFile(
     config_filename_exists = False
     config_filename = "/".join([project_cfg_dir, host_cfg.host_name])
     config_filename = "_".join([config_filename, config_name])
-    config_filename = ".".join([config_filename, "json"])
+    config_filename = ".".join([config_filename, extension])
     config_filename = os.path.normpath(config_filename)
     try:
         if checkIfIsFile(config_filename) is True:
@@ -244,17 +317,375 @@ def setUpConfigFile(
     return ConfigTuple(path=config_filename, exists=config_filename_exists)
 
 
+################################################################################
+def setUpHashCache(
+    commandline_args: CommandlineArguments,
+    logger: logging.Logger,
+    project_cfg_dir: FilePath,
+    host_cfg: Host,
+) -> None:
+    """Loads the persistent cache of file hashes from the configuration directory
+    and sets it as the hash cache to use, if it hasn't been disabled using the
+    command line argument `--no-hash-cache`.
+
+    Args:
+        commandline_args (CommandlineArguments): The object holding the command line
+                                                arguments.
+        logger (logging.Logger): The logger to use.
+        project_cfg_dir (FilePath): The path to the directory the JSON files are
+                                    generated in.
+        host_cfg (Host): host configuration object instance
+    """
+    hash_cache_file = setUpConfigFile(
+        project_cfg_dir=project_cfg_dir,
+        list_of_generated_files=config_values.g_list_of_generated_files,
+        host_cfg=host_cfg,
+        config_name=HASH_CACHE_FILE_NAME,
+    )
+
+    if not commandline_args.use_hash_cache:
+        logger.info("Not using the hash cache")
+        return
+
+    logger.info('Using hash cache "{path}"'.format(path=hash_cache_file.path))
+    setHashCache(HashCache(cache_path=hash_cache_file.path))
+
+
+################################################################################
+def setUpEnvCache(
+    commandline_args: CommandlineArguments,
+    logger: logging.Logger,
+    project_cfg_dir: FilePath,
+    host_cfg: Host,
+) -> None:
+    """Loads the persistent cache of environments set by environment scripts from
+    the configuration directory and sets it as the environment cache to use, if it
+    hasn't been disabled using the command line argument `--no-env-cache`.
+
+    Args:
+        commandline_args (CommandlineArguments): The object holding the command line
+                                                arguments.
+        logger (logging.Logger): The logger to use.
+        project_cfg_dir (FilePath): The path to the directory the JSON files are
+                                    generated in.
+        host_cfg (Host): host configuration object instance
+    """
+    env_cache_file = setUpConfigFile(
+        project_cfg_dir=project_cfg_dir,
+        list_of_generated_files=config_values.g_list_of_generated_files,
+        host_cfg=host_cfg,
+        config_name=ENV_CACHE_FILE_NAME,
+    )
+
+    if not commandline_args.use_env_cache:
+        logger.info("Not using the environment cache")
+        return
+
+    logger.info('Using environment cache "{path}"'.format(path=env_cache_file.path))
+    setEnvCache(EnvCache(cache_path=env_cache_file.path))
+
+
+################################################################################
+def setUpArtifactCache(
+    commandline_args: CommandlineArguments,
+    logger: logging.Logger,
+    project_cfg_dir: FilePath,
+    host_cfg: Host,
+) -> ArtifactCache:
+    """Sets up the cache of build stage results in the configuration directory.
+
+    Args:
+        commandline_args (CommandlineArguments): The object holding the command line
+                                                arguments.
+        logger (logging.Logger): The logger to use.
+        project_cfg_dir (FilePath): The path to the directory the JSON files are
+                                    generated in.
+        host_cfg (Host): host configuration object instance
+
+    Returns:
+        ArtifactCache: The artifact cache to use.
+    """
+    cache_dir = "/".join([project_cfg_dir, host_cfg.host_name])
+    cache_dir = "_".join([cache_dir, ARTIFACT_CACHE_DIR_NAME])
+    cache_dir = os.path.normpath(cache_dir)
+
+    logger.info('Using artifact cache "{path}"'.format(path=cache_dir))
+
+    return ArtifactCache(
+        cache_dir=cache_dir,
+        max_size=commandline_args.artifact_cache_size * 1024 * 1024,
+        use_hardlinks=commandline_args.artifact_cache_hardlinks,
+    )
+
+
+################################################################################
+def setUpBuildLog(
+    commandline_args: CommandlineArguments,
+    logger: logging.Logger,
+    project_cfg_dir: FilePath,
+    host_cfg: Host,
+) -> BuildLog:
+    """Loads the log of the build jobs of previous builds from the configuration
+    directory, if it hasn't been disabled using the command line argument
+    `--no-build-log`.
+
+    Args:
+        commandline_args (CommandlineArguments): The object holding the command line
+                                                arguments.
+        logger (logging.Logger): The logger to use.
+        project_cfg_dir (FilePath): The path to the directory the JSON files are
+                                    generated in.
+        host_cfg (Host): host configuration object instance
+
+    Returns:
+        BuildLog: The build log to use, `None` if all build jobs are run.
+    """
+    build_log_file = setUpConfigFile(
+        project_cfg_dir=project_cfg_dir,
+        list_of_generated_files=config_values.g_list_of_generated_files,
+        host_cfg=host_cfg,
+        config_name=BUILD_LOG_FILE_NAME,
+    )
+
+    if not commandline_args.use_build_log:
+        logger.info("Not using the build log")
+        return None
+
+    logger.info('Using build log "{path}"'.format(path=build_log_file.path))
+    return BuildLog(log_path=build_log_file.path)
+
+
+################################################################################
+def runBuild(
+    commandline_args: CommandlineArguments,
+    logger: logging.Logger,
+    cfg: Config,
+    artifact_cache: ArtifactCache,
+    build_log: BuildLog,
+) -> bool:
+    """Builds or installs the targets given by `--build` or `--install`, if one of
+    these arguments has been given.
+
+    Args:
+        commandline_args (CommandlineArguments): The object holding the command line
+                                                arguments.
+        logger (logging.Logger): The logger to use.
+        cfg (Config): The project configuration.
+        artifact_cache (ArtifactCache): The cache of build stage results.
+        build_log (BuildLog): The log of the build jobs of previous builds, `None`
+                            to run all build jobs.
+
+    Returns:
+        bool: `True` if the build has succeeded or nothing has been built, `False`
+                if a build job has failed.
+    """
+    if not commandline_args.do_build and not commandline_args.do_install:
+        return True
+
+    scheduler = BuildScheduler(
+        num_jobs=commandline_args.build_jobs,
+        keep_going=commandline_args.keep_going,
+        max_memory=int(
+            max(0.0, commandline_args.memory_fraction)
+            * int(config_values.HOST_EFFECTIVE_RAM)
+        ),
+        max_load=commandline_args.max_load,
+        max_cpu_pressure=commandline_args.max_cpu_pressure,
+    )
+    scheduler.job_server = setUpJobServer(commandline_args, logger, scheduler.num_jobs)
+    build_graph = BuildGraph(cfg, scheduler, artifact_cache, build_log)
+    try:
+        if commandline_args.do_build:
+            build_graph.addTargets(
+                build_graph.selectTargets(commandline_args.build_targets, False)
+            )
+        if commandline_args.do_install:
+            build_graph.addTargets(
+                build_graph.selectTargets(commandline_args.install_targets, True)
+            )
+        logger.warning(
+            "Running {num} build jobs, at most {max} at the same time".format(
+                num=len(scheduler.jobs), max=scheduler.num_jobs
+            )
+        )
+        ret_val = scheduler.run()
+    except Exception as excp:
+        logger.error('error "{error}" building the project'.format(error=excp))
+        ret_val = False
+
+    if scheduler.job_server is not None:
+        setJobServer(None)
+        scheduler.job_server.close()
+
+    try:
+        artifact_cache.save()
+    except Exception as excp:
+        logger.error(
+            'error "{error}" writing artifact cache "{path}"'.format(
+                error=excp, path=artifact_cache.cache_dir
+            )
+        )
+
+    if build_log is not None:
+        try:
+            build_log.save()
+            if build_log.log_path not in config_values.g_list_of_generated_files:
+                config_values.g_list_of_generated_files.append(build_log.log_path)
+        except Exception as excp:
+            logger.error(
+                'error "{error}" writing build log "{path}"'.format(
+                    error=excp, path=build_log.log_path
+                )
+            )
+
+    return ret_val
+
+
+################################################################################
+def writeNinjaFile(logger: logging.Logger, cfg: Config, build_dir: FilePath) -> bool:
+    """Writes the Ninja build file of the project to the given directory.
+
+    Args:
+        logger (logging.Logger): The logger to use.
+        cfg (Config): The project configuration.
+        build_dir (FilePath): The directory to write the Ninja file to.
+
+    Returns:
+        bool: `True` if the Ninja file has been written, `False` else.
+    """
+    ninja_generator = NinjaGenerator(cfg, build_dir)
+    try:
+        ninja_generator.generate()
+        ninja_generator.write()
+    except Exception as excp:
+        logger.error(
+            'error "{error}" writing Ninja build file "{path}"'.format(
+                error=excp, path=ninja_generator.ninja_path
+            )
+        )
+        return False
+
+    for file_name in [ninja_generator.ninja_path, ".ninja_log", ".ninja_deps"]:
+        path = os.path.join(ninja_generator.build_dir, file_name)
+        if path not in config_values.g_list_of_generated_files:
+            config_values.g_list_of_generated_files.append(path)
+
+    return True
+
+
+################################################################################
+def setUpJobServer(
+    commandline_args: CommandlineArguments, logger: logging.Logger, num_jobs: int
+) -> JobServer:
+    """Sets up the GNU make jobserver used by the build jobs and the commands they
+    run.
+
+    If Buildnis is called by a make with a jobserver in `MAKEFLAGS`, this jobserver
+    is used. Else a jobserver for `num_jobs` jobs is created, which is passed to
+    the makes called by build tools.
+
+    Args:
+        commandline_args (CommandlineArguments): The object holding the command line
+                                                arguments.
+        logger (logging.Logger): The logger to use.
+        num_jobs (int): The number of build jobs to run at the same time.
+
+    Returns:
+        JobServer: The jobserver in use, `None` if `--no-jobserver` has been given
+                    or no jobserver can be used.
+    """
+    if not commandline_args.use_jobserver:
+        return None
+
+    job_server = connectJobServer(os.environ.get("MAKEFLAGS", ""))
+    if job_server is not None:
+        logger.warning("Using the jobserver of the calling make")
+    else:
+        try:
+            job_server = createJobServer(num_jobs)
+        except Exception as excp:
+            logger.error(
+                'error "{error}" creating the jobserver, not using it'.format(
+                    error=excp
+                )
+            )
+            return None
+
+    setJobServer(job_server)
+    return job_server
+
+
+################################################################################
+def saveHashCache(
+    commandline_args: CommandlineArguments, logger: logging.Logger
+) -> None:
+    """Writes the hash cache to disk, if a hash cache is used and this isn't a
+    `--clean` or `--distclean` run.
+
+    Args:
+        commandline_args (CommandlineArguments): The object holding the command line
+                                                arguments.
+        logger (logging.Logger): The logger to use.
+    """
+    hash_cache = getHashCache()
+    if hash_cache is None or commandline_args.do_clean:
+        return
+
+    try:
+        hash_cache.save()
+        if hash_cache.cache_path not in config_values.g_list_of_generated_files:
+            config_values.g_list_of_generated_files.append(hash_cache.cache_path)
+    except Exception as excp:
+        logger.error(
+            'error "{error}" writing hash cache "{path}"'.format(
+                error=excp, path=hash_cache.cache_path
+            )
+        )
+
+
+################################################################################
+def saveEnvCache(
+    commandline_args: CommandlineArguments, logger: logging.Logger
+) -> None:
+    """Writes the environment cache to disk, if an environment cache is used and
+    this isn't a `--clean` or `--distclean` run.
+
+    Args:
+        commandline_args (CommandlineArguments): The object holding the command line
+                                                arguments.
+        logger (logging.Logger): The logger to use.
+    """
+    env_cache = getEnvCache()
+    if env_cache is None or commandline_args.do_clean:
+        return
+
+    try:
+        env_cache.save()
+        if env_cache.cache_path not in config_values.g_list_of_generated_files:
+            config_values.g_list_of_generated_files.append(env_cache.cache_path)
+    except Exception as excp:
+        logger.error(
+            'error "{error}" writing environment cache "{path}"'.format(
+                error=excp, path=env_cache.cache_path
+            )
+        )
+
+
 ################################################################################
 def setUpHostCfg(
+    commandline_args: CommandlineArguments,
     logger: logging.Logger,
     project_cfg_dir: FilePath,
 ) -> Tuple[Host, FilePath]:
     """Helper: Sets up the host's configuration.
 
-    Is always generated.
+    The host configuration JSON written by a previous run is reused, if the
+    fingerprint of this host hasn't changed and `--no-host-cache` hasn't been
+    given. Else the host's configuration is generated.
 
     Args:
-        list_of_generated_files (List[FilePath]): The list of generated files to add to
+        commandline_args (CommandlineArguments): The object holding the command line
+                                                arguments.
         logger (logging.Logger): The logger to use
         project_cfg_dir (FilePath): Path to the project config JSON file
 
@@ -262,18 +693,41 @@ def setUpHostCfg(
         Tuple[Host, FilePath]: the host configuration object instance and the host
                     configuration's filename as a tuple
     """
-    host_cfg = Host()
+    host_cfg = None
+    if commandline_args.use_host_cache:
+        host_cfg = loadHostCfg(getHostCfgFilename(project_cfg_dir, platform.node()))
+        if host_cfg is not None:
+            logger.info("Host unchanged, using the saved host configuration")
 
-    host_cfg_filename = "/".join([project_cfg_dir, host_cfg.host_name])
-    host_cfg_filename = "_".join([host_cfg_filename, HOST_FILE_NAME])
-    host_cfg_filename = ".".join([host_cfg_filename, "json"])
-    host_cfg_filename = os.path.normpath(host_cfg_filename)
+    if host_cfg is None:
+        host_cfg = Host()
+
+    host_cfg_filename = getHostCfgFilename(project_cfg_dir, host_cfg.host_name)
 
     logger.debug('Host config: """{cfg}"""'.format(cfg=host_cfg))
 
     return host_cfg, host_cfg_filename
 
 
+################################################################################
+def getHostCfgFilename(project_cfg_dir: FilePath, host_name: str) -> FilePath:
+    """Returns the path to the host configuration JSON file of the given host.
+
+    Args:
+        project_cfg_dir (FilePath): Path to the directory of the generated
+                                    configuration files.
+        host_name (str): The name of the host.
+
+    Returns:
+        FilePath: The path to the host configuration JSON file.
+    """
+    host_cfg_filename = "/".join([project_cfg_dir, host_name])
+    host_cfg_filename = "_".join([host_cfg_filename, HOST_FILE_NAME])
+    host_cfg_filename = ".".join([host_cfg_filename, "json"])
+
+    return os.path.normpath(host_cfg_filename)
+
+
 ################################################################################
 if __name__ == "__main__":
     # execute only if run as a script
@@ -11,6 +11,8 @@ from __future__ import annotations
 import os
 import pathlib
 import sys
+import threading
+import time
 
 # Some useful paths.
 tests_path = pathlib.Path(__file__).parent.absolute()
@@ -27,3 +29,15 @@ config_dir_abs = os.path.abspath("/".join([test_project_path, config_dir]))
 
 # use that name to get the logger to use for the tests.
 LOGGER_NAME = "tests_logger"
+
+
+################################################################################
+def sleepJob(running: list, lock: threading.Lock, max_running: list) -> None:
+    """A build job sleeping for a short time, counting the jobs running at the
+    same time."""
+    with lock:
+        running.append(1)
+        max_running[0] = max(max_running[0], len(running))
+    time.sleep(0.05)
+    with lock:
+        running.pop()
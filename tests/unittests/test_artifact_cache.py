@@ -0,0 +1,69 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     test_artifact_cache.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import os
+import pathlib
+import shutil
+import tempfile
+
+import pytest
+
+import tests
+from buildnis.modules.builds.artifact_cache import ArtifactCache, StageResult
+
+
+################################################################################
+@pytest.mark.fast
+def test_storeRestore() -> None:
+    """Test saving and restoring a file and a directory result."""
+    with tempfile.TemporaryDirectory(dir=tests.test_project_path) as temp_dir:
+        cache = ArtifactCache(cache_dir="/".join([temp_dir, "cache"]))
+        file_result = StageResult(type="single_file", path=temp_dir + "/out.txt")
+        dir_result = StageResult(type="dir", path=temp_dir + "/out_dir")
+        pathlib.Path(file_result.path).write_text("file result")
+        pathlib.Path(dir_result.path, "sub").mkdir(parents=True)
+        pathlib.Path(dir_result.path, "sub", "a.xml").write_text("dir result")
+
+        assert not cache.restore("abcd", [file_result, dir_result])  # nosec
+        assert cache.store("abcd", [file_result, dir_result])  # nosec
+
+        os.remove(file_result.path)
+        shutil.rmtree(dir_result.path)
+
+        assert cache.restore("abcd", [file_result, dir_result])  # nosec
+        assert pathlib.Path(file_result.path).read_text() == "file result"  # nosec
+        assert (  # nosec
+            pathlib.Path(dir_result.path, "sub", "a.xml").read_text() == "dir result"
+        )
+        assert cache.hits == 1  # nosec
+        assert cache.misses == 1  # nosec
+
+        cache.save()
+        cache = ArtifactCache(cache_dir="/".join([temp_dir, "cache"]))
+        assert cache.hits == 1  # nosec
+
+
+################################################################################
+@pytest.mark.fast
+def test_evictLRU() -> None:
+    """Test that the least recently used entries are deleted first."""
+    with tempfile.TemporaryDirectory(dir=tests.test_project_path) as temp_dir:
+        cache = ArtifactCache(cache_dir="/".join([temp_dir, "cache"]), max_size=250)
+        result = StageResult(type="single_file", path=temp_dir + "/out.bin")
+
+        for fingerprint in ["aa01", "aa02", "aa03"]:
+            pathlib.Path(result.path).write_bytes(os.urandom(100))
+            assert cache.store(fingerprint, [result])  # nosec
+            if fingerprint == "aa02":
+                assert cache.restore("aa01", [result])  # nosec
+
+        assert cache.restore("aa01", [result])  # nosec
+        assert cache.restore("aa03", [result])  # nosec
+        assert not cache.restore("aa02", [result])  # nosec
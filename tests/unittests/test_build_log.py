@@ -0,0 +1,162 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     test_build_log.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import pathlib
+import sys
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+from buildnis.modules.builds.build_graph import BuildGraph
+from buildnis.modules.builds.build_log import BuildLog
+from buildnis.modules.builds.scheduler import BuildScheduler
+
+COPY_SCRIPT = """import pathlib, sys
+lines = pathlib.Path(sys.argv[1]).read_text().splitlines(keepends=True)
+pathlib.Path(sys.argv[2]).write_text(
+    "".join(line for line in lines if not line.startswith("#"))
+)
+with open("runs.txt", mode="a") as file:
+    file.write(sys.argv[2] + "\\n")
+"""
+
+ALLOC_SCRIPT = """import sys
+data = b"x" * (int(sys.argv[1]) * 2**20)
+"""
+
+
+################################################################################
+def makeConfig(base_dir: pathlib.Path) -> object:
+    """Returns a project configuration with a single target, copying `in.txt` to
+    `mid.txt` and `mid.txt` to `out.txt` in two stages, without comment lines."""
+    build_tool = SimpleNamespace(
+        name="Python", build_tool_exe=sys.executable, version="3"
+    )
+    stages = [
+        SimpleNamespace(
+            name=name,
+            build_tool=build_tool,
+            call_build_tool="once",
+            dependencies=[str(base_dir / src)],
+            results=[SimpleNamespace(type="single_file", path_or_regexp=str(dst))],
+            build_tool_arguments=[
+                " ".join([str(base_dir / "copy.py"), src, str(dst.name)])
+            ],
+        )
+        for name, src, dst in [
+            ("first", "in.txt", base_dir / "mid.txt"),
+            ("second", "mid.txt", base_dir / "out.txt"),
+        ]
+    ]
+    return SimpleNamespace(
+        module_cfgs=[
+            SimpleNamespace(
+                name="copy",
+                module_path=str(base_dir),
+                targets=[
+                    SimpleNamespace(
+                        name="copy",
+                        default=True,
+                        build_tool=SimpleNamespace(stages=stages),
+                    )
+                ],
+            )
+        ]
+    )
+
+
+################################################################################
+def runBuild(cfg: object, log_path: str) -> list:
+    """Builds the default target of `cfg` using the build log at `log_path`, returns
+    the outputs of the stages that have run."""
+    runs_file = pathlib.Path(cfg.module_cfgs[0].module_path) / "runs.txt"
+    runs_file.write_text("")
+
+    build_log = BuildLog(log_path=log_path)
+    scheduler = BuildScheduler()
+    build_graph = BuildGraph(cfg, scheduler, build_log=build_log)
+    build_graph.addTargets(build_graph.selectTargets([], False))
+    assert scheduler.run() is True  # nosec
+    build_log.save()
+
+    return runs_file.read_text().split()
+
+
+################################################################################
+@pytest.mark.fast
+def test_buildLog() -> None:
+    """Test that jobs are only run if their inputs, command or results have changed
+    or the results of a job they depend on have changed."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base_dir = pathlib.Path(temp_dir)
+        (base_dir / "copy.py").write_text(COPY_SCRIPT)
+        (base_dir / "in.txt").write_text("foo")
+        log_path = str(base_dir / "build_log.json")
+        cfg = makeConfig(base_dir)
+
+        first_build = runBuild(cfg, log_path)
+        no_op_build = runBuild(cfg, log_path)
+
+        (base_dir / "in.txt").write_text("bar")
+        changed_input = runBuild(cfg, log_path)
+
+        (base_dir / "in.txt").write_text("# comment\nbar")
+        changed_comment = runBuild(cfg, log_path)
+
+        (base_dir / "out.txt").unlink()
+        deleted_result = runBuild(cfg, log_path)
+
+        cfg.module_cfgs[0].targets[0].build_tool.stages[1].build_tool.version = "4"
+        changed_version = runBuild(cfg, log_path)
+
+        no_log_build = runBuild(cfg, "")
+        result = (base_dir / "out.txt").read_text()
+
+    assert first_build == ["mid.txt", "out.txt"]  # nosec
+    assert no_op_build == []  # nosec
+    assert changed_input == ["mid.txt", "out.txt"]  # nosec
+    assert changed_comment == ["mid.txt"]  # nosec
+    assert deleted_result == ["out.txt"]  # nosec
+    assert changed_version == ["mid.txt", "out.txt"]  # nosec
+    assert no_log_build == ["mid.txt", "out.txt"]  # nosec
+    assert result == "bar"  # nosec
+
+
+################################################################################
+@pytest.mark.fast
+def test_jobMemory() -> None:
+    """Test that the peak memory usage of each job is saved, also if a job uses
+    less memory than a job that has run before it."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base_dir = pathlib.Path(temp_dir)
+        (base_dir / "alloc.py").write_text(ALLOC_SCRIPT)
+        cfg = makeConfig(base_dir)
+        stages = cfg.module_cfgs[0].targets[0].build_tool.stages
+        for stage, size in zip(stages, [200, 50]):
+            stage.dependencies = []
+            stage.results = []
+            stage.build_tool_arguments = [
+                " ".join([str(base_dir / "alloc.py"), str(size)])
+            ]
+
+        build_log = BuildLog(log_path="")
+        scheduler = BuildScheduler()
+        build_graph = BuildGraph(cfg, scheduler, build_log=build_log)
+        build_graph.addTargets(build_graph.selectTargets([], False))
+        assert scheduler.run() is True  # nosec
+        first_memory = build_log.getMemory("copy/copy/first")
+        second_memory = build_log.getMemory("copy/copy/second")
+
+    if sys.platform == "win32":
+        assert (first_memory, second_memory) == (None, None)  # nosec
+    else:
+        assert first_memory > 200 * 2**20  # nosec
+        assert 50 * 2**20 < second_memory < first_memory  # nosec
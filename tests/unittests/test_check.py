@@ -0,0 +1,175 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     test_check.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import os
+import pathlib
+import platform
+import stat
+import sys
+import tempfile
+import time
+
+import pytest
+
+import buildnis.modules.config.check as check_module
+from buildnis.modules.config import LINUX_OS_STRING
+from buildnis.modules.config.check import Check, getVersionProbeKey
+from buildnis.modules.config.config_records import BuildToolRecord
+
+SCRIPT_TEMPLATE = """#!/bin/sh
+sleep {sleep}
+echo '{{"build_tools": [{{"name": "{name}", "build_tool_exe": "{name}", "version_regex": "(.*)"}}]}}'
+"""
+
+TOOL_TEMPLATE = """#!/bin/sh
+echo run >> {log}
+echo "tool version {version}"
+"""
+
+
+################################################################################
+@pytest.mark.skipif(sys.platform == "win32", reason="needs a POSIX shell")
+def test_runScripts() -> None:
+    """Test that the configure scripts run concurrently and that their build tools
+    are added in the order of the script names."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        os_dir = pathlib.Path("/".join([temp_dir, LINUX_OS_STRING]))
+        os_dir.mkdir()
+        names = ["a_tool", "b_tool", "c_tool"]
+        for name, sleep in zip(names, [0.6, 0.3, 0]):
+            script = os_dir / "{name}.sh".format(name=name)
+            script.write_text(SCRIPT_TEMPLATE.format(sleep=sleep, name=name))
+            os.chmod(script, script.stat().st_mode | stat.S_IXUSR)
+
+        check = Check(os_name=LINUX_OS_STRING, arch="x64", user_path="", do_check=False)
+        start_time = time.perf_counter()
+        check.runScripts(check.getScriptsInDir(os_dir), num_jobs=3)
+        run_time = time.perf_counter() - start_time
+
+    assert [tool.name for tool in check.build_tool_cfgs] == names  # nosec
+    assert check.build_tool_cfgs[0].version_arg == ""  # nosec
+    assert run_time < 0.9  # nosec
+
+
+################################################################################
+@pytest.mark.skipif(sys.platform == "win32", reason="needs a POSIX shell")
+def test_checkVersions() -> None:
+    """Test that the versions of the build tools are checked concurrently and that
+    build tools not answering within their timeout are killed."""
+    check = Check(os_name=LINUX_OS_STRING, arch="x64", user_path="", do_check=False)
+    check.build_tool_cfgs = [
+        BuildToolRecord(
+            name="Python",
+            build_tool_exe=sys.executable,
+            version_arg="--version",
+            version_regex=r"Python (\S+)",
+        ),
+        BuildToolRecord(
+            name="Sleep",
+            build_tool_exe="sleep",
+            version_arg="5",
+            version_regex="(.*)",
+            version_timeout=0.5,
+        ),
+        BuildToolRecord(
+            name="Missing",
+            build_tool_exe="not_existing_build_tool",
+            version_regex="(.*)",
+        ),
+    ]
+
+    start_time = time.perf_counter()
+    check.checkVersions(num_jobs=2)
+    run_time = time.perf_counter() - start_time
+
+    python, sleep, missing = check.build_tool_cfgs
+    assert python.version == platform.python_version()  # nosec
+    assert python.is_checked is True  # nosec
+    assert not hasattr(sleep, "is_checked")  # nosec
+    assert not hasattr(missing, "is_checked")  # nosec
+    assert run_time < 4  # nosec
+
+
+################################################################################
+@pytest.mark.skipif(sys.platform == "win32", reason="needs a POSIX shell")
+def test_versionProbes() -> None:
+    """Test that build tools with an unchanged fingerprint aren't run again and
+    that a changed executable is run."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log = pathlib.Path(temp_dir) / "log"
+        tool_exe = pathlib.Path(temp_dir) / "tool"
+        tool_exe.write_text(TOOL_TEMPLATE.format(log=log, version="1.0"))
+        os.chmod(tool_exe, tool_exe.stat().st_mode | stat.S_IXUSR)
+
+        def checkTool(version_probes: dict) -> Check:
+            check = Check(
+                os_name=LINUX_OS_STRING, arch="x64", user_path="", do_check=False
+            )
+            check.build_tool_cfgs = [
+                BuildToolRecord(
+                    name="Tool",
+                    build_tool_exe=str(tool_exe),
+                    version_arg="--version",
+                    version_regex=r"tool version (\S+)",
+                )
+            ]
+            check.checkVersions(version_probes=version_probes)
+            return check
+
+        first = checkTool({})
+        second = checkTool(first.version_probes)
+        num_runs = len(log.read_text().splitlines())
+
+        tool_exe.write_text(TOOL_TEMPLATE.format(log=log, version="2.0.0"))
+        third = checkTool(second.version_probes)
+        num_runs_changed = len(log.read_text().splitlines())
+
+        no_key = getVersionProbeKey(
+            BuildToolRecord(
+                build_tool_exe="not_existing_build_tool",
+                version_regex="(.*)",
+                version_arg="",
+            ),
+            "not_existing_build_tool",
+            True,
+        )
+
+    assert second.build_tool_cfgs[0].version == "1.0"  # nosec
+    assert second.build_tool_cfgs[0].is_checked is True  # nosec
+    assert second.version_probes == first.version_probes  # nosec
+    assert num_runs == 1  # nosec
+    assert third.build_tool_cfgs[0].version == "2.0.0"  # nosec
+    assert num_runs_changed == 2  # nosec
+    assert no_key is None  # nosec
+
+
+################################################################################
+def test_versionProbeKeysConcurrent(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the fingerprints of the build tools, which may source environment
+    scripts, are computed concurrently and don't block the event loop."""
+
+    def slowProbeKey(tool: object, exe_path: str, source_env_script: bool) -> str:
+        time.sleep(0.5)
+        return tool.name
+
+    monkeypatch.setattr(check_module, "getVersionProbeKey", slowProbeKey)
+    check = Check(os_name=LINUX_OS_STRING, arch="x64", user_path="", do_check=False)
+    names = ["a_tool", "b_tool", "c_tool"]
+    check.build_tool_cfgs = [
+        BuildToolRecord(name=name, build_tool_exe=name, version_regex="(.*)")
+        for name in names
+    ]
+
+    start_time = time.perf_counter()
+    check.checkVersions(num_jobs=3, version_probes={name: "1.0" for name in names})
+    run_time = time.perf_counter() - start_time
+
+    assert [tool.version for tool in check.build_tool_cfgs] == ["1.0"] * 3  # nosec
+    assert run_time < 1.2  # nosec
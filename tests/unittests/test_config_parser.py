@@ -0,0 +1,69 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     test_config_parser.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from buildnis.modules.config import config_values
+from buildnis.modules.helpers import config_parser
+
+
+################################################################################
+@pytest.mark.fast
+def test_expandItem(monkeypatch) -> None:
+    """Test the expansion of constants and references using compiled templates."""
+    monkeypatch.setattr(config_values, "PROJECT_NAME", "Test")
+    root = SimpleNamespace(version="1.0", sources=["a.cpp", "b.cpp"])
+    target = SimpleNamespace(build_directory="C:\\build")
+    parents = [root, root, target]
+
+    template = config_parser.compileTemplate("${PROJECT_NAME}=${../build_directory}/x")
+    assert template.num_references == 1  # nosec
+    assert template.segments[-1] == "/x"  # nosec
+    same_template = config_parser.compileTemplate(
+        "${PROJECT_NAME}=${../build_directory}/x"
+    )
+    assert same_template is template  # nosec
+
+    assert (  # nosec
+        config_parser.expandItem("${PROJECT_NAME}=${../build_directory}/x", parents)
+        == "Test=C:\\build/x"
+    )
+    assert config_parser.expandItem("${../../../version}", parents) == "1.0"  # nosec
+    assert config_parser.expandItem("${sources}", parents) == [  # nosec
+        "a.cpp",
+        "b.cpp",
+    ]
+    unknown = config_parser.expandItem("${../unknown}", parents)
+    assert unknown == "${../unknown}"  # nosec
+
+
+################################################################################
+@pytest.mark.fast
+def test_parseConfigElement(caplog) -> None:
+    """Test the expansion of chained and multiple references and of cycles."""
+    root = SimpleNamespace(
+        first="${second}/1",
+        second="${third}/2",
+        third="base",
+        both="${first}:${../third}",
+        cycle_a="${cycle_b}",
+        cycle_b="${cycle_a}",
+        targets=[SimpleNamespace(path="${../../first}/target")],
+    )
+
+    config_parser.parseConfigElement(root, parents=[root])
+
+    assert root.first == "base/2/1"  # nosec
+    assert root.both == "base/2/1:base"  # nosec
+    assert root.targets[0].path == "base/2/1/target"  # nosec
+    assert root.cycle_b == "${cycle_a}"  # nosec
+    assert "cyclic references" in caplog.text  # nosec
@@ -0,0 +1,113 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     test_config_records.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import json
+import pickle  # nosec
+from types import SimpleNamespace
+
+import pytest
+
+from buildnis.modules.config.config_records import (
+    DependencyRecord,
+    ResultRecord,
+    StageRecord,
+    TargetRecord,
+    recordFromDict,
+)
+from buildnis.modules.helpers.config_parser import parseConfigElement
+from buildnis.modules.helpers.json import getJSONDict
+
+BUILD_CONFIG_JSON = """{
+    "file_name": "build_config",
+    "name": "Doc",
+    "stages": [
+        {
+            "name": "Doxygen XML",
+            "build_tool_name": "Doxygen",
+            "unknown": "${../name}",
+            "results": [{"type": "dir", "path_or_regexp": "./xml"}]
+        }
+    ],
+    "targets": [{"name": "exe", "build_type": "executable"}],
+    "dependencies": [{"name": "Sphinx", "ok_if_executable": "sphinx-build"}]
+}"""
+
+
+################################################################################
+@pytest.mark.fast
+def test_recordFromDict() -> None:
+    """Test that the JSON objects are loaded as records of the right type, with
+    default values, and can be serialized again."""
+    cfg = json.loads(BUILD_CONFIG_JSON, object_hook=recordFromDict)
+
+    assert isinstance(cfg, SimpleNamespace)  # nosec
+    stage = cfg.stages[0]
+    assert isinstance(stage, StageRecord)  # nosec
+    assert isinstance(stage.results[0], ResultRecord)  # nosec
+    assert isinstance(cfg.targets[0], TargetRecord)  # nosec
+    assert isinstance(cfg.dependencies[0], DependencyRecord)  # nosec
+
+    assert stage.unknown == "${../name}"  # nosec
+    assert not hasattr(stage, "build_tool")  # nosec
+    dependency = cfg.dependencies[0]
+    assert dependency.is_checked is False  # nosec
+    dependency.install_arguments.append("install")
+    assert DependencyRecord().install_arguments == []  # nosec
+
+    stage["unknown"] = "Doc"
+    stage.build_tool = "Doxygen"
+    json_dict = getJSONDict(cfg)
+    assert json_dict["stages"][0]["unknown"] == "Doc"  # nosec
+    assert json_dict["stages"][0]["build_tool"] == "Doxygen"  # nosec
+    assert json_dict["stages"][0]["results"] == [  # nosec
+        {"type": "dir", "path_or_regexp": "./xml"}
+    ]
+    target_dict = json_dict["targets"][0]
+    assert target_dict == {"name": "exe", "build_type": "executable"}  # nosec
+    assert list(json_dict["stages"][0]) == [  # nosec
+        "name",
+        "build_tool_name",
+        "unknown",
+        "results",
+        "build_tool",
+    ]
+    assert list(json_dict["dependencies"][0])[:3] == [  # nosec
+        "name",
+        "ok_if_executable",
+        "website_url",
+    ]
+
+    unpickled = pickle.loads(pickle.dumps(stage))  # nosec
+    assert unpickled == stage  # nosec
+    assert list(unpickled.toDict()) == list(stage.toDict())  # nosec
+
+
+################################################################################
+@pytest.mark.fast
+def test_recordExtras() -> None:
+    """Test that records don't have a `__dict__` and keep attributes that aren't
+    in `__slots__` in `_extras`, only if there are any."""
+    cfg = json.loads(BUILD_CONFIG_JSON, object_hook=recordFromDict)
+    result = cfg.stages[0].results[0]
+    getJSONDict(cfg)
+    parseConfigElement(cfg, [cfg])
+
+    assert not hasattr(result, "__dict__")  # nosec
+    assert not hasattr(result, "_extras")  # nosec
+    assert cfg.stages[0]._extras == {"unknown": "Doxygen XML"}  # nosec
+
+    result.checksum = "abc"
+    del result.type
+    assert result.checksum == "abc"  # nosec
+    assert list(result.toDict()) == ["path_or_regexp", "checksum"]  # nosec
+    with pytest.raises(AttributeError):
+        result.type
+    del result.checksum
+    assert not hasattr(result, "checksum")  # nosec
@@ -0,0 +1,56 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     test_config_snapshot.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import os
+import pathlib
+import shutil
+import tempfile
+
+import pytest
+
+import tests
+from buildnis.modules.config import config_snapshot
+from buildnis.modules.config.config import Config
+
+
+################################################################################
+@pytest.mark.fast
+def test_configSnapshot() -> None:
+    """Test that the snapshot is loaded if no source JSON has changed, and is not
+    used after a change of a module configuration."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        project_dir = "/".join([temp_dir, "project"])
+        shutil.copytree(
+            tests.test_project_path,
+            project_dir,
+            ignore=shutil.ignore_patterns("delete_me", "*.pickle"),
+        )
+        project_config = "/".join([project_dir, "project_config.json"])
+        snapshot_path = "/".join([temp_dir, "snapshot.pickle"])
+
+        cfg = Config(project_config=project_config, json_path="not_existing.json")
+        cfg.expandAllPlaceholders()
+        assert config_snapshot.saveConfigSnapshot(  # nosec
+            snapshot_path=snapshot_path, cfg=cfg, build_tools_cfg="not_existing.json"
+        )
+
+        loaded = config_snapshot.loadConfigSnapshot(snapshot_path, project_config)
+        assert loaded is not None  # nosec
+        assert loaded.name == cfg.name  # nosec
+        assert [module.name for module in loaded.module_cfgs] == [  # nosec
+            module.name for module in cfg.module_cfgs
+        ]
+
+        module_path = pathlib.Path(cfg.module_cfgs[0].config_path)
+        module_path.write_text(module_path.read_text().replace("C++", "C"))
+        assert os.path.isfile(snapshot_path)  # nosec
+        assert (  # nosec
+            config_snapshot.loadConfigSnapshot(snapshot_path, project_config) is None
+        )
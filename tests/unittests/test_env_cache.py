@@ -0,0 +1,108 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     test_env_cache.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import concurrent.futures
+import pathlib
+import sys
+import tempfile
+import time
+
+import pytest
+
+from buildnis.modules.helpers.env_cache import EnvCache, getEnvironmentKey, setEnvCache
+from buildnis.modules.helpers.execute import EnvArgs, ExeArgs, runCommand
+
+ENV_SCRIPT = """export BUILDNIS_TEST_FOO="bar $1"
+unset BUILDNIS_TEST_UNSET
+"""
+
+
+################################################################################
+@pytest.mark.skipif(sys.platform == "win32", reason="needs bash")
+def test_getEnvironment(monkeypatch) -> None:
+    """Test that environment scripts are sourced once, that the environment they
+    set is reused from memory and from disk and used to run commands."""
+    monkeypatch.setenv("BUILDNIS_TEST_UNSET", "1")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        script = pathlib.Path(temp_dir) / "setvars.sh"
+        script.write_text(ENV_SCRIPT)
+        cache_path = str(pathlib.Path(temp_dir) / "env_cache.json")
+
+        cache = EnvCache(cache_path=cache_path)
+        environment = cache.getEnvironment(str(script), ["baz"])
+        assert environment["BUILDNIS_TEST_FOO"] == "bar baz"  # nosec
+        assert "BUILDNIS_TEST_UNSET" not in environment  # nosec
+        cache.getEnvironment(str(script), ["baz"])
+        assert (cache.hits, cache.misses) == (1, 1)  # nosec
+        cache.save()
+
+        loaded_cache = EnvCache(cache_path=cache_path)
+        loaded_env = loaded_cache.getEnvironment(str(script), ["baz"])
+        assert loaded_env["BUILDNIS_TEST_FOO"] == "bar baz"  # nosec
+        assert (loaded_cache.hits, loaded_cache.misses) == (1, 0)  # nosec
+
+        setEnvCache(loaded_cache)
+        try:
+            result = runCommand(
+                exe_args=ExeArgs("printenv", ["BUILDNIS_TEST_FOO"]),
+                env_args=EnvArgs(str(script), ["baz"], True),
+            )
+        finally:
+            setEnvCache(None)
+
+    assert result.std_out.strip() == "bar baz"  # nosec
+    assert loaded_cache.hits == 2  # nosec
+
+
+################################################################################
+@pytest.mark.skipif(sys.platform == "win32", reason="needs bash")
+def test_environmentKey(monkeypatch) -> None:
+    """Test that only the search paths of the environment are part of the key of
+    a cache entry, not variables that change with every run."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        script = pathlib.Path(temp_dir) / "setvars.sh"
+        script.write_text(ENV_SCRIPT)
+
+        key = getEnvironmentKey(str(script), ["baz"])
+        monkeypatch.setenv("BUILDNIS_TEST_CI_JOB_ID", "4711")
+        assert getEnvironmentKey(str(script), ["baz"]) == key  # nosec
+        monkeypatch.setenv("LD_LIBRARY_PATH", temp_dir)
+        assert getEnvironmentKey(str(script), ["baz"]) != key  # nosec
+        assert getEnvironmentKey(str(script), ["qux"]) != key  # nosec
+
+
+################################################################################
+@pytest.mark.skipif(sys.platform == "win32", reason="needs bash")
+def test_getEnvironmentConcurrent() -> None:
+    """Test that different environment scripts are sourced at the same time and
+    the same script only once."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        scripts = []
+        for idx in range(2):
+            script = pathlib.Path(temp_dir) / "setvars_{idx}.sh".format(idx=idx)
+            script.write_text("sleep 0.5\n" + ENV_SCRIPT)
+            scripts.append(str(script))
+
+        cache = EnvCache()
+        start_time = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            environments = list(
+                executor.map(
+                    lambda script: cache.getEnvironment(script, ["baz"]),
+                    scripts * 2,
+                )
+            )
+        run_time = time.perf_counter() - start_time
+
+    assert [env["BUILDNIS_TEST_FOO"] for env in environments] == [  # nosec
+        "bar baz"
+    ] * 4
+    assert (cache.hits, cache.misses) == (2, 2)  # nosec
+    assert run_time < 0.95  # nosec
@@ -9,6 +9,7 @@
 from __future__ import annotations
 
 import ctypes
+import hashlib
 import os
 import pathlib
 import platform
@@ -20,6 +21,7 @@ import pytest
 import tests
 from buildnis.modules.config import FilePath
 from buildnis.modules.helpers import files
+from buildnis.modules.helpers.file_compare import FileCompare, getFileCompares
 
 
 ################################################################################
@@ -199,6 +201,77 @@ def test_hashFile() -> None:
     assert excp  # nosec
 
 
+################################################################################
+@pytest.mark.fast
+@pytest.mark.parametrize("size", [0, 1, 4095, 4096, 100000])
+@pytest.mark.parametrize("use_mmap", [False, True], ids=["read", "mmap"])
+def test_hashFileChunks(monkeypatch, size: int, use_mmap: bool) -> None:
+    """Test that hashing in chunks yields the same hash as hashing the whole file."""
+    monkeypatch.setattr(files, "HASH_BUFFER_SIZE", 4096)
+    if use_mmap:
+        monkeypatch.setattr(files, "HASH_MMAP_THRESHOLD", 1)
+    monkeypatch.setattr(files, "_hash_buffers", files.threading.local())
+
+    with tempfile.TemporaryDirectory(dir=tests.test_project_path) as temp_dir:
+        file_path = os.path.abspath("/".join([temp_dir, "to_hash"]))
+        data = os.urandom(size)
+        pathlib.Path(file_path).write_bytes(data)
+
+        hex_hash = files.hashFile(file=file_path)
+        assert hex_hash == hashlib.blake2b(data).hexdigest()  # nosec
+
+
+################################################################################
+@pytest.mark.fast
+@pytest.mark.parametrize("num_workers", [1, 4])
+def test_hashFiles(num_workers: int) -> None:
+    """Test that hashing in parallel yields the same hashes as `hashFile`."""
+    with tempfile.TemporaryDirectory(dir=tests.test_project_path) as temp_dir:
+        file_list = []
+        for i in range(10):
+            file_path = os.path.abspath("/".join([temp_dir, str(i)]))
+            pathlib.Path(file_path).write_bytes(os.urandom(i * 1000))
+            file_list.append(file_path)
+
+        hashes = files.hashFiles(file_list=file_list, num_workers=num_workers)
+        for file_path in file_list:
+            assert hashes[file_path] == files.hashFile(file_path)  # nosec
+
+        with pytest.raises(expected_exception=files.FileCompareException):
+            files.hashFiles(
+                file_list=[*file_list, temp_dir + "/does_not_exist"],
+                num_workers=num_workers,
+            )
+
+
+################################################################################
+@pytest.mark.fast
+@pytest.mark.parametrize("num_workers", [1, 4])
+def test_getFileCompares(num_workers: int) -> None:
+    """Test that the `FileCompare` instances constructed in bulk are the same as
+    the ones constructed one by one."""
+    with tempfile.TemporaryDirectory(dir=tests.test_project_path) as temp_dir:
+        file_list = []
+        for i in range(10):
+            file_path = os.path.abspath("/".join([temp_dir, str(i)]))
+            pathlib.Path(file_path).write_bytes(os.urandom(i * 1000))
+            file_list.append(file_path)
+
+        compares = getFileCompares(file_list=file_list, num_workers=num_workers)
+        for file_path in file_list:
+            single = FileCompare(file_path)
+            assert compares[file_path].path == single.path  # nosec
+            assert compares[file_path].size == single.size  # nosec
+            assert compares[file_path].hash == single.hash  # nosec
+            assert compares[file_path].isSameFile(single)  # nosec
+
+        with pytest.raises(expected_exception=files.FileCompareException):
+            getFileCompares(
+                file_list=[*file_list, temp_dir + "/does_not_exist"],
+                num_workers=num_workers,
+            )
+
+
 ################################################################################
 @pytest.mark.fast
 def test_returnExistingFile() -> None:
@@ -0,0 +1,65 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     test_hash_cache.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import os
+import pathlib
+import tempfile
+
+import pytest
+
+import tests
+from buildnis.modules.helpers import files, hash_cache
+
+
+################################################################################
+@pytest.mark.fast
+def test_hashCacheHit(monkeypatch) -> None:
+    """Test that an unchanged file is not hashed again, but a changed one is."""
+    monkeypatch.setattr(hash_cache, "RACY_TIME_NS", -1)
+
+    with tempfile.TemporaryDirectory(dir=tests.test_project_path) as temp_dir:
+        file_path = os.path.abspath("/".join([temp_dir, "to_hash"]))
+        cache_path = os.path.abspath("/".join([temp_dir, "cache.json"]))
+        pathlib.Path(file_path).write_bytes(b"content")
+
+        cache = hash_cache.HashCache(cache_path=cache_path)
+        first_hash = cache.getHash(file_path)
+        assert first_hash == files.hashFile(file_path)  # nosec
+        cache.save()
+
+        cache = hash_cache.HashCache(cache_path=cache_path)
+        assert cache.getHash(file_path) == first_hash  # nosec
+        assert cache.hits == 1  # nosec
+        assert cache.misses == 0  # nosec
+
+        pathlib.Path(file_path).write_bytes(b"changed content")
+        assert cache.getHash(file_path) == files.hashFile(file_path)  # nosec
+        assert cache.misses == 1  # nosec
+
+
+################################################################################
+@pytest.mark.fast
+def test_hashCachePrune(monkeypatch) -> None:
+    """Test that entries of deleted files are removed from the cache."""
+    monkeypatch.setattr(hash_cache, "RACY_TIME_NS", -1)
+
+    with tempfile.TemporaryDirectory(dir=tests.test_project_path) as temp_dir:
+        file_path = os.path.abspath("/".join([temp_dir, "to_hash"]))
+        cache_path = os.path.abspath("/".join([temp_dir, "cache.json"]))
+        pathlib.Path(file_path).write_bytes(b"content")
+
+        cache = hash_cache.HashCache(cache_path=cache_path)
+        cache.getHash(file_path)
+        cache.save()
+
+        pathlib.Path(file_path).unlink()
+        cache = hash_cache.HashCache(cache_path=cache_path)
+        cache.save()
+        assert file_path not in cache._entries  # nosec
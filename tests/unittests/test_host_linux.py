@@ -0,0 +1,204 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     test_host_linux.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import json
+import pathlib
+import sys
+import tempfile
+
+import pytest
+
+from buildnis.modules.config.host import Host, getHostFingerprint, loadHostCfg
+from buildnis.modules.config.host_linux import (
+    readCacheSizes,
+    readCgroupCPULimit,
+    readCgroupMemoryLimit,
+    readCPUInfo,
+    readGPUNames,
+    readNumOnlineCPUs,
+    readOSRelease,
+    readRAMSize,
+)
+
+OS_RELEASE = """PRETTY_NAME="Debian GNU/Linux 12 (bookworm)"
+NAME="Debian GNU/Linux"
+VERSION_ID="12"
+VERSION="12 (bookworm)"
+"""
+
+CPUINFO = """processor\t: 0
+model name\t: AMD Ryzen 7 5800X 8-Core Processor
+siblings\t: 16
+cpu cores\t: 8
+
+processor\t: 1
+model name\t: AMD Ryzen 7 5800X 8-Core Processor
+siblings\t: 16
+cpu cores\t: 8
+"""
+
+MEMINFO = """MemTotal:       32768000 kB
+MemFree:         1024000 kB
+"""
+
+PCI_IDS = """# comment
+10de  NVIDIA Corporation
+\t2484  GA104 [GeForce RTX 3070]
+\t\t1043 87b8  subsystem
+1022  Advanced Micro Devices, Inc. [AMD]
+C 03  Display controller
+"""
+
+
+################################################################################
+def writeFiles(base_dir: pathlib.Path, files: dict) -> None:
+    """Writes the files with the given relative paths and contents."""
+    for path, content in files.items():
+        file_path = base_dir / path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(content)
+
+
+################################################################################
+@pytest.mark.fast
+def test_readLinuxFiles() -> None:
+    """Test reading the host information from files in `/etc`, `/proc` and `/sys`."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base_dir = pathlib.Path(temp_dir)
+        writeFiles(
+            base_dir,
+            {
+                "os-release": OS_RELEASE,
+                "cpuinfo": CPUINFO,
+                "meminfo": MEMINFO,
+                "pci.ids": PCI_IDS,
+                "cpu/online": "0-3,6,8-9\n",
+                "cpu/cpu0/cache/index0/level": "1\n",
+                "cpu/cpu0/cache/index0/type": "Data\n",
+                "cpu/cpu0/cache/index0/size": "32K\n",
+                "cpu/cpu0/cache/index1/level": "1\n",
+                "cpu/cpu0/cache/index1/type": "Instruction\n",
+                "cpu/cpu0/cache/index1/size": "32K\n",
+                "cpu/cpu0/cache/index2/level": "2\n",
+                "cpu/cpu0/cache/index2/type": "Unified\n",
+                "cpu/cpu0/cache/index2/size": "512K\n",
+                "cpu/cpu0/cache/index3/level": "3\n",
+                "cpu/cpu0/cache/index3/type": "Unified\n",
+                "cpu/cpu0/cache/index3/size": "32768K\n",
+                "pci/0000:00:00.0/class": "0x060000\n",
+                "pci/0000:0a:00.0/class": "0x030000\n",
+                "pci/0000:0a:00.0/vendor": "0x10de\n",
+                "pci/0000:0a:00.0/device": "0x2484\n",
+                "pci/0000:0a:00.0/revision": "0xa1\n",
+                "pci/0000:0b:00.0/class": "0x030000\n",
+                "pci/0000:0b:00.0/vendor": "0x1022\n",
+                "pci/0000:0b:00.0/device": "0x1638\n",
+                "pci/0000:0b:00.0/revision": "0x00\n",
+            },
+        )
+
+        os_release = readOSRelease(base_dir / "os-release")
+        cpu_info = readCPUInfo(base_dir / "cpuinfo")
+        num_online = readNumOnlineCPUs(base_dir / "cpu")
+        cache_sizes = readCacheSizes(base_dir / "cpu")
+        ram_size = readRAMSize(base_dir / "meminfo")
+        gpus = readGPUNames(base_dir / "pci", [base_dir / "pci.ids"])
+        with pytest.raises(FileNotFoundError):
+            readGPUNames(base_dir / "pci", [base_dir / "missing.ids"])
+
+    assert os_release == {  # nosec
+        "os_vers_major": "Debian GNU/Linux 12 (bookworm)",
+        "os_vers": "12",
+    }
+    assert cpu_info == {  # nosec
+        "cpu": "AMD Ryzen 7 5800X 8-Core Processor",
+        "num_cores": 8,
+        "num_logical_cores": 16,
+    }
+    assert num_online == 7  # nosec
+    assert cache_sizes == {1: 32 * 1024, 2: 512 * 1024, 3: 32 * 1024 * 1024}  # nosec
+    assert ram_size == 32768000 * 1024  # nosec
+    assert gpus == [  # nosec
+        "NVIDIA Corporation GA104 [GeForce RTX 3070] (rev a1)",
+        "Advanced Micro Devices, Inc. [AMD] 1638",
+    ]
+
+
+################################################################################
+@pytest.mark.skipif(sys.platform != "linux", reason="needs Linux")
+def test_loadHostCfg() -> None:
+    """Test that the saved host configuration is only reused if the host's
+    fingerprint hasn't changed."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        json_path = str(pathlib.Path(temp_dir) / "host_config.json")
+        host_cfg = Host()
+        host_cfg.writeJSON(json_path=json_path)
+
+        loaded_cfg = loadHostCfg(json_path)
+        loaded_cfg.writeJSON(json_path=json_path)
+        rewritten_json = json.loads(pathlib.Path(json_path).read_text())
+
+        host_json = json.loads(pathlib.Path(json_path).read_text())
+        host_json["host_fingerprint"] = "changed"
+        pathlib.Path(json_path).write_text(json.dumps(host_json))
+        changed_cfg = loadHostCfg(json_path)
+
+    assert host_cfg.host_fingerprint == getHostFingerprint()  # nosec
+    assert loaded_cfg.cpu == host_cfg.cpu  # nosec
+    assert loaded_cfg.ram_total == host_cfg.ram_total  # nosec
+    assert "orig_file" not in rewritten_json  # nosec
+    assert changed_cfg is None  # nosec
+    assert loadHostCfg(json_path) is None  # nosec
+
+
+################################################################################
+@pytest.mark.fast
+def test_readCgroupLimits() -> None:
+    """Test reading the CPU quota and memory limit of cgroup v2 and cgroup v1,
+    using the smallest limit of the cgroup and its parents."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base_dir = pathlib.Path(temp_dir)
+        writeFiles(
+            base_dir,
+            {
+                "v2/self_cgroup": "0::/user.slice/build.scope\n",
+                "v2/cgroup/cpu.max": "max 100000\n",
+                "v2/cgroup/user.slice/cpu.max": "250000 100000\n",
+                "v2/cgroup/user.slice/memory.max": "max\n",
+                "v2/cgroup/user.slice/build.scope/cpu.max": "max 100000\n",
+                "v2/cgroup/user.slice/build.scope/memory.max": "4294967296\n",
+                "v1/self_cgroup": "4:memory:/docker/abc\n2:cpu,cpuacct:/docker/abc\n",
+                "v1/cgroup/cpu,cpuacct/docker/abc/cpu.cfs_quota_us": "-1\n",
+                "v1/cgroup/cpu,cpuacct/docker/abc/cpu.cfs_period_us": "100000\n",
+                "v1/cgroup/cpu,cpuacct/docker/cpu.cfs_quota_us": "50000\n",
+                "v1/cgroup/cpu,cpuacct/docker/cpu.cfs_period_us": "100000\n",
+                "v1/cgroup/memory/memory.limit_in_bytes": "9223372036854771712\n",
+                "none/self_cgroup": "0::/\n",
+                "none/cgroup/cpu.max": "max 100000\n",
+            },
+        )
+
+        limits = {
+            version: (
+                readCgroupCPULimit(
+                    base_dir / version / "cgroup", base_dir / version / "self_cgroup"
+                ),
+                readCgroupMemoryLimit(
+                    base_dir / version / "cgroup", base_dir / version / "self_cgroup"
+                ),
+            )
+            for version in ["v2", "v1", "none"]
+        }
+
+    assert limits == {  # nosec
+        "v2": (3, 4294967296),
+        "v1": (1, None),
+        "none": (None, None),
+    }
@@ -0,0 +1,59 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     test_inotify.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import os
+import pathlib
+import tempfile
+
+import pytest
+
+import tests
+from buildnis.modules.helpers import inotify
+
+
+################################################################################
+@pytest.fixture
+def watcher() -> inotify.ConfigWatcher:
+    """Returns a `ConfigWatcher`, skips the test if inotify isn't available."""
+    try:
+        ret_val = inotify.ConfigWatcher()
+    except inotify.InotifyException as excp:
+        pytest.skip("inotify not available: {error}".format(error=excp))
+    yield ret_val
+    ret_val.close()
+
+
+################################################################################
+@pytest.mark.fast
+def test_watcherDirty(watcher) -> None:
+    """Test that changed, replaced and deleted files are marked as dirty."""
+    with tempfile.TemporaryDirectory(dir=tests.test_project_path) as temp_dir:
+        file_path = os.path.abspath("/".join([temp_dir, "watched.json"]))
+        other_path = os.path.abspath("/".join([temp_dir, "other.json"]))
+        pathlib.Path(file_path).write_text("{}")
+
+        assert watcher.isDirty(file_path, "hash") is True  # nosec
+        watcher.watch(file_path, "hash")
+        assert watcher.isDirty(file_path, "hash") is False  # nosec
+        assert watcher.isDirty(file_path, "other hash") is True  # nosec
+
+        pathlib.Path(other_path).write_text("{}")
+        assert watcher.isDirty(file_path, "hash") is False  # nosec
+
+        pathlib.Path(file_path).write_text('{"a": 1}')
+        assert watcher.isDirty(file_path, "hash") is True  # nosec
+
+        watcher.watch(file_path, "hash")
+        os.replace(other_path, file_path)
+        assert watcher.isDirty(file_path, "hash") is True  # nosec
+
+        watcher.watch(file_path, "hash")
+        pathlib.Path(file_path).unlink()
+        assert watcher.isDirty(file_path, "hash") is True  # nosec
@@ -0,0 +1,160 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     test_jobserver.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+import time
+
+import pytest
+
+import tests
+from buildnis.modules.builds.scheduler import BuildJob, BuildScheduler
+from buildnis.modules.helpers.execute import ExeArgs, runCommand
+from buildnis.modules.helpers.jobserver import (
+    connectJobServer,
+    createJobServer,
+    setJobServer,
+)
+
+CHILD_SCRIPT = """import os, sys
+read_fd, write_fd = os.environ["MAKEFLAGS"].split("=")[1].split(",")
+token = os.read(int(read_fd), 1)
+os.write(int(write_fd), token)
+print(os.environ["MAKEFLAGS"], token.decode())
+"""
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="no jobserver on Windows")
+
+
+################################################################################
+@pytest.mark.fast
+def test_createJobServer() -> None:
+    """Test that a created jobserver holds `num_jobs - 1` tokens and is passed to
+    the commands run by `runCommand`."""
+    job_server = createJobServer(3)
+    tokens = [job_server.acquire(), job_server.acquire()]
+    os.set_blocking(job_server.read_fd, False)
+    with pytest.raises(BlockingIOError):
+        os.read(job_server.read_fd, 1)
+    os.set_blocking(job_server.read_fd, True)
+    job_server.release(tokens[0])
+
+    setJobServer(job_server)
+    try:
+        cmd_output = runCommand(
+            ExeArgs(exe=sys.executable, args=["-c", CHILD_SCRIPT]), timeout=30
+        )
+    finally:
+        setJobServer(None)
+        job_server.close()
+
+    assert tokens == [b"+", b"+"]  # nosec
+    assert cmd_output.return_code == 0  # nosec
+    assert cmd_output.std_out.split() == [  # nosec
+        "-j3",
+        "--jobserver-auth={read},{write}".format(
+            read=job_server.read_fd, write=job_server.write_fd
+        ),
+        "+",
+    ]
+
+
+################################################################################
+@pytest.mark.fast
+def test_connectJobServer() -> None:
+    """Test connecting to the pipe and named pipe jobservers of a calling make."""
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, b"ab")
+    pipe_server = connectJobServer(
+        "-j3 --jobserver-auth={read},{write}".format(read=read_fd, write=write_fd)
+    )
+    pipe_tokens = [pipe_server.acquire(), pipe_server.acquire()]
+    pipe_server.close()
+    os.close(read_fd)
+    os.close(write_fd)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        fifo_path = str(pathlib.Path(temp_dir) / "jobserver")
+        os.mkfifo(fifo_path)
+        fifo_fd = os.open(fifo_path, os.O_RDWR)
+        os.write(fifo_fd, b"+")
+        fifo_server = connectJobServer(
+            "-j2 --jobserver-auth=fifo:{path}".format(path=fifo_path)
+        )
+        fifo_token = fifo_server.acquire()
+        fifo_server.release(fifo_token)
+        fifo_server.close()
+        os.close(fifo_fd)
+
+    assert pipe_tokens == [b"a", b"b"]  # nosec
+    assert pipe_server.getPassFds() == (read_fd, write_fd)  # nosec
+    assert fifo_token == b"+"  # nosec
+    assert fifo_server.getPassFds() == ()  # nosec
+    assert connectJobServer("-j4") is None  # nosec
+    assert connectJobServer("-j4 --jobserver-auth=-2,-2") is None  # nosec
+    assert connectJobServer("--jobserver-auth=fifo:/does/not/exist") is None  # nosec
+
+
+################################################################################
+@pytest.mark.fast
+def test_schedulerTokens() -> None:
+    """Test that the scheduler runs at most the jobserver's tokens plus one jobs at
+    the same time, regardless of its number of worker threads."""
+    running = []
+    lock = threading.Lock()
+    max_running = [0]
+
+    job_server = createJobServer(2)
+    scheduler = BuildScheduler(num_jobs=4, job_server=job_server)
+    for idx in range(6):
+        scheduler.addJob(
+            BuildJob(
+                name="job {idx}".format(idx=idx),
+                action=lambda: tests.sleepJob(running, lock, max_running),
+            )
+        )
+    result = scheduler.run()
+    num_acquired = job_server.num_acquired
+    job_server.close()
+
+    assert result is True  # nosec
+    assert max_running[0] == 2  # nosec
+    assert num_acquired > 0  # nosec
+
+
+################################################################################
+@pytest.mark.fast
+def test_acquireNonBlocking() -> None:
+    """Test that `acquire` blocks until a token is released if make has set the
+    pipe to non-blocking."""
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(read_fd, False)
+    job_server = connectJobServer(
+        "-j2 --jobserver-auth={read},{write}".format(read=read_fd, write=write_fd)
+    )
+    tokens = []
+    acquire_thread = threading.Thread(
+        target=lambda: tokens.append(job_server.acquire()), daemon=True
+    )
+    acquire_thread.start()
+    time.sleep(0.2)
+    is_waiting = acquire_thread.is_alive()
+    job_server.release(b"+")
+    acquire_thread.join(timeout=10)
+    is_done = not acquire_thread.is_alive()
+    os.close(read_fd)
+    os.close(write_fd)
+
+    assert is_waiting is True  # nosec
+    assert is_done is True  # nosec
+    assert tokens == [b"+"]  # nosec
@@ -0,0 +1,154 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     test_ninja_generator.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import os
+import pathlib
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+from buildnis.modules.builds.build_graph import GCC_COMPILER, MSVC_COMPILER
+from buildnis.modules.builds.ninja_generator import (
+    ALWAYS_RUN_TARGET,
+    NINJA_OBJECT_DIR_NAME,
+    NinjaGenerator,
+    escapePath,
+    removeOutputArguments,
+)
+
+
+################################################################################
+def makeConfig(base_dir: pathlib.Path) -> object:
+    """Returns a project configuration with a C++ library compiled and linked by
+    `g++` and a documentation target always run by a script."""
+    compiler = SimpleNamespace(name="GCC", build_tool_exe="/usr/bin/g++")
+    lib_stages = [
+        SimpleNamespace(
+            name="compile",
+            build_tool=compiler,
+            call_build_tool="each",
+            build_tool_arguments=["-c -O2 -o ignored.o"],
+        ),
+        SimpleNamespace(
+            name="link",
+            build_tool=compiler,
+            call_build_tool="once",
+            build_tool_arguments=["-shared @objects.rsp -o libfoo.so"],
+            results=[
+                SimpleNamespace(
+                    type="single_file", path_or_regexp=str(base_dir / "libfoo.so")
+                )
+            ],
+        ),
+    ]
+    doc_stages = [
+        SimpleNamespace(
+            name="html",
+            build_tool=SimpleNamespace(name="Script", build_tool_exe="/bin/doc.sh"),
+            call_build_tool="once",
+            always_run_build=True,
+            build_tool_arguments=["html"],
+        )
+    ]
+    return SimpleNamespace(
+        module_cfgs=[
+            SimpleNamespace(
+                name="lib",
+                module_path=str(base_dir),
+                targets=[
+                    SimpleNamespace(
+                        name="libfoo",
+                        alias="foo",
+                        default=True,
+                        sources=["*.cpp", "sub/a.cpp"],
+                        include_paths=["include"],
+                        library_paths=["/opt/lib"],
+                        libraries=["m"],
+                        build_tool=SimpleNamespace(stages=lib_stages),
+                    ),
+                    SimpleNamespace(
+                        name="doc",
+                        dependencies=["foo"],
+                        build_tool=SimpleNamespace(stages=doc_stages),
+                    ),
+                ],
+            )
+        ]
+    )
+
+
+################################################################################
+@pytest.mark.fast
+def test_ninjaGenerator() -> None:
+    """Test the build statements generated for compile, link and always run
+    stages."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base_dir = pathlib.Path(temp_dir)
+        (base_dir / "sub").mkdir()
+        for name in ["a.cpp", "b.cpp", "sub/a.cpp"]:
+            (base_dir / name).write_text("int main() { return 0; }\n")
+        generator = NinjaGenerator(makeConfig(base_dir), temp_dir)
+        generator.generate()
+        generator.write()
+        lines = pathlib.Path(generator.ninja_path).read_text().splitlines()
+
+    def getStatement(start: str) -> list:
+        idx = [line.startswith(start) for line in lines].index(True)
+        return lines[idx : idx + 3]
+
+    base = escapePath(str(base_dir))
+    object_dir = os.path.join(
+        temp_dir, NINJA_OBJECT_DIR_NAME, "lib", "libfoo", "compile"
+    )
+    objects = [
+        escapePath(os.path.join(object_dir, name))
+        for name in ["a.cpp.o", "b.cpp.o", "sub/a.cpp.o"]
+    ]
+    compile_a = getStatement("build {obj}:".format(obj=objects[0]))
+    link = getStatement("build {base}/libfoo.so:".format(base=base))
+    doc = getStatement("build {base}/ninja_stamps/lib_doc_html_".format(base=base))
+    expected = [
+        "build {obj}: compile_gcc {base}/a.cpp".format(obj=objects[0], base=base),
+        "build {base}/libfoo.so: run {objects}".format(
+            base=base, objects=" ".join(objects)
+        ),
+        ": run | {base}/libfoo.so {always}".format(base=base, always=ALWAYS_RUN_TARGET),
+    ]
+
+    assert generator.num_statements == 5  # nosec
+    assert compile_a[0] == expected[0]  # nosec
+    assert "-I{dir}/include".format(dir=temp_dir) in compile_a[1]  # nosec
+    assert "ignored.o" not in compile_a[1]  # nosec
+    assert "-o {obj} -MD -MF {obj}.d".format(obj=objects[0]) in compile_a[1]  # nosec
+    assert link[0] == expected[1]  # nosec
+    assert link[1].endswith("-o libfoo.so -L/opt/lib -lm")  # nosec
+    assert doc[0].endswith(expected[2])  # nosec
+    assert "&& touch" in doc[1]  # nosec
+    assert "build foo: phony lib/libfoo" in lines  # nosec
+    assert "default lib/libfoo" in lines  # nosec
+
+
+################################################################################
+@pytest.mark.fast
+def test_removeOutputArguments() -> None:
+    """Test that output paths of the stage's arguments are removed, so the object
+    file of the build statement is written."""
+    gcc_arguments = ["-c", "-o", "a.o", "-O2"]
+    msvc_arguments = ["/c", "/Foa.obj", "-Fob.obj", "/O2"]
+
+    assert removeOutputArguments(gcc_arguments, GCC_COMPILER) == [  # nosec
+        "-c",
+        "-O2",
+    ]
+    assert removeOutputArguments(msvc_arguments, MSVC_COMPILER) == [  # nosec
+        "/c",
+        "/O2",
+    ]
@@ -0,0 +1,36 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     test_placeholder_regex.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import datetime
+
+import pytest
+
+from buildnis.modules.config import LINUX_OS_STRING, config_values
+from buildnis.modules.helpers.placeholder_regex import replaceConstants
+
+
+################################################################################
+@pytest.mark.fast
+def test_replaceConstants(monkeypatch) -> None:
+    """Test that all constants in a string are replaced and other placeholders are
+    left unaltered."""
+    monkeypatch.setattr(config_values, "PROJECT_ROOT", "C:\\project")
+    monkeypatch.setattr(config_values, "HOST_NUM_CORES", 4)
+
+    assert replaceConstants("no placeholder") == "no placeholder"  # nosec
+    assert (  # nosec
+        replaceConstants("${PROJECT_ROOT}/${OS_NAME_LINUX}-${HOST_NUM_CORES}")
+        == "C:\\project/{os}-4".format(os=LINUX_OS_STRING)
+    )
+    assert (  # nosec
+        replaceConstants("${../include_paths:-I} ${UNKNOWN} ${PROJECT_ROOT}")
+        == "${../include_paths:-I} ${UNKNOWN} C:\\project"
+    )
+    assert replaceConstants("${YEAR}") == str(datetime.date.today().year)  # nosec
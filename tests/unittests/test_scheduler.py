@@ -0,0 +1,288 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2021 Roland Csaszar
+#
+# Project:  Buildnis
+# File:     test_scheduler.py
+# Date:     18.Oct.2026
+###############################################################################
+
+from __future__ import annotations
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import buildnis.modules.builds.scheduler as scheduler_module
+import tests
+from buildnis.modules.builds.build_graph import BuildGraph, getStageCommand
+from buildnis.modules.builds.scheduler import (
+    BuildJob,
+    BuildScheduler,
+    BuildSchedulerException,
+)
+
+
+################################################################################
+def failJob() -> None:
+    """A build job that fails."""
+    raise RuntimeError("failed")
+
+
+################################################################################
+@pytest.mark.fast
+def test_runParallel() -> None:
+    """Test that independent jobs run in parallel, at most `num_jobs` at the same
+    time, and that jobs run after their dependencies."""
+    running = []
+    lock = threading.Lock()
+    max_running = [0]
+
+    scheduler = BuildScheduler(num_jobs=3)
+    for idx in range(6):
+        scheduler.addJob(
+            BuildJob(
+                name="compile {idx}".format(idx=idx),
+                action=lambda: tests.sleepJob(running, lock, max_running),
+            )
+        )
+    scheduler.addJob(
+        BuildJob(
+            name="link",
+            action=lambda: None,
+            dependencies=["compile {idx}".format(idx=idx) for idx in range(6)],
+        )
+    )
+
+    assert scheduler.run() is True  # nosec
+    assert max_running[0] == 3  # nosec
+    assert len(scheduler.succeeded) == 7  # nosec
+    assert scheduler.succeeded[-1] == "link"  # nosec
+
+
+################################################################################
+@pytest.mark.fast
+def test_runFailure() -> None:
+    """Test that no new jobs are started after a failed job, and that all jobs not
+    depending on a failed job are run with `keep_going`."""
+    results = {}
+    for keep_going in [False, True]:
+        scheduler = BuildScheduler(num_jobs=1, keep_going=keep_going)
+        scheduler.addJob(BuildJob(name="a", action=failJob))
+        scheduler.addJob(BuildJob(name="b", action=lambda: None))
+        scheduler.addJob(BuildJob(name="c", action=lambda: None, dependencies=["a"]))
+        results[keep_going] = (
+            scheduler.run(),
+            scheduler.succeeded,
+            scheduler.failed,
+            scheduler.skipped,
+        )
+
+    assert results == {  # nosec
+        False: (False, [], ["a"], ["b", "c"]),
+        True: (False, ["b"], ["a"], ["c"]),
+    }
+
+
+################################################################################
+@pytest.mark.fast
+def test_checkGraph() -> None:
+    """Test that cycles and unknown dependencies are detected."""
+    scheduler = BuildScheduler()
+    scheduler.addJob(BuildJob(name="a", action=lambda: None, dependencies=["b"]))
+    scheduler.addJob(BuildJob(name="b", action=lambda: None, dependencies=["a"]))
+    with pytest.raises(BuildSchedulerException):
+        scheduler.run()
+    with pytest.raises(BuildSchedulerException):
+        scheduler.addJob(BuildJob(name="a", action=lambda: None))
+
+    scheduler = BuildScheduler()
+    scheduler.addJob(BuildJob(name="a", action=lambda: None, dependencies=["b"]))
+    with pytest.raises(BuildSchedulerException):
+        scheduler.checkGraph()
+
+
+################################################################################
+@pytest.mark.fast
+def test_buildGraph() -> None:
+    """Test the jobs generated from the targets of a project configuration."""
+    stages = SimpleNamespace(
+        stages=[
+            SimpleNamespace(name="compile", call_build_tool="each"),
+            SimpleNamespace(name="link", call_build_tool="once"),
+        ]
+    )
+    cfg = SimpleNamespace(
+        module_cfgs=[
+            SimpleNamespace(
+                name="lib",
+                module_path="/project/lib",
+                targets=[
+                    SimpleNamespace(
+                        name="libfoo",
+                        alias="foo",
+                        sources=["a.c", "b.c"],
+                        build_tool=stages,
+                    ),
+                ],
+            ),
+            SimpleNamespace(
+                name="app",
+                module_path="/project/app",
+                targets=[
+                    SimpleNamespace(
+                        name="app",
+                        default=True,
+                        dependencies=["foo", "main.h"],
+                        sources="main.c",
+                        build_tool=stages,
+                    ),
+                    SimpleNamespace(
+                        name="install", build_type="install", dependencies="${@}"
+                    ),
+                ],
+            ),
+        ]
+    )
+
+    scheduler = BuildScheduler()
+    build_graph = BuildGraph(cfg, scheduler)
+    assert build_graph.selectTargets([], False) == [(1, 0)]  # nosec
+    assert build_graph.selectTargets(["foo"], True) == []  # nosec
+    with pytest.raises(BuildSchedulerException):
+        build_graph.selectTargets(["missing"], False)
+    build_graph.addTargets(build_graph.selectTargets(["app"], True))
+
+    dependencies = {
+        name: sorted(job.dependencies) for name, job in scheduler.jobs.items()
+    }
+    assert dependencies == {  # nosec
+        "lib/libfoo/compile//project/lib/a.c": [],
+        "lib/libfoo/compile//project/lib/b.c": [],
+        "lib/libfoo/link": [
+            "lib/libfoo/compile//project/lib/a.c",
+            "lib/libfoo/compile//project/lib/b.c",
+        ],
+        "app/app/compile//project/app/main.c": ["lib/libfoo/link"],
+        "app/app/link": ["app/app/compile//project/app/main.c"],
+        "app/install": ["app/app/link"],
+    }
+
+
+################################################################################
+@pytest.mark.fast
+def test_stageCommand() -> None:
+    """Test that the command line of a compiler stage is the stage's arguments, and
+    that the include and library paths of the target are only added if asked
+    for."""
+    module = SimpleNamespace(name="lib", module_path="/project/lib")
+    target = SimpleNamespace(
+        name="libfoo",
+        include_paths=["include"],
+        library_paths=["/opt/lib"],
+        libraries=["m"],
+    )
+    compile_stage = SimpleNamespace(
+        name="compile",
+        build_tool=SimpleNamespace(build_tool_exe="/usr/bin/g++"),
+        build_tool_arguments=["-c -O2"],
+    )
+    link_stage = SimpleNamespace(
+        name="link",
+        build_tool=SimpleNamespace(build_tool_exe="/usr/bin/g++"),
+        build_tool_arguments=["*.o -o libfoo.so"],
+    )
+
+    native_compile = getStageCommand(module, target, compile_stage, "/project/a.c")
+    native_link = getStageCommand(module, target, link_stage, None)
+    compile_flags = getStageCommand(module, target, compile_stage, "a.c", True)
+    link_flags = getStageCommand(module, target, link_stage, None, True)
+
+    assert native_compile.arguments == ["-c", "-O2", "/project/a.c"]  # nosec
+    assert native_link.arguments == ["*.o", "-o", "libfoo.so"]  # nosec
+    assert native_link.working_dir == "/project/lib"  # nosec
+    assert compile_flags.arguments == [  # nosec
+        "-c",
+        "-O2",
+        "-I/project/lib/include",
+        "a.c",
+    ]
+    assert link_flags.arguments[3:] == ["-L/opt/lib", "-lm"]  # nosec
+
+
+################################################################################
+@pytest.mark.fast
+def test_criticalPath() -> None:
+    """Test that the job with the longest path of estimated durations is started
+    first."""
+    scheduler = BuildScheduler(num_jobs=1)
+    scheduler.addJob(BuildJob(name="a", action=lambda: None, duration=2.0))
+    scheduler.addJob(BuildJob(name="b", action=lambda: None, duration=1.0))
+    scheduler.addJob(
+        BuildJob(name="c", action=lambda: None, dependencies=["b"], duration=5.0)
+    )
+
+    priorities = scheduler.getPriorities(scheduler.checkGraph())
+
+    assert priorities == {"a": 2.0, "b": 6.0, "c": 5.0}  # nosec
+    assert scheduler.run() is True  # nosec
+    assert scheduler.succeeded == ["b", "c", "a"]  # nosec
+
+
+################################################################################
+@pytest.mark.fast
+def test_memoryAdmission() -> None:
+    """Test that jobs are only started while the sum of their estimated memory
+    usage is below the limit, and that a job bigger than the limit still runs."""
+    running = []
+    lock = threading.Lock()
+    max_running = [0]
+
+    scheduler = BuildScheduler(num_jobs=4, max_memory=100)
+    for name, memory in [("a", 60), ("b", 60), ("c", 30), ("d", 150)]:
+        scheduler.addJob(
+            BuildJob(
+                name=name,
+                action=lambda: tests.sleepJob(running, lock, max_running),
+                memory=memory,
+            )
+        )
+
+    assert scheduler.run() is True  # nosec
+    assert max_running[0] == 2  # nosec
+    assert sorted(scheduler.succeeded) == ["a", "b", "c", "d"]  # nosec
+    assert scheduler.num_memory_waits > 0  # nosec
+
+
+################################################################################
+@pytest.mark.fast
+def test_loadThrottling(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that no job is started while another one is running and the load or CPU
+    pressure is too high, and that jobs run in parallel after it has dropped."""
+    results = {}
+    for name, load, pressure in [
+        ("load", 8.0, 0.0),
+        ("pressure", 0.0, 50.0),
+        ("idle", 0.0, 0.0),
+    ]:
+        monkeypatch.setattr(scheduler_module, "getLoad", lambda load=load: load)
+        monkeypatch.setattr(
+            scheduler_module, "getCpuPressure", lambda pressure=pressure: pressure
+        )
+        running = []
+        lock = threading.Lock()
+        max_running = [0]
+
+        scheduler = BuildScheduler(num_jobs=3, max_load=4.0, max_cpu_pressure=20.0)
+        for idx in range(3):
+            scheduler.addJob(
+                BuildJob(
+                    name="job {idx}".format(idx=idx),
+                    action=lambda: tests.sleepJob(running, lock, max_running),
+                )
+            )
+        results[name] = (scheduler.run(), max_running[0], scheduler.num_load_waits)
+
+    assert results["load"] == (True, 1, 1)  # nosec
+    assert results["pressure"] == (True, 1, 1)  # nosec
+    assert results["idle"] == (True, 3, 0)  # nosec